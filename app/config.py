@@ -35,9 +35,28 @@ class Settings(BaseModel):
     gray_low_threshold: float = float(os.getenv("GRAY_LOW_THRESHOLD", 0.65))
     embedding_model: str = os.getenv("EMBEDDING_MODEL", "BAAI/bge-small-zh-v1.5")
     reranker_model: str = os.getenv("RERANKER_MODEL", "BAAI/bge-reranker-base")
+    rerank_batching: bool = os.getenv("RERANK_BATCHING", "1").strip().lower() not in {"0", "false", "no", "off"}
+    rerank_batch_size: int = int(os.getenv("RERANK_BATCH_SIZE", 32))
+    rerank_max_wait_ms: float = float(os.getenv("RERANK_MAX_WAIT_MS", 5))
+    inference_backend: str = os.getenv("INFERENCE_BACKEND", "torch").strip().lower()
+    onnx_model_dir: str = os.getenv("ONNX_MODEL_DIR", "data/onnx")
+    onnx_quantize: bool = os.getenv("ONNX_QUANTIZE", "1").strip().lower() not in {"0", "false", "no", "off"}
+    embedding_cache_size: int = int(os.getenv("EMBEDDING_CACHE_SIZE", 2048))
+    embedding_store_dir: str = os.getenv("EMBEDDING_STORE_DIR", "data/embedding_store").strip()
+    llm_singleflight: bool = os.getenv("LLM_SINGLEFLIGHT", "1").strip().lower() not in {"0", "false", "no", "off"}
+    llm_speculative: bool = os.getenv("LLM_SPECULATIVE", "0").strip().lower() in {"1", "true", "yes", "on"}
+    speculative_cosine_low: float = float(os.getenv("SPECULATIVE_COSINE_LOW", 0.5))
+    speculative_cosine_high: float = float(os.getenv("SPECULATIVE_COSINE_HIGH", 0.85))
+    speculative_bm25_z: float = float(os.getenv("SPECULATIVE_BM25_Z", 3.0))
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "1").strip().lower() not in {"0", "false", "no", "off"}
+    llm_cache_path: str = os.getenv("LLM_CACHE_PATH", "data/llm_cache.sqlite").strip()
+    llm_cache_ttl_seconds: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+    llm_cache_memory_size: int = int(os.getenv("LLM_CACHE_MEMORY_SIZE", 1024))
+    llm_cache_max_entries: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 100000))
     data_file: str = os.getenv("DATA_FILE", "data/phenomena_sample.jsonl")
     hnsw_index_path: str = os.getenv("HNSW_INDEX_PATH", "data/hnsw_index.bin")
     tfidf_cache_path: str = os.getenv("TFIDF_CACHE_PATH", "data/tfidf.pkl")
+    corpus_snapshot_path: str = os.getenv("CORPUS_SNAPSHOT_PATH", "data/corpus_snapshot.pkl").strip()
     score_calibration_path: str = os.getenv("SCORE_CALIBRATION_PATH", "").strip()
     fusion_weights: FusionWeights = FusionWeights()
 
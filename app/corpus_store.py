@@ -0,0 +1,177 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import get_settings
+from .utils.data_loader import CORPUS_COLUMNS, read_columns
+
+logger = logging.getLogger(__name__)
+
+_SNAPSHOT_VERSION = 1
+_HASH_CHUNK = 1 << 20
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (peak RSS without /proc, 0 where neither is available)."""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1 << 20)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource  # 仅 Unix 提供
+    except ImportError:
+        return 0.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CorpusStore:
+    """Read-only, column-oriented corpus shared by ``HNSWSearcher`` and ``KeywordSearcher``.
+
+    Only :data:`CORPUS_COLUMNS` are kept, one list per column, instead of a dict
+    per record. Indexing returns a fresh dict with the non-null fields of that row.
+    """
+
+    def __init__(self, columns: Dict[str, List[Any]]):
+        self.columns = {name: list(columns.get(name) or []) for name in CORPUS_COLUMNS}
+        lengths = {len(values) for values in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"列长度不一致: {sorted(lengths)}")
+        self._size = lengths.pop() if lengths else 0
+        self.texts: List[str] = [t if isinstance(t, str) else "" for t in self.columns["text"]]
+        self.source = "parsed"
+        self.load_seconds = 0.0
+        self.rss_mb = 0.0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, idx: int) -> Dict[str, Any]:
+        return {name: values[idx] for name, values in self.columns.items() if values[idx] is not None}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self[i] for i in range(self._size))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "records": self._size,
+            "source": self.source,
+            "load_seconds": round(self.load_seconds, 3),
+            "rss_mb": round(self.rss_mb, 1),
+        }
+
+
+def _snapshot_header(data_path: str, st: os.stat_result, sha256: str) -> Dict[str, Any]:
+    return {
+        "version": _SNAPSHOT_VERSION,
+        "source": os.path.abspath(data_path),
+        "columns": list(CORPUS_COLUMNS),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": sha256,
+    }
+
+
+def write_snapshot(snapshot_path: str, data_path: str, store: CorpusStore, sha256: Optional[str] = None) -> None:
+    """Persist ``store`` as two consecutive pickles (header, columns); written atomically."""
+    st = os.stat(data_path)
+    header = _snapshot_header(data_path, st, sha256 or _file_sha256(data_path))
+    directory = os.path.dirname(os.path.abspath(snapshot_path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{snapshot_path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as handle:
+            pickle.dump(header, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(store.columns, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def read_snapshot(snapshot_path: str, data_path: str) -> Optional[CorpusStore]:
+    """Load the snapshot if it was built from the current ``data_path``; ``None`` otherwise.
+
+    Size and mtime matching is enough; when only the mtime differs (file copied or
+    touched) the content hash decides, and a still-valid snapshot gets a fresh header.
+    """
+    st = os.stat(data_path)
+    with open(snapshot_path, "rb") as handle:
+        header = pickle.load(handle)
+        if (
+            not isinstance(header, dict)
+            or header.get("version") != _SNAPSHOT_VERSION
+            or header.get("source") != os.path.abspath(data_path)
+            or header.get("columns") != list(CORPUS_COLUMNS)
+            or header.get("size") != st.st_size
+        ):
+            return None
+        refresh = header.get("mtime_ns") != st.st_mtime_ns
+        if refresh and header.get("sha256") != _file_sha256(data_path):
+            return None
+        store = CorpusStore(pickle.load(handle))
+    if refresh:
+        write_snapshot(snapshot_path, data_path, store, header["sha256"])
+    return store
+
+
+def load_corpus(data_path: str, snapshot_path: Optional[str] = None) -> CorpusStore:
+    """Load the corpus from its snapshot, or parse ``data_path`` and write one.
+
+    ``snapshot_path`` defaults to ``CORPUS_SNAPSHOT_PATH``; an empty value disables snapshots.
+    """
+    if snapshot_path is None:
+        snapshot_path = get_settings().corpus_snapshot_path
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+
+    store: Optional[CorpusStore] = None
+    if snapshot_path and os.path.exists(snapshot_path):
+        try:
+            store = read_snapshot(snapshot_path, data_path)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError, KeyError, AttributeError) as err:
+            logger.warning("语料快照 %s 无法读取，将重新解析: %s", snapshot_path, err)
+    if store is not None:
+        store.source = "snapshot"
+    else:
+        store = CorpusStore(read_columns(data_path, CORPUS_COLUMNS))
+        if snapshot_path:
+            try:
+                write_snapshot(snapshot_path, data_path, store)
+            except OSError as err:
+                logger.warning("无法写入语料快照 %s: %s", snapshot_path, err)
+
+    store.load_seconds = time.perf_counter() - start
+    store.rss_mb = _rss_mb()
+    logger.info(
+        "语料加载完成: %d 条，来源 %s，耗时 %.3fs，常驻内存 %.1f MB（+%.1f MB）",
+        len(store), store.source, store.load_seconds, store.rss_mb, store.rss_mb - rss_before,
+    )
+    return store
+
+
+_corpora: Dict[str, CorpusStore] = {}
+_corpora_lock = threading.Lock()
+
+
+def get_corpus(data_path: str, snapshot_path: Optional[str] = None) -> CorpusStore:
+    """Process-wide corpus for ``data_path``, loaded once and shared by all searchers."""
+    key = os.path.abspath(data_path)
+    with _corpora_lock:
+        store = _corpora.get(key)
+        if store is None:
+            store = load_corpus(data_path, snapshot_path)
+            _corpora[key] = store
+        return store
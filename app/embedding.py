@@ -1,18 +1,90 @@
-
 from sentence_transformers import SentenceTransformer
 import numpy as np
-from typing import List
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from .config import get_settings
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+class EmbeddingCache:
+    """线程安全的 LRU 向量缓存，键为 (模型名, 归一化文本)。"""
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = max(0, int(maxsize))
+        self._data: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    def get(self, key: Tuple[str, str]) -> Optional[np.ndarray]:
+        with self._lock:
+            vec = self._data.get(key)
+            if vec is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return vec
+    def put(self, key: Tuple[str, str], vec: np.ndarray) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = vec
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+    def info(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize,
+                    "hit_rate": self.hits / total if total else 0.0}
 class Embedder:
-    def __init__(self, model_name: str):
-        self.model = SentenceTransformer(model_name, trust_remote_code=True)
-    def encode(self, texts: List[str]) -> np.ndarray:
+    def __init__(self, model_name: str, backend: str = "torch", onnx_model_dir: str = "data/onnx",
+                 onnx_quantize: bool = True, cache_size: int = 2048):
+        self.model_name = model_name
+        self.cache = EmbeddingCache(cache_size)
+        # 区分同名模型的不同推理后端（量化结果略有差异），用作持久化向量存储的键
+        self.variant = "torch" if backend != "onnx" else ("onnx-int8" if onnx_quantize else "onnx")
+        if backend == "onnx":
+            from .onnx_backend import load_onnx_embedder
+            self.model = load_onnx_embedder(model_name, onnx_model_dir, quantize=onnx_quantize)
+        else:
+            self.model = SentenceTransformer(model_name, trust_remote_code=True)
+    def _encode(self, texts: List[str]) -> np.ndarray:
         emb = self.model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
         return np.array(emb, dtype=np.float32)
+    def encode(self, texts: List[str], use_cache: bool = True) -> np.ndarray:
+        # 批量建库（语料全文）传 use_cache=False，避免挤掉热门查询
+        if not use_cache or self.cache.maxsize <= 0:
+            return self._encode(texts)
+        keys = [(self.model_name, normalize_text(t)) for t in texts]
+        rows: List[Optional[np.ndarray]] = [self.cache.get(k) for k in keys]
+        missing: Dict[Tuple[str, str], List[int]] = {}
+        for i, (key, row) in enumerate(zip(keys, rows)):
+            if row is None:
+                missing.setdefault(key, []).append(i)
+        if missing:
+            # 归一化只用于构造缓存键，模型编码调用方的原文
+            vecs = self._encode([texts[positions[0]] for positions in missing.values()])
+            for (key, positions), vec in zip(missing.items(), vecs):
+                vec.setflags(write=False)
+                self.cache.put(key, vec)
+                for i in positions:
+                    rows[i] = vec
+        if not rows:
+            return self._encode(texts)
+        return np.stack(rows).astype(np.float32, copy=False)
+    def cache_info(self) -> Dict[str, float]:
+        return self.cache.info()
 _embedder = None
 def get_embedder() -> Embedder:
     global _embedder
     if _embedder is None:
         settings = get_settings()
-        _embedder = Embedder(settings.embedding_model)
+        _embedder = Embedder(settings.embedding_model, backend=settings.inference_backend,
+                             onnx_model_dir=settings.onnx_model_dir, onnx_quantize=settings.onnx_quantize,
+                             cache_size=settings.embedding_cache_size)
     return _embedder
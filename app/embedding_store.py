@@ -0,0 +1,193 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_KEY_BYTES = 16
+
+
+def embedder_store_key(embedder: Any) -> Optional[str]:
+    """Model identity used to key stored vectors; quantized/ONNX variants get their own rows."""
+    model_name = getattr(embedder, "model_name", None)
+    if not model_name:
+        return None
+    variant = getattr(embedder, "variant", "torch")
+    return model_name if variant == "torch" else f"{model_name}#{variant}"
+
+
+class EmbeddingStore:
+    """Persistent embedding store: an append-only float32 matrix (memory-mapped) plus a key→row index.
+
+    Rows are keyed by a digest of (model, text), and each model lives in its own
+    ``<digest>.f32`` / ``<digest>.keys`` / ``<digest>.json`` file triple under
+    ``directory``. Writers are expected to be a single process at a time.
+    """
+
+    def __init__(self, directory: str, model: str):
+        self.directory = directory
+        self.model = model
+        base = os.path.join(directory, hashlib.blake2b(model.encode("utf-8"), digest_size=8).hexdigest())
+        self._vectors_path = base + ".f32"
+        self._keys_path = base + ".keys"
+        self._meta_path = base + ".json"
+        self.dim: Optional[int] = None
+        self._index: Dict[bytes, int] = {}
+        # 物理行数；键文件里可能有重复键，所以可能大于 len(self._index)，追加时以它为起始行号
+        self._rows = 0
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.blake2b(f"{self.model}\0{text}".encode("utf-8"), digest_size=_KEY_BYTES).digest()
+
+    def _load(self) -> None:
+        try:
+            with open(self._meta_path, encoding="utf-8") as handle:
+                meta = json.load(handle)
+            self.dim = int(meta["dim"])
+            if self.dim <= 0:
+                raise ValueError(f"invalid dim {self.dim}")
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            logger.warning("向量存储元数据损坏 %s，将重新建立: %s", self._meta_path, err)
+            self._reset()
+            return
+        keys = b""
+        if os.path.exists(self._keys_path):
+            with open(self._keys_path, "rb") as handle:
+                keys = handle.read()
+        vector_bytes = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        rows = min(len(keys) // _KEY_BYTES, vector_bytes // (4 * self.dim))
+        # 中途崩溃可能留下不完整的尾部，截断到两个文件都完整的行数
+        self._truncate(rows)
+        for row in range(rows):
+            self._index.setdefault(keys[row * _KEY_BYTES:(row + 1) * _KEY_BYTES], row)
+        self._rows = rows
+        self._remap(rows)
+
+    def _reset(self) -> None:
+        for path in (self._vectors_path, self._keys_path, self._meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.dim = None
+
+    def _truncate(self, rows: int) -> None:
+        for path, size in ((self._vectors_path, rows * 4 * self.dim), (self._keys_path, rows * _KEY_BYTES)):
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                with open(path, "r+b") as handle:
+                    handle.truncate(size)
+
+    def _remap(self, rows: int) -> None:
+        if rows <= 0:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Return the stored vector for each text, or ``None`` when it has not been encoded yet."""
+        with self._lock:
+            rows: List[Optional[np.ndarray]] = []
+            for text in texts:
+                row = self._index.get(self._key(text))
+                if row is None:
+                    self.misses += 1
+                    rows.append(None)
+                else:
+                    self.hits += 1
+                    rows.append(np.array(self._matrix[row]))
+            return rows
+
+    def put_many(self, texts: Sequence[str], vectors: Any) -> int:
+        """Append vectors for texts not stored yet; returns the number of new rows."""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(texts):
+            raise ValueError(f"向量形状与文本数量不一致: {matrix.shape} vs {len(texts)}")
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(matrix.shape[1])
+                with open(self._meta_path, "w", encoding="utf-8") as handle:
+                    json.dump({"model": self.model, "dim": self.dim}, handle, ensure_ascii=False)
+            elif matrix.shape[1] != self.dim:
+                logger.warning("向量维度 %s 与存储维度 %s 不一致，跳过写入", matrix.shape[1], self.dim)
+                return 0
+            new_keys: Dict[bytes, int] = {}
+            for i, text in enumerate(texts):
+                key = self._key(text)
+                if key not in self._index and key not in new_keys:
+                    new_keys[key] = i
+            if not new_keys:
+                return 0
+            positions = list(new_keys.values())
+            # 先写向量再写键：崩溃时多出的向量会在下次加载时被截断
+            with open(self._vectors_path, "ab") as handle:
+                handle.write(np.ascontiguousarray(matrix[positions]).tobytes())
+            with open(self._keys_path, "ab") as handle:
+                handle.write(b"".join(new_keys))
+            for offset, key in enumerate(new_keys):
+                self._index[key] = self._rows + offset
+            self._rows += len(new_keys)
+            self._remap(self._rows)
+            return len(new_keys)
+
+    def encode(self, texts: Sequence[str], encode_fn: Callable[[List[str]], Any]) -> np.ndarray:
+        """Look texts up in the store and only call ``encode_fn`` for the missing ones."""
+        rows = self.get_many(texts)
+        missing: Dict[str, List[int]] = {}
+        for i, (text, row) in enumerate(zip(texts, rows)):
+            if row is None:
+                missing.setdefault(text, []).append(i)
+        if missing:
+            pending = list(missing)
+            vecs = np.asarray(encode_fn(pending), dtype=np.float32)
+            self.put_many(pending, vecs)
+            for text, vec in zip(pending, vecs):
+                for i in missing[text]:
+                    rows[i] = vec
+        if not rows:
+            return np.asarray(encode_fn(list(texts)), dtype=np.float32)
+        return np.stack(rows).astype(np.float32, copy=False)
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._index), "dim": self.dim,
+                    "hit_rate": self.hits / total if total else 0.0}
+
+
+_stores: Dict[str, EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(model: Optional[str], directory: Optional[str] = None) -> Optional[EmbeddingStore]:
+    """Shared store for ``model``; ``None`` when disabled (empty ``EMBEDDING_STORE_DIR``)."""
+    if directory is None:
+        directory = get_settings().embedding_store_dir
+    if not directory or not model:
+        return None
+    key = os.path.join(os.path.abspath(directory), model)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            try:
+                store = EmbeddingStore(directory, model)
+            except OSError as err:
+                logger.warning("无法打开向量存储 %s，将直接调用模型: %s", directory, err)
+                return None
+            _stores[key] = store
+        return store
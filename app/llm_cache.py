@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import get_settings
+from .utils.normalize import normalize_query
+
+logger = logging.getLogger(__name__)
+
+_CLEANUP_EVERY = 256
+
+
+def make_cache_key(model: str, query: str, candidates: List[Dict[str, Any]]) -> str:
+    """Key on model, normalized query and the ordered (id, text hash) candidate list."""
+    parts = [
+        [str(c.get("id", "")).strip(), hashlib.sha1(str(c.get("text", "")).encode("utf-8")).hexdigest()]
+        for c in candidates
+    ]
+    raw = json.dumps([model, normalize_query(query or ""), parts], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMDecisionCache:
+    """Two-tier cache for closed_set_pick decisions: in-memory LRU over a SQLite file.
+
+    Async callers use :meth:`aget` / :meth:`aput`: the memory tier is served inline and
+    only SQLite work (including periodic eviction) runs in a worker thread. The two tiers
+    have separate locks so the event loop never waits on a thread holding the connection.
+    """
+
+    def __init__(self, path: Optional[str], ttl_seconds: float = 7 * 24 * 3600,
+                 memory_size: int = 1024, max_entries: int = 100_000):
+        self.path = path
+        self.ttl_seconds = float(ttl_seconds)
+        self.memory_size = max(0, int(memory_size))
+        self.max_entries = max(1, int(max_entries))
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._puts = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if path:
+            try:
+                self._conn = self._open(path)
+            except (sqlite3.Error, OSError) as err:
+                logger.warning("LLM 决策缓存无法打开 %s，仅使用内存缓存: %s", path, err)
+                self._conn = None
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_decisions ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_decisions_accessed ON llm_decisions (accessed_at)")
+        return conn
+
+    def _remember(self, key: str, created_at: float, value: Dict[str, Any]) -> None:
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _get_memory(self, key: str, now: float) -> Optional[Tuple[Dict[str, Any], str]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return dict(entry[1]), "memory"
+                del self._memory[key]
+            if self._conn is None:
+                self.misses += 1
+            return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[Tuple[Dict[str, Any], str]]:
+        with self._db_lock:
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT value, created_at FROM llm_decisions WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None and now - row[1] <= self.ttl_seconds:
+                        self._conn.execute("UPDATE llm_decisions SET accessed_at = ? WHERE key = ?", (now, key))
+                        value = json.loads(row[0])
+                        with self._lock:
+                            self._remember(key, row[1], value)
+                            self.disk_hits += 1
+                        return dict(value), "disk"
+                    if row is not None:
+                        self._conn.execute("DELETE FROM llm_decisions WHERE key = ?", (key,))
+                except (sqlite3.Error, ValueError) as err:
+                    logger.warning("读取 LLM 决策缓存失败: %s", err)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Return ``(decision, tier)`` where tier is ``"memory"`` or ``"disk"``."""
+        now = time.time()
+        hit = self._get_memory(key, now)
+        if hit is not None or self._conn is None:
+            return hit
+        return self._get_disk(key, now)
+
+    async def aget(self, key: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """:meth:`get` for event-loop callers; a SQLite lookup runs in a worker thread."""
+        now = time.time()
+        hit = self._get_memory(key, now)
+        if hit is not None or self._conn is None:
+            return hit
+        return await asyncio.to_thread(self._get_disk, key, now)
+
+    def _put_memory(self, key: str, value: Dict[str, Any], now: float) -> None:
+        with self._lock:
+            self._remember(key, now, dict(value))
+
+    def _put_disk(self, key: str, value: Dict[str, Any], now: float) -> None:
+        with self._db_lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_decisions (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), now, now),
+                )
+                self._puts += 1
+                if self._puts % _CLEANUP_EVERY == 0:
+                    self._evict(now)
+            except sqlite3.Error as err:
+                logger.warning("写入 LLM 决策缓存失败: %s", err)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        self._put_memory(key, value, now)
+        self._put_disk(key, value, now)
+
+    async def aput(self, key: str, value: Dict[str, Any]) -> None:
+        """:meth:`put` for event-loop callers; the SQLite write runs in a worker thread."""
+        now = time.time()
+        self._put_memory(key, value, now)
+        if self._conn is not None:
+            await asyncio.to_thread(self._put_disk, key, value, now)
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM llm_decisions WHERE created_at < ?", (now - self.ttl_seconds,))
+        count = self._conn.execute("SELECT COUNT(*) FROM llm_decisions").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM llm_decisions WHERE key IN ("
+                "SELECT key FROM llm_decisions ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def evict(self) -> None:
+        """Drop expired rows and trim the disk tier to ``max_entries``."""
+        with self._db_lock:
+            if self._conn is not None:
+                self._evict(time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        disk_size = None
+        with self._db_lock:
+            if self._conn is not None:
+                try:
+                    disk_size = self._conn.execute("SELECT COUNT(*) FROM llm_decisions").fetchone()[0]
+                except sqlite3.Error:
+                    disk_size = None
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_size": len(self._memory),
+                "disk_size": disk_size,
+            }
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_llm_cache: Optional[LLMDecisionCache] = None
+
+
+def get_llm_cache() -> Optional[LLMDecisionCache]:
+    global _llm_cache
+    settings = get_settings()
+    if not settings.llm_cache_enabled:
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMDecisionCache(
+            settings.llm_cache_path or None,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+            memory_size=settings.llm_cache_memory_size,
+            max_entries=settings.llm_cache_max_entries,
+        )
+    return _llm_cache
@@ -1,9 +1,11 @@
+import asyncio
 import json
 from typing import Dict, List, Tuple
 
 import httpx
 
 from .config import get_settings
+from .llm_cache import get_llm_cache, make_cache_key
 
 SYSTEM_PROMPT = (
     "你是“故障现象归一化器”。只能从候选中选择一个 ID，或返回 UNKNOWN。"
@@ -14,6 +16,9 @@ MAX_QUERY_LEN = 200
 MAX_CANDIDATE_LEN = 200
 
 _client_pool: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+_inflight: Dict[str, "asyncio.Future[Dict]"] = {}
+_waiters: Dict[str, int] = {}
+_singleflight_stats: Dict[str, int] = {"leaders": 0, "coalesced": 0}
 
 
 def _truncate(text: str, limit: int) -> str:
@@ -32,10 +37,60 @@ async def _get_client(base_url: str, api_key: str) -> httpx.AsyncClient:
     return client
 
 
+def get_singleflight_stats() -> Dict[str, int]:
+    return {**_singleflight_stats, "inflight": len(_inflight)}
+
+
+def _forget_inflight(key: str, task: "asyncio.Future[Dict]") -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+
+
 async def closed_set_pick(query: str, candidates: List[Dict[str, str]]) -> Dict:
     s = get_settings()
     if not s.openai_api_key or not s.openai_model or not s.openai_api_base:
         return {"chosen_id": "UNKNOWN", "confidence": 0.0, "why": "llm not configured"}
+    cache = get_llm_cache()
+    cache_key = make_cache_key(s.openai_model, query, candidates)
+    if cache is not None:
+        hit = await cache.aget(cache_key)
+        if hit is not None:
+            cached, tier = hit
+            return {**cached, "cached": True, "cache_tier": tier}
+    if not s.llm_singleflight:
+        return await _request_pick(s, query, candidates, cache, cache_key)
+
+    # 相同提示词的并发请求共享同一个在途 LLM 调用；shield 保证单个调用方取消不影响其他等待者
+    loop = asyncio.get_running_loop()
+    task = _inflight.get(cache_key)
+    coalesced = task is not None and task.get_loop() is loop
+    if coalesced:
+        _singleflight_stats["coalesced"] += 1
+    else:
+        _singleflight_stats["leaders"] += 1
+        task = loop.create_task(_request_pick(s, query, candidates, cache, cache_key))
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda t, k=cache_key: _forget_inflight(k, t))
+    _waiters[cache_key] = _waiters.get(cache_key, 0) + 1
+    try:
+        out = dict(await asyncio.shield(task))
+    except asyncio.CancelledError:
+        # 最后一个等待者取消时才真正取消在途请求（例如 /match 的投机调用被放弃）
+        if _waiters.get(cache_key, 0) <= 1 and not task.done():
+            task.cancel()
+        raise
+    finally:
+        remaining = _waiters.get(cache_key, 0) - 1
+        if remaining > 0:
+            _waiters[cache_key] = remaining
+        else:
+            _waiters.pop(cache_key, None)
+    if coalesced:
+        out["coalesced"] = True
+    return out
+
+
+async def _request_pick(s, query: str, candidates: List[Dict[str, str]], cache, cache_key: str) -> Dict:
     trimmed_query = _truncate(query, MAX_QUERY_LEN)
     sanitized_candidates = []
     for idx, cand in enumerate(candidates, 1):
@@ -76,6 +131,9 @@ async def closed_set_pick(query: str, candidates: List[Dict[str, str]]) -> Dict:
             out["why"] = _truncate(out["why"], 20)
         else:
             out["why"] = ""
+        if cache is not None:
+            await cache.aput(cache_key, out)
+            out = {**out, "cached": False}
         return out
     except Exception:
         return {"chosen_id": "UNKNOWN", "confidence": 0.0, "why": "llm error"}
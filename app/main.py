@@ -2,21 +2,22 @@
 import asyncio
 import logging
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-import numpy as np
 from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from .config import get_settings
-from .llm_router import closed_set_pick
+from .llm_cache import get_llm_cache
+from .llm_router import closed_set_pick, get_singleflight_stats
 from .models import Candidate, MatchResponse
-from .reranker import get_reranker
+from .reranker import get_rerank_service
 from .searchers.hnswlib_index import HNSWSearcher
 from .searchers.keyword_tfidf import KeywordSearcher
-from .utils.calibration import clamp, compute_stats, logistic_from_stats
+from .utils.calibration import compute_stats
+from .utils.fusion import CandidateColumns, fuse
 from .utils.normalize import normalize_query
 
 # 尝试导入 OpenSearch 匹配器
@@ -45,6 +46,7 @@ _hnsw = HNSWSearcher(settings.data_file, settings.hnsw_index_path)
 _kw = KeywordSearcher(settings.data_file, settings.tfidf_cache_path)
 @app.get("/health")
 def health():
+    llm_cache = get_llm_cache()
     sources = ["local_hnsw", "local_tfidf"]
     if OPENSEARCH_AVAILABLE:
         sources.append("opensearch")
@@ -54,66 +56,110 @@ def health():
         "status": "ok",
         "opensearch_available": OPENSEARCH_AVAILABLE,
         "semantic_available": OPENSEARCH_SEMANTIC_AVAILABLE,
-        "data_sources": sources
+        "data_sources": sources,
+        "corpus": _hnsw.data.stats(),
+        "embedding_cache": _hnsw.embedder.cache_info(),
+        "llm_cache": llm_cache.stats() if llm_cache is not None else None,
+        "llm_singleflight": get_singleflight_stats(),
+        "llm_speculation": dict(_speculation_stats),
     }
+_speculation_stats = {"started": 0, "useful": 0, "wasted": 0}
+
+
+def _predict_gray(pool: List[Candidate]) -> bool:
+    """Guess from recall-stage signals whether the fused top-1 will land in the gray zone."""
+    cosines = [p.cosine for p in pool if p.cosine is not None]
+    if not cosines:
+        return False
+    top_cos = max(cosines)
+    if not settings.speculative_cosine_low <= top_cos < settings.speculative_cosine_high:
+        return False
+    bm25_stats = compute_stats(p.bm25_score for p in pool)
+    if bm25_stats is not None and bm25_stats[1] > 1e-6:
+        top_bm25 = max(p.bm25_score for p in pool if p.bm25_score is not None)
+        if (top_bm25 - bm25_stats[0]) / bm25_stats[1] >= settings.speculative_bm25_z:
+            return False  # 关键词强命中，大概率直接通过
+    return True
+
+
+def _candidate_columns(pool: List[Candidate], system: Optional[str], part: Optional[str],
+                       rerank: Optional[List[float]] = None) -> CandidateColumns:
+    def kg_prior(p: Candidate) -> float:
+        prior = 0.0
+        if system and p.system and system == p.system: prior += 1.0
+        if part and p.part and part == p.part: prior += 0.5
+        return min(1.0, prior)
+    return CandidateColumns.from_columns(
+        [p.id for p in pool],
+        bm25=[p.bm25_score for p in pool],
+        cosine=[p.cosine for p in pool],
+        rerank=rerank,
+        popularity=[p.popularity for p in pool],
+        kg=[kg_prior(p) for p in pool],
+    )
+
+
+def _pre_rerank_top(pool: List[Candidate], system: Optional[str], part: Optional[str],
+                    limit: int = 10) -> List[Candidate]:
+    # 精排分尚未产生：rerank 列全部缺失，只按召回信号与先验排序
+    fused = fuse(_candidate_columns(pool, system, part), settings.fusion_weights.as_dict())
+    return [pool[i] for i in fused.order()[:limit]]
+
+
+async def _discard_speculation(task: Optional["asyncio.Future"]) -> None:
+    if task is None:
+        return
+    _speculation_stats["wasted"] += 1
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception as exc:  # pragma: no cover - closed_set_pick 自身已兜底
+        logger.debug("投机 LLM 调用异常: %s", exc)
+
+
 @app.get("/match", response_model=MatchResponse)
 async def match(q: str = Query(..., description="用户查询"), system: Optional[str] = None, part: Optional[str] = None,
                 model: Optional[str] = None, year: Optional[str] = None, topk_vec: int = 50, topk_kw: int = 50,
                 topn_return: int = 3):
     query = normalize_query(q)
-    reranker = get_reranker()
+    rerank_service = get_rerank_service()
     knn_task = asyncio.to_thread(_hnsw.knn, query, topk=topk_vec)
     bm25_task = asyncio.to_thread(_kw.search, query, topk=topk_kw)
     knn_hits, bm25_hits = await asyncio.gather(knn_task, bm25_task)
-    seen = set(); pool: List[Candidate] = []
+    by_id: Dict[str, Candidate] = {}
     for src in knn_hits + bm25_hits:
         cid = src.get("id", "")
-        if cid in seen:
-            for p in pool:
-                if p.id == cid:
-                    p.bm25_score = p.bm25_score or src.get("bm25_score")
-                    p.cosine = p.cosine or src.get("cosine")
-                    break
+        existing = by_id.get(cid)
+        if existing is not None:
+            existing.bm25_score = existing.bm25_score or src.get("bm25_score")
+            existing.cosine = existing.cosine or src.get("cosine")
             continue
-        seen.add(cid)
-        pool.append(Candidate(id=cid, text=src.get("text",""), system=src.get("system"), part=src.get("part"),
-                              tags=src.get("tags"), popularity=src.get("popularity", 0.0),
-                              bm25_score=src.get("bm25_score"), cosine=src.get("cosine")))
-    texts = [p.text for p in pool]
-    rerank_scores = reranker.score(query, texts, batch_size=16) if texts else []
-    for p, s in zip(pool, rerank_scores):
-        p.rerank_score = float(s)
-
-    rerank_stats = compute_stats(rerank_scores)
-    bm25_raws = [p.bm25_score for p in pool if p.bm25_score is not None]
-    bm25_stats = compute_stats(bm25_raws)
-    cosine_raws = [p.cosine for p in pool if p.cosine is not None]
-    cosine_stats = compute_stats(cosine_raws)
-    def kg_prior(p: Candidate) -> float:
-        prior = 0.0
-        if system and p.system and system == p.system: prior += 1.0
-        if part and p.part and part == p.part: prior += 0.5
-        return min(1.0, prior)
-    weights = settings.fusion_weights.as_dict()
-    for p in pool:
-        cos_raw = p.cosine or 0.0
-        bm_raw = p.bm25_score or 0.0
-        rer_raw = p.rerank_score or 0.0
-
-        rer = logistic_from_stats(rer_raw, rerank_stats, fallback=rer_raw)
-        bm = logistic_from_stats(bm_raw, bm25_stats, fallback=clamp(bm_raw / 20.0))
-        cos = logistic_from_stats(cos_raw, cosine_stats, fallback=clamp(cos_raw))
-        kg = kg_prior(p)
-        raw_pop = max(0.0, float(p.popularity or 0.0))
-        pop = clamp(np.log1p(raw_pop) / 5.0)
-
-        p.final_score = (
-            weights["rerank"] * rer
-            + weights["semantic"] * cos
-            + weights["keyword"] * bm
-            + weights["knowledge"] * kg
-            + weights["popularity"] * pop
+        by_id[cid] = Candidate(id=cid, text=src.get("text",""), system=src.get("system"), part=src.get("part"),
+                               tags=src.get("tags"), popularity=src.get("popularity", 0.0),
+                               bm25_score=src.get("bm25_score"), cosine=src.get("cosine"))
+    pool: List[Candidate] = list(by_id.values())
+    speculative_task = None
+    speculative_ids: List[str] = []
+    if settings.llm_speculative and _predict_gray(pool):
+        spec_top = _pre_rerank_top(pool, system, part)
+        speculative_ids = [c.id for c in spec_top]
+        speculative_task = asyncio.ensure_future(
+            closed_set_pick(query, [{"id": c.id, "text": c.text} for c in spec_top])
         )
+        _speculation_stats["started"] += 1
+    texts = [p.text for p in pool]
+    try:
+        rerank_scores = await rerank_service.score(query, texts)
+    except BaseException:
+        await _discard_speculation(speculative_task)
+        raise
+    fused = fuse(_candidate_columns(pool, system, part, rerank=rerank_scores), settings.fusion_weights.as_dict())
+    columns = zip(fused.rerank.tolist(), fused.semantic.tolist(), fused.keyword.tolist(),
+                  fused.knowledge.tolist(), fused.popularity.tolist(), fused.final.tolist())
+    for p, (rer, cos, bm, kg, pop, final) in zip(pool, columns):
+        p.final_score = final
 
         why = []
         if rer >= 0.6:
@@ -132,24 +178,36 @@ async def match(q: str = Query(..., description="用户查询"), system: Optiona
         p.rerank_score = rer
         p.bm25_score = bm
         p.cosine = cos
-    pool.sort(key=lambda x: x.final_score or 0.0, reverse=True)
+    pool = [pool[i] for i in fused.order()]
     top10 = pool[:10]
     decision = {"mode": "fallback", "chosen_id": None, "confidence": 0.0}
     if not top10:
+        await _discard_speculation(speculative_task)
         return MatchResponse(query=query, top=[], decision=decision)
     top1 = top10[0]; s = top1.final_score or 0.0
     PASS = settings.pass_threshold; GRAY = settings.gray_low_threshold
     if s >= PASS:
+        await _discard_speculation(speculative_task)
         decision = {"mode": "direct", "chosen_id": top1.id, "confidence": s}
         return MatchResponse(query=query, top=top10[:topn_return], decision=decision)
     if s >= GRAY:
-        cand_list = [{"id": c.id, "text": c.text} for c in top10]
-        out = await closed_set_pick(query, cand_list)
+        # 候选顺序也是提示词与 LLM 缓存键的一部分：只有精排后顺序完全一致才复用投机结果
+        speculative = speculative_task is not None and speculative_ids == [c.id for c in top10]
+        if speculative:
+            _speculation_stats["useful"] += 1
+            out = await speculative_task
+        else:
+            await _discard_speculation(speculative_task)
+            cand_list = [{"id": c.id, "text": c.text} for c in top10]
+            out = await closed_set_pick(query, cand_list)
+        speculative_task = None
         chosen = out.get("chosen_id", "UNKNOWN"); conf = float(out.get("confidence", 0.0))
         if chosen != "UNKNOWN":
             chosen_c = next((c for c in top10 if c.id == chosen), top1)
-            decision = {"mode": "llm", "chosen_id": chosen, "confidence": max(conf, chosen_c.final_score or 0.0)}
+            decision = {"mode": "llm", "chosen_id": chosen, "confidence": max(conf, chosen_c.final_score or 0.0),
+                        "llm_cached": bool(out.get("cached", False)), "llm_speculative": speculative}
             return MatchResponse(query=query, top=top10[:topn_return], decision=decision)
+    await _discard_speculation(speculative_task)
     decision = {"mode": "fallback", "chosen_id": None, "confidence": float(s)}
     return MatchResponse(query=query, top=top10[:topn_return], decision=decision)
 
@@ -210,7 +268,7 @@ async def opensearch_match(request: OpenSearchRequest):
             )
         else:
             # 仅返回搜索结果
-            result = opensearch_matcher.search_phenomena(
+            result = await opensearch_matcher.search_phenomena_async(
                 query=request.q,
                 system=request.system,
                 part=request.part,
@@ -234,6 +292,12 @@ async def opensearch_match(request: OpenSearchRequest):
             "top": []
         }
 
+@app.on_event("shutdown")
+async def close_background_clients():
+    await get_rerank_service().aclose()
+    if OPENSEARCH_AVAILABLE:
+        await opensearch_matcher.aclose()
+
 @app.get("/opensearch/stats")
 async def opensearch_stats():
     """获取 OpenSearch 索引统计信息"""
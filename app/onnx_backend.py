@@ -0,0 +1,238 @@
+"""ONNX Runtime inference backend for the embedder and the reranker.
+
+Models are exported once from their PyTorch checkpoints into
+``<onnx_model_dir>/<model name>/`` (optionally with an int8 dynamically
+quantized copy) and then served through ``onnxruntime`` sessions that expose
+the same ``encode`` / ``score`` interfaces as the torch implementations.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover - onnxruntime 为可选依赖
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+ONNX_FILENAME = "model.onnx"
+QUANTIZED_FILENAME = "model.int8.onnx"
+META_FILENAME = "onnx_meta.json"
+MODEL_INPUT_NAMES = ("input_ids", "attention_mask", "token_type_ids")
+
+
+def model_export_dir(base_dir: str, model_name: str) -> str:
+    """Return the directory holding the exported copy of ``model_name``."""
+
+    safe_name = model_name.strip("/").replace("/", "__")
+    return os.path.join(base_dir, safe_name)
+
+
+def _require_onnxruntime() -> None:
+    if ort is None:
+        raise RuntimeError("未安装 onnxruntime，无法使用 ONNX 推理后端 (pip install onnxruntime)")
+
+
+def _quantize(src_path: str, dst_path: str) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(src_path, dst_path, weight_type=QuantType.QInt8)
+
+
+def _export(module: Any, tokenizer: Any, output_dir: str, output_name: str, meta: Dict[str, Any],
+            *, output_axes: Dict[int, str], quantize: bool, opset: int) -> str:
+    import torch
+
+    class _Wrapper(torch.nn.Module):
+        def __init__(self, inner: Any, input_names: Sequence[str]):
+            super().__init__()
+            self.inner = inner
+            self.input_names = list(input_names)
+
+        def forward(self, *tensors):
+            outputs = self.inner(**dict(zip(self.input_names, tensors)))
+            return outputs[0]
+
+    os.makedirs(output_dir, exist_ok=True)
+    sample = tokenizer(["示例输入"], ["示例候选"], padding=True, truncation=True, return_tensors="pt")
+    input_names = [name for name in MODEL_INPUT_NAMES if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes[output_name] = dict(output_axes)
+
+    wrapper = _Wrapper(module, input_names).eval()
+    onnx_path = os.path.join(output_dir, ONNX_FILENAME)
+    with torch.no_grad():
+        torch.onnx.export(
+            wrapper,
+            tuple(sample[name] for name in input_names),
+            onnx_path,
+            input_names=input_names,
+            output_names=[output_name],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+    tokenizer.save_pretrained(output_dir)
+    if quantize:
+        _quantize(onnx_path, os.path.join(output_dir, QUANTIZED_FILENAME))
+    with open(os.path.join(output_dir, META_FILENAME), "w", encoding="utf-8") as fh:
+        json.dump({**meta, "input_names": input_names, "quantized": bool(quantize)}, fh, ensure_ascii=False, indent=2)
+    logger.info("已导出 ONNX 模型: %s -> %s", meta.get("model_name"), output_dir)
+    return output_dir
+
+
+def export_reranker(model_name: str, output_dir: str, *, quantize: bool = True, opset: int = 14) -> str:
+    """Export a cross-encoder (``AutoModelForSequenceClassification``) to ONNX."""
+
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, trust_remote_code=True)
+    meta = {"kind": "reranker", "model_name": model_name, "max_length": 512}
+    return _export(model.eval(), tokenizer, output_dir, "logits", meta,
+                   output_axes={0: "batch"}, quantize=quantize, opset=opset)
+
+
+def export_embedder(model_name: str, output_dir: str, *, quantize: bool = True, opset: int = 14) -> str:
+    """Export the transformer of a SentenceTransformer model; pooling runs in numpy."""
+
+    from sentence_transformers import SentenceTransformer
+
+    st_model = SentenceTransformer(model_name, trust_remote_code=True, device="cpu")
+    transformer = st_model[0]
+    pooling_mode = "mean"
+    for module in st_model:
+        getter = getattr(module, "get_pooling_mode_str", None)
+        if callable(getter):
+            pooling_mode = getter()
+            break
+    meta = {
+        "kind": "embedder",
+        "model_name": model_name,
+        "max_length": int(st_model.max_seq_length or 512),
+        "pooling": pooling_mode,
+        "dimension": int(st_model.get_sentence_embedding_dimension()),
+    }
+    # last_hidden_state 为 (batch, sequence, hidden)，序列维需与输入一起声明为动态
+    return _export(transformer.auto_model.eval(), transformer.tokenizer, output_dir, "last_hidden_state", meta,
+                   output_axes={0: "batch", 1: "sequence"}, quantize=quantize, opset=opset)
+
+
+def _create_session(path: str) -> Any:
+    _require_onnxruntime()
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    threads = os.getenv("ONNX_INTRA_OP_THREADS")
+    if threads:
+        options.intra_op_num_threads = int(threads)
+    return ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
+
+class _OnnxModel:
+    def __init__(self, model_dir: str, quantized: bool = True):
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(model_dir, META_FILENAME), "r", encoding="utf-8") as fh:
+            self.meta: Dict[str, Any] = json.load(fh)
+        quantized_path = os.path.join(model_dir, QUANTIZED_FILENAME)
+        if quantized and not os.path.exists(quantized_path):
+            logger.warning("未找到量化模型 %s，改用 fp32 ONNX 模型", quantized_path)
+            quantized = False
+        self.quantized = quantized
+        self.model_name = self.meta.get("model_name", model_dir)
+        self.max_length = int(self.meta.get("max_length", 512))
+        self.session = _create_session(quantized_path if quantized else os.path.join(model_dir, ONNX_FILENAME))
+        self.input_names = [item.name for item in self.session.get_inputs()]
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+    def _run(self, *texts: Sequence[Any]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        encoded = self.tokenizer(*texts, padding=True, truncation=True, max_length=self.max_length,
+                                 return_tensors="np")
+        feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+        return self.session.run(None, feeds)[0], feeds
+
+
+class OnnxReranker(_OnnxModel):
+    """Drop-in replacement for ``app.reranker.Reranker`` backed by onnxruntime."""
+
+    def score(self, query: str, candidates: List[str], batch_size: int = 16) -> List[float]:
+        return self.score_pairs([(query, c) for c in candidates], batch_size=batch_size)
+
+    def score_pairs(self, pairs: Sequence[Tuple[str, str]], batch_size: int = 16) -> List[float]:
+        order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+        scores = [0.0] * len(pairs)
+        for i in range(0, len(order), batch_size):
+            idx = order[i:i + batch_size]
+            logits, _ = self._run([pairs[j][0] for j in idx], [pairs[j][1] for j in idx])
+            probs = 1.0 / (1.0 + np.exp(-logits.reshape(len(idx), -1)[:, 0]))
+            for j, p in zip(idx, probs.tolist()):
+                scores[j] = p
+        return scores
+
+
+class OnnxSentenceEncoder(_OnnxModel):
+    """Subset of the ``SentenceTransformer`` API used by ``app.embedding.Embedder``."""
+
+    def get_sentence_embedding_dimension(self) -> Optional[int]:
+        return self.meta.get("dimension")
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32, normalize_embeddings: bool = False,
+               show_progress_bar: bool = False, **_: Any) -> np.ndarray:
+        texts = list(texts)
+        chunks: List[np.ndarray] = []
+        for i in range(0, len(texts), batch_size):
+            hidden, feeds = self._run(texts[i:i + batch_size])
+            if self.meta.get("pooling") == "cls":
+                pooled = hidden[:, 0]
+            else:
+                mask = feeds["attention_mask"][..., None].astype(np.float32)
+                pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            chunks.append(pooled.astype(np.float32))
+        if not chunks:
+            return np.zeros((0, self.meta.get("dimension") or 0), dtype=np.float32)
+        embeddings = np.concatenate(chunks, axis=0)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings
+
+
+def load_onnx_reranker(model_name: str, base_dir: str, *, quantize: bool = True) -> OnnxReranker:
+    """Load the exported reranker, exporting it first when missing."""
+
+    _require_onnxruntime()
+    model_dir = model_export_dir(base_dir, model_name)
+    if not os.path.exists(os.path.join(model_dir, META_FILENAME)):
+        export_reranker(model_name, model_dir, quantize=quantize)
+    return OnnxReranker(model_dir, quantized=quantize)
+
+
+def load_onnx_embedder(model_name: str, base_dir: str, *, quantize: bool = True) -> OnnxSentenceEncoder:
+    """Load the exported embedder, exporting it first when missing."""
+
+    _require_onnxruntime()
+    model_dir = model_export_dir(base_dir, model_name)
+    if not os.path.exists(os.path.join(model_dir, META_FILENAME)):
+        export_embedder(model_name, model_dir, quantize=quantize)
+    return OnnxSentenceEncoder(model_dir, quantized=quantize)
+
+
+def compare_outputs(reference: Sequence[Any], candidate: Sequence[Any]) -> Dict[str, float]:
+    """Return absolute-difference statistics between torch and ONNX outputs."""
+
+    ref = np.asarray(reference, dtype=np.float64)
+    cand = np.asarray(candidate, dtype=np.float64)
+    if ref.shape != cand.shape:
+        raise ValueError(f"输出形状不一致: {ref.shape} vs {cand.shape}")
+    diff = np.abs(ref - cand)
+    return {
+        "max_abs_diff": float(diff.max()) if diff.size else 0.0,
+        "mean_abs_diff": float(diff.mean()) if diff.size else 0.0,
+    }
@@ -5,20 +5,27 @@
 按照 README.md 设计，从 OpenSearch 中查询匹配故障现象
 """
 
-import math
+import asyncio
+import json
 import os
 import re
 import sys
 import logging
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
 
+import numpy as np
 from opensearchpy import OpenSearch
 
+try:
+    from opensearchpy import AsyncOpenSearch
+except ImportError:  # pragma: no cover - 需要安装 opensearch-py[async]
+    AsyncOpenSearch = None
+
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from scripts.opensearch_config import OPENSEARCH_CONFIG, INDEX_CONFIG
-from .utils.calibration import clamp, compute_stats, logistic_from_stats
+from .utils.fusion import as_column, column_stats, logistic_normalize, popularity_norm
 
 try:
     from app.embedding import get_embedder  # type: ignore
@@ -28,6 +35,11 @@ except Exception:  # pragma: no cover - 仅在模型不可用时触发
 logger = logging.getLogger(__name__)
 
 
+def _search_index() -> str:
+    """查询目标：蓝绿部署时为别名，旧配置未设置 alias 时回退到索引名。"""
+    return INDEX_CONFIG.get('alias') or INDEX_CONFIG['name']
+
+
 PHENOMENA_MULTI_MATCH_FIELDS: List[str] = [
     "text^3.0",
     "symptoms^3.0",
@@ -119,6 +131,78 @@ MODEL_YEAR_FIELDS: List[str] = [
 ]
 
 
+# _extract_common_fields / _extract_source 读取到的全部字段，用于裁剪 _source
+PHENOMENA_SOURCE_FIELDS: List[str] = [
+    "id",
+    "text",
+    "fault_symptom",
+    "symptoms",
+    "symptom",
+    "summary",
+    "fault_description",
+    "fault_desc",
+    "discussion",
+    "fault_point",
+    "fault_location",
+    "faultDescription",
+    "analysis",
+    "system",
+    "system_name",
+    "systemCategory",
+    "system_category",
+    "part",
+    "component",
+    "component_name",
+    "control_unit",
+    "fault_part",
+    "tags",
+    "labels",
+    "tag_list",
+    "vehicletype",
+    "vehicle_model",
+    "vehicle_name",
+    "vehiclename",
+    "model",
+    "series",
+    "subseries",
+    "car_model",
+    "vehiclebrand",
+    "vehicle_brand",
+    "brand",
+    "car_brand",
+    "topic",
+    "category",
+    "fault_category",
+    "fault_type",
+    "solution",
+    "repair_solution",
+    "measure",
+    "fix",
+    "egon",
+    "modelyear",
+    "model_year",
+    "year",
+    "spare1",
+    "spare2",
+    "spare4",
+    "spare15",
+    "faultcode",
+    "fault_code",
+    "dtc",
+    "code",
+    "createtime",
+    "money",
+    "popularity",
+    "popularity_score",
+    "searchNum",
+    "search_num",
+    "rate",
+    "searchContent",
+    "search_content",
+    "search",
+]
+
+
 def _pick_first(source: Dict[str, Any], keys: Sequence[str], *, default: Any = None) -> Any:
     for key in keys:
         if not key:
@@ -263,6 +347,7 @@ class OpenSearchMatcher:
     def __init__(self):
         """初始化 OpenSearch 连接"""
         self.server_version = ''
+        self.async_client = None
         version_tuple: Tuple[int, ...] = tuple()
         try:
             self.client = OpenSearch(
@@ -291,6 +376,7 @@ class OpenSearchMatcher:
         self.vector_field = INDEX_CONFIG.get('vector_field', 'text_vector')
         self.vector_num_candidates = INDEX_CONFIG.get('vector_num_candidates', 200)
         self.default_semantic_weight = INDEX_CONFIG.get('default_semantic_weight', 0.6)
+        self.use_msearch = bool(INDEX_CONFIG.get('use_msearch', True))
 
         self.embedder = None
         self.semantic_available = False
@@ -311,7 +397,7 @@ class OpenSearchMatcher:
                 if self.vector_field and not self._vector_field_is_configured():
                     logger.warning(
                         "索引 %s 的向量字段 %s 未配置为 knn_vector 类型，语义检索已自动禁用",
-                        INDEX_CONFIG.get('name'),
+                        _search_index(),
                         self.vector_field,
                     )
                     self.semantic_available = False
@@ -381,6 +467,20 @@ class OpenSearchMatcher:
             })
         return filters
 
+    def _phenomena_source_filter(self) -> Dict[str, List[str]]:
+        """现象检索的 _source 裁剪规则，向量字段始终排除"""
+
+        includes = INDEX_CONFIG.get('phenomena_source_includes')
+        if includes is None:
+            includes = PHENOMENA_SOURCE_FIELDS
+        excludes = list(INDEX_CONFIG.get('phenomena_source_excludes') or [])
+        if self.vector_field and self.vector_field not in excludes:
+            excludes.append(self.vector_field)
+        source_filter: Dict[str, List[str]] = {"excludes": excludes}
+        if includes:
+            source_filter["includes"] = list(includes)
+        return source_filter
+
     def _build_knn_body(self,
                         query_vector: Sequence[float],
                         vector_k: int,
@@ -408,6 +508,7 @@ class OpenSearchMatcher:
             bool_query["must"].append(knn_clause)
             return {
                 "size": vector_k,
+                "_source": self._phenomena_source_filter(),
                 "query": {
                     "bool": bool_query
                 }
@@ -415,6 +516,7 @@ class OpenSearchMatcher:
 
         return {
             "size": vector_k,
+            "_source": self._phenomena_source_filter(),
             "query": {
                 "bool": bool_query
             },
@@ -501,7 +603,7 @@ class OpenSearchMatcher:
         return False
 
     def _vector_field_is_configured(self) -> bool:
-        index_name = INDEX_CONFIG.get('name')
+        index_name = _search_index()
         if not index_name:
             return False
         try:
@@ -548,6 +650,334 @@ class OpenSearchMatcher:
         return doc_id, source
 
 
+    def _build_phenomena_body(self, query: str, filters: Sequence[Dict], size: int) -> Dict[str, Any]:
+        return {
+            "query": {
+                "bool": {
+                    "must": {
+                        "multi_match": {
+                            "query": query,
+                            "fields": PHENOMENA_MULTI_MATCH_FIELDS,
+                            "type": "best_fields",
+                            "fuzziness": "AUTO",
+                            "minimum_should_match": "75%"
+                        }
+                    },
+                    "filter": filters,
+                    "should": [
+                        {
+                            "range": {
+                                "popularity": {"gte": 50}
+                            }
+                        },
+                        {
+                            "range": {
+                                "popularity_score": {"gte": 50}
+                            }
+                        }
+                    ]
+                }
+            },
+            "size": size,
+            "_source": self._phenomena_source_filter(),
+            "highlight": {
+                "fields": {
+                    "text": {
+                        "fragment_size": 150,
+                        "number_of_fragments": 1,
+                        "pre_tags": ["<mark>"],
+                        "post_tags": ["</mark>"]
+                    },
+                    "symptoms": {
+                        "fragment_size": 150,
+                        "number_of_fragments": 1,
+                        "pre_tags": ["<mark>"],
+                        "post_tags": ["</mark>"]
+                    },
+                    "fault_symptom": {
+                        "fragment_size": 150,
+                        "number_of_fragments": 1,
+                        "pre_tags": ["<mark>"],
+                        "post_tags": ["</mark>"]
+                    },
+                    "discussion": {
+                        "fragment_size": 100,
+                        "number_of_fragments": 1,
+                        "pre_tags": ["<mark>"],
+                        "post_tags": ["</mark>"]
+                    },
+                    "fault_point": {
+                        "fragment_size": 100,
+                        "number_of_fragments": 1,
+                        "pre_tags": ["<mark>"],
+                        "post_tags": ["</mark>"]
+                    }
+                }
+            },
+            "sort": [
+                {"_score": {"order": "desc"}},
+                {"popularity": {"order": "desc", "missing": "_last", "unmapped_type": "float"}},
+                {"search_num": {"order": "desc", "missing": "_last", "unmapped_type": "integer"}},
+                {"searchNum": {"order": "desc", "missing": "_last", "unmapped_type": "integer"}}
+            ]
+        }
+
+    def _resolve_semantic_options(self,
+                                  use_semantic: bool,
+                                  semantic_weight: Optional[float],
+                                  vector_k: int,
+                                  size: int) -> Tuple[bool, float, int]:
+        effective_semantic = bool(use_semantic and self.semantic_available)
+        semantic_weight = self.default_semantic_weight if semantic_weight is None else float(semantic_weight)
+        semantic_weight = min(max(semantic_weight, 0.0), 1.0)
+
+        try:
+            vector_k = max(1, int(vector_k))
+        except (TypeError, ValueError):
+            vector_k = max(1, size)
+        return effective_semantic, semantic_weight, vector_k
+
+    @staticmethod
+    def _new_result_item(doc_id: str, source: Dict, hit: Dict, sources: List[str]) -> Dict[str, Any]:
+        fields = _extract_common_fields(source)
+        return {
+            "id": doc_id,
+            **fields,
+            "highlight": hit.get('highlight', {}) or {},
+            "sources": sources,
+            "bm25_raw": 0.0,
+            "semantic_raw": 0.0,
+            "bm25_score": 0.0,
+            "semantic_score": 0.0,
+            "cosine": 0.0,
+            "rerank_score": 0.0
+        }
+
+    def _collect_keyword_hits(self, response: Dict) -> Dict[str, Dict]:
+        merged: Dict[str, Dict] = {}
+        for hit in response['hits']['hits']:
+            doc_id, source = self._extract_source(hit)
+            item = self._new_result_item(doc_id, source, hit, ["keyword"])
+            item['bm25_raw'] = float(hit.get('_score') or 0.0)
+            merged[doc_id] = item
+        return merged
+
+    def _merge_semantic_hits(self, merged: Dict[str, Dict], knn_resp: Dict) -> None:
+        for hit in knn_resp['hits']['hits']:
+            doc_id, source = self._extract_source(hit)
+            semantic_raw = float(hit.get('_score') or 0.0)
+            item = merged.get(doc_id)
+            if not item:
+                item = self._new_result_item(doc_id, source, hit, [])
+                merged[doc_id] = item
+            item['semantic_raw'] = max(item.get('semantic_raw', 0.0), semantic_raw)
+            cosine_norm = (semantic_raw + 1.0) / 2.0
+            cosine_norm = min(1.0, max(0.0, cosine_norm))
+            item['cosine'] = max(item.get('cosine', 0.0), cosine_norm)
+            sources = set(item.get('sources', []))
+            sources.add('semantic')
+            item['sources'] = list(sources)
+            if not item.get('highlight'):
+                item['highlight'] = hit.get('highlight', {})
+
+    def _should_retry_knn(self, knn_err: Exception) -> bool:
+        """根据 kNN 查询异常调整查询语法；返回 True 表示应使用新语法重试"""
+
+        if (
+            self._knn_supports_num_candidates
+            and self._should_disable_num_candidates(knn_err)
+        ):
+            logger.warning(
+                "kNN 查询不支持 num_candidates 参数，自动移除: %s",
+                knn_err
+            )
+            self._knn_supports_num_candidates = False
+            return True
+        if (
+            self._knn_query_style == 'top_level'
+            and self._should_use_nested_knn(knn_err)
+        ):
+            logger.warning(
+                "顶层 kNN 查询失败，自动回退到 bool.must 语法: %s",
+                knn_err
+            )
+            self._knn_query_style = 'nested'
+            return True
+        if self._should_disable_vector_field(knn_err):
+            logger.error(
+                "语义检索失败: 向量字段 %s 未配置为 knn_vector, 已禁用语义检索: %s",
+                self.vector_field,
+                knn_err,
+            )
+            self.semantic_available = False
+            return False
+        logger.error(f"语义检索失败: {knn_err}")
+        return False
+
+    def _search_knn(self,
+                    query_vector: Sequence[float],
+                    vector_k: int,
+                    filters: Sequence[Dict]) -> Optional[Dict]:
+        attempted_states: Set[Tuple[str, bool]] = set()
+        while True:
+            state = (self._knn_query_style, self._knn_supports_num_candidates)
+            if state in attempted_states:
+                logger.error("语义检索失败: kNN 查询在重复状态下仍无法执行")
+                return None
+            attempted_states.add(state)
+            knn_body = self._build_knn_body(query_vector, vector_k, filters)
+            try:
+                return self.client.search(
+                    index=_search_index(),
+                    body=knn_body
+                )
+            except Exception as knn_err:
+                if not self._should_retry_knn(knn_err):
+                    return None
+
+    @staticmethod
+    def _build_msearch_body(keyword_body: Dict[str, Any], knn_body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        index_name = _search_index()
+        return [{"index": index_name}, keyword_body, {"index": index_name}, knn_body]
+
+    @staticmethod
+    def _split_msearch_responses(result: Dict) -> Tuple[Dict, Optional[Dict], Optional[Exception]]:
+        """拆分 _msearch 响应：关键词子查询失败直接抛出，kNN 子查询失败以异常对象返回"""
+
+        responses = result.get('responses') or []
+        if len(responses) != 2:
+            raise RuntimeError(f"_msearch 返回的子响应数量异常: {len(responses)}")
+        keyword_resp, knn_resp = responses
+        if keyword_resp.get('error'):
+            raise RuntimeError(
+                f"{keyword_resp.get('status', '')} {json.dumps(keyword_resp['error'], ensure_ascii=False)}"
+            )
+        if knn_resp.get('error'):
+            knn_err = Exception(
+                f"{knn_resp.get('status', '')} {json.dumps(knn_resp['error'], ensure_ascii=False)}"
+            )
+            return keyword_resp, None, knn_err
+        return keyword_resp, knn_resp, None
+
+    def _msearch_phenomena(self,
+                           keyword_body: Dict[str, Any],
+                           query_vector: Sequence[float],
+                           vector_k: int,
+                           filters: Sequence[Dict]) -> Tuple[Dict, Optional[Dict]]:
+        """通过一次 _msearch 同时执行关键词与 kNN 召回"""
+
+        knn_body = self._build_knn_body(query_vector, vector_k, filters)
+        try:
+            result = self.client.msearch(body=self._build_msearch_body(keyword_body, knn_body))
+        except Exception as msearch_err:
+            # _msearch 请求体在 REST 层整体解析，kNN 语法不被支持时整个请求直接 400，
+            # 不会落到子响应的 error 中；此时降级语法后改走串行检索
+            logger.warning("_msearch 请求失败，回退到串行检索: %s", msearch_err)
+            response = self.client.search(index=_search_index(), body=keyword_body)
+            knn_resp = None
+            if self._should_retry_knn(msearch_err):
+                knn_resp = self._search_knn(query_vector, vector_k, filters)
+            return response, knn_resp
+        response, knn_resp, knn_err = self._split_msearch_responses(result)
+        if knn_err is not None:
+            # 子查询语法不被支持时按降级后的语法单独重试
+            knn_resp = None
+            if self._should_retry_knn(knn_err):
+                knn_resp = self._search_knn(query_vector, vector_k, filters)
+        return response, knn_resp
+
+    def _fuse_phenomena(self,
+                        query: str,
+                        merged: Dict[str, Dict],
+                        total: int,
+                        *,
+                        system: Optional[str],
+                        part: Optional[str],
+                        size: int,
+                        effective_semantic: bool,
+                        semantic_weight: float,
+                        vector_k: int) -> Dict:
+        items = list(merged.values())
+        bm25_col = as_column(item.get('bm25_raw') for item in items)
+        semantic_col = as_column(item.get('semantic_raw') for item in items)
+        popularity_vals = [_coerce_float(item.get('popularity', 0)) for item in items]
+        search_nums = [max(0, _coerce_int(item.get('searchNum', 0))) for item in items]
+
+        bm25_norms, bm25_stats = logistic_normalize(
+            bm25_col,
+            np.clip(np.nan_to_num(bm25_col, nan=0.0) / 10.0, 0.0, 1.0),
+        )
+        semantic_stats = column_stats(semantic_col)
+        if effective_semantic:
+            semantic_norms, _ = logistic_normalize(
+                semantic_col,
+                np.clip((np.nan_to_num(semantic_col, nan=0.0) + 1.0) / 2.0, 0.0, 1.0),
+            )
+        else:
+            semantic_norms = np.zeros(len(items))
+        popularity_norms = popularity_norm(as_column(popularity_vals))
+        search_norms = np.clip(np.asarray(search_nums, dtype=np.float64) / 50.0, 0.0, 1.0)
+
+        fusion_bases = semantic_weight * semantic_norms + (1.0 - semantic_weight) * bm25_norms
+        final_scores = np.minimum(1.0, fusion_bases + 0.05 * popularity_norms + 0.05 * search_norms)
+
+        results: List[Dict] = []
+        rows = zip(items, popularity_vals, search_nums, bm25_norms.tolist(), semantic_norms.tolist(),
+                   fusion_bases.tolist(), final_scores.tolist())
+        for item, popularity_val, search_num_val, bm25_norm, semantic_norm, fusion_base, final_score in rows:
+            item['popularity'] = popularity_val
+            item['searchNum'] = search_num_val
+
+            why: List[str] = []
+            if semantic_norm >= 0.6:
+                why.append("语义近")
+            elif semantic_norm >= 0.4:
+                why.append("语义相关")
+            if bm25_norm >= 0.2:
+                why.append("关键词命中")
+            if system and item.get('system') == system:
+                why.append("系统一致")
+            if part and item.get('part') and part in item.get('part'):
+                why.append("部件相近")
+            if popularity_val > 100:
+                why.append("热门案例")
+            elif popularity_val > 50:
+                why.append("常见问题")
+
+            item['final_score'] = final_score
+            item['rerank_score'] = fusion_base
+            item['bm25_score'] = bm25_norm
+            item['semantic_score'] = semantic_norm
+            item['cosine'] = semantic_norm
+            item['why'] = why or ["文本匹配"]
+            item['sources'] = sorted(set(item.get('sources', [])))
+
+            results.append(item)
+
+        results = [results[i] for i in np.argsort(-final_scores, kind="stable")]
+
+        metadata = {
+            "semantic_used": effective_semantic,
+            "semantic_weight": semantic_weight if effective_semantic else 0.0,
+            "vector_k": vector_k if effective_semantic else 0,
+            "keyword_size": size,
+            "bm25_stats": {
+                "mean": bm25_stats[0],
+                "std": bm25_stats[1],
+            } if bm25_stats else None,
+            "semantic_stats": {
+                "mean": semantic_stats[0],
+                "std": semantic_stats[1],
+            } if semantic_stats else None,
+        }
+
+        return {
+            "query": query,
+            "total": total,
+            "top": results[:size],
+            "metadata": metadata
+        }
+
     def search_phenomena(self,
                         query: str,
                         system: Optional[str] = None,
@@ -562,282 +992,202 @@ class OpenSearchMatcher:
 
         try:
             filters = self._build_filters(system, part, vehicletype, fault_code)
+            keyword_body = self._build_phenomena_body(query, filters, size)
 
-            search_body = {
-                "query": {
-                    "bool": {
-                        "must": {
-                            "multi_match": {
-                                "query": query,
-                                "fields": PHENOMENA_MULTI_MATCH_FIELDS,
-                                "type": "best_fields",
-                                "fuzziness": "AUTO",
-                                "minimum_should_match": "75%"
-                            }
-                        },
-                        "filter": filters,
-                        "should": [
-                            {
-                                "range": {
-                                    "popularity": {"gte": 50}
-                                }
-                            },
-                            {
-                                "range": {
-                                    "popularity_score": {"gte": 50}
-                                }
-                            }
-                        ]
-                    }
-                },
-                "size": size,
-                "highlight": {
-                    "fields": {
-                        "text": {
-                            "fragment_size": 150,
-                            "number_of_fragments": 1,
-                            "pre_tags": ["<mark>"],
-                            "post_tags": ["</mark>"]
-                        },
-                        "symptoms": {
-                            "fragment_size": 150,
-                            "number_of_fragments": 1,
-                            "pre_tags": ["<mark>"],
-                            "post_tags": ["</mark>"]
-                        },
-                        "fault_symptom": {
-                            "fragment_size": 150,
-                            "number_of_fragments": 1,
-                            "pre_tags": ["<mark>"],
-                            "post_tags": ["</mark>"]
-                        },
-                        "discussion": {
-                            "fragment_size": 100,
-                            "number_of_fragments": 1,
-                            "pre_tags": ["<mark>"],
-                            "post_tags": ["</mark>"]
-                        },
-                        "fault_point": {
-                            "fragment_size": 100,
-                            "number_of_fragments": 1,
-                            "pre_tags": ["<mark>"],
-                            "post_tags": ["</mark>"]
-                        }
-                    }
-                },
-                "sort": [
-                    {"_score": {"order": "desc"}},
-                    {"popularity": {"order": "desc", "missing": "_last", "unmapped_type": "float"}},
-                    {"search_num": {"order": "desc", "missing": "_last", "unmapped_type": "integer"}},
-                    {"searchNum": {"order": "desc", "missing": "_last", "unmapped_type": "integer"}}
-                ]
-            }
-
-            response = self.client.search(
-                index=INDEX_CONFIG['name'],
-                body=search_body,
-                size=size
+            effective_semantic, semantic_weight, vector_k = self._resolve_semantic_options(
+                use_semantic, semantic_weight, vector_k, size
             )
+            semantic_requested = bool(effective_semantic and self.vector_field)
+            query_vector = self._encode_query(query) if semantic_requested else None
 
-            merged: Dict[str, Dict] = {}
-            for hit in response['hits']['hits']:
-                doc_id, source = self._extract_source(hit)
-                bm25_raw = float(hit.get('_score') or 0.0)
-                fields = _extract_common_fields(source)
-                merged[doc_id] = {
-                    "id": doc_id,
-                    **fields,
-                    "highlight": hit.get('highlight', {}) or {},
-                    "sources": ["keyword"],
-                    "bm25_raw": bm25_raw,
-                    "semantic_raw": 0.0,
-                    "bm25_score": 0.0,
-                    "semantic_score": 0.0,
-                    "cosine": 0.0,
-                    "rerank_score": 0.0
-                }
+            knn_resp = None
+            if query_vector is not None and self.use_msearch:
+                response, knn_resp = self._msearch_phenomena(keyword_body, query_vector, vector_k, filters)
+            else:
+                response = self.client.search(
+                    index=_search_index(),
+                    body=keyword_body,
+                    size=size
+                )
+                if query_vector is not None:
+                    knn_resp = self._search_knn(query_vector, vector_k, filters)
+
+            merged = self._collect_keyword_hits(response)
+            if semantic_requested:
+                if knn_resp is None:
+                    effective_semantic = False
+                else:
+                    self._merge_semantic_hits(merged, knn_resp)
+
+            return self._fuse_phenomena(
+                query,
+                merged,
+                response['hits']['total']['value'],
+                system=system,
+                part=part,
+                size=size,
+                effective_semantic=effective_semantic,
+                semantic_weight=semantic_weight,
+                vector_k=vector_k,
+            )
+        except Exception as e:
+            logger.error(f"搜索失败: {e}")
+            return {
+                "query": query,
+                "total": 0,
+                "top": [],
+                "error": str(e)
+            }
 
-            effective_semantic = bool(use_semantic and self.semantic_available)
-            semantic_weight = self.default_semantic_weight if semantic_weight is None else float(semantic_weight)
-            semantic_weight = min(max(semantic_weight, 0.0), 1.0)
+    # ------------------------------------------------------------------
+    # 异步检索：基于 AsyncOpenSearch，避免阻塞事件循环
+    # ------------------------------------------------------------------
+    @property
+    def async_enabled(self) -> bool:
+        return bool(AsyncOpenSearch is not None and OPENSEARCH_CONFIG.get('async_enabled', True))
 
-            try:
-                vector_k = max(1, int(vector_k))
-            except (TypeError, ValueError):
-                vector_k = max(1, size)
+    def _get_async_client(self) -> Any:
+        """惰性创建 AsyncOpenSearch 客户端，必须在事件循环内调用"""
 
-            if effective_semantic and self.vector_field:
-                query_vector = self._encode_query(query)
-                if query_vector is not None:
-                    knn_resp = None
-                    attempted_states: Set[Tuple[str, bool]] = set()
-                    while True:
-                        state = (self._knn_query_style, self._knn_supports_num_candidates)
-                        if state in attempted_states:
-                            logger.error("语义检索失败: kNN 查询在重复状态下仍无法执行")
-                            break
-                        attempted_states.add(state)
-                        knn_body = self._build_knn_body(query_vector, vector_k, filters)
-                        try:
-                            knn_resp = self.client.search(
-                                index=INDEX_CONFIG['name'],
-                                body=knn_body
-                            )
-                            break
-                        except Exception as knn_err:
-                            if (
-                                self._knn_supports_num_candidates
-                                and self._should_disable_num_candidates(knn_err)
-                            ):
-                                logger.warning(
-                                    "kNN 查询不支持 num_candidates 参数，自动移除: %s",
-                                    knn_err
-                                )
-                                self._knn_supports_num_candidates = False
-                                continue
-                            if (
-                                self._knn_query_style == 'top_level'
-                                and self._should_use_nested_knn(knn_err)
-                            ):
-                                logger.warning(
-                                    "顶层 kNN 查询失败，自动回退到 bool.must 语法: %s",
-                                    knn_err
-                                )
-                                self._knn_query_style = 'nested'
-                                continue
-                            if self._should_disable_vector_field(knn_err):
-                                logger.error(
-                                    "语义检索失败: 向量字段 %s 未配置为 knn_vector, 已禁用语义检索: %s",
-                                    self.vector_field,
-                                    knn_err,
-                                )
-                                self.semantic_available = False
-                                effective_semantic = False
-                                knn_resp = None
-                                break
-                            logger.error(f"语义检索失败: {knn_err}")
-                            effective_semantic = False
-                            knn_resp = None
-                            break
-                    if knn_resp is None:
-                        effective_semantic = False
-                    if knn_resp:
-                        for hit in knn_resp['hits']['hits']:
-                            doc_id, source = self._extract_source(hit)
-                            semantic_raw = float(hit.get('_score') or 0.0)
-                            item = merged.get(doc_id)
-                            if not item:
-                                fields = _extract_common_fields(source)
-                                item = {
-                                    "id": doc_id,
-                                    **fields,
-                                    "highlight": hit.get('highlight', {}) or {},
-                                    "sources": [],
-                                    "bm25_raw": 0.0,
-                                    "semantic_raw": 0.0,
-                                    "bm25_score": 0.0,
-                                    "semantic_score": 0.0,
-                                    "cosine": 0.0,
-                                    "rerank_score": 0.0
-                                }
-                                merged[doc_id] = item
-                            item['semantic_raw'] = max(item.get('semantic_raw', 0.0), semantic_raw)
-                            cosine_norm = (semantic_raw + 1.0) / 2.0
-                            cosine_norm = min(1.0, max(0.0, cosine_norm))
-                            item['cosine'] = max(item.get('cosine', 0.0), cosine_norm)
-                            sources = set(item.get('sources', []))
-                            sources.add('semantic')
-                            item['sources'] = list(sources)
-                            if not item.get('highlight'):
-                                item['highlight'] = hit.get('highlight', {})
-
-            bm25_stats = compute_stats(
-                item.get('bm25_raw')
-                for item in merged.values()
-                if item.get('bm25_raw') is not None
+        if self.async_client is None:
+            self.async_client = AsyncOpenSearch(
+                hosts=[{
+                    'host': OPENSEARCH_CONFIG['host'].replace('https://', '').replace('http://', ''),
+                    'port': OPENSEARCH_CONFIG['port']
+                }],
+                http_auth=(OPENSEARCH_CONFIG['username'], OPENSEARCH_CONFIG['password']),
+                use_ssl=OPENSEARCH_CONFIG['use_ssl'],
+                verify_certs=OPENSEARCH_CONFIG['verify_certs'],
+                ssl_assert_hostname=OPENSEARCH_CONFIG.get('ssl_assert_hostname', False),
+                ssl_show_warn=OPENSEARCH_CONFIG.get('ssl_show_warn', False),
+                timeout=OPENSEARCH_CONFIG.get('timeout', 30),
+                maxsize=OPENSEARCH_CONFIG.get('async_pool_maxsize', 20),
             )
-            semantic_stats = compute_stats(
-                item.get('semantic_raw')
-                for item in merged.values()
-                if item.get('semantic_raw') is not None
+        return self.async_client
+
+    async def aclose(self) -> None:
+        """关闭异步客户端连接池"""
+
+        client, self.async_client = self.async_client, None
+        if client is not None:
+            await client.close()
+
+    async def _search_knn_async(self,
+                                query_vector: Sequence[float],
+                                vector_k: int,
+                                filters: Sequence[Dict]) -> Optional[Dict]:
+        client = self._get_async_client()
+        attempted_states: Set[Tuple[str, bool]] = set()
+        while True:
+            state = (self._knn_query_style, self._knn_supports_num_candidates)
+            if state in attempted_states:
+                logger.error("语义检索失败: kNN 查询在重复状态下仍无法执行")
+                return None
+            attempted_states.add(state)
+            knn_body = self._build_knn_body(query_vector, vector_k, filters)
+            try:
+                return await client.search(
+                    index=_search_index(),
+                    body=knn_body
+                )
+            except Exception as knn_err:
+                if not self._should_retry_knn(knn_err):
+                    return None
+
+    async def _msearch_phenomena_async(self,
+                                       keyword_body: Dict[str, Any],
+                                       query_vector: Sequence[float],
+                                       vector_k: int,
+                                       filters: Sequence[Dict]) -> Tuple[Dict, Optional[Dict]]:
+        client = self._get_async_client()
+        knn_body = self._build_knn_body(query_vector, vector_k, filters)
+        try:
+            result = await client.msearch(body=self._build_msearch_body(keyword_body, knn_body))
+        except Exception as msearch_err:
+            logger.warning("_msearch 请求失败，回退到串行检索: %s", msearch_err)
+            response = await client.search(index=_search_index(), body=keyword_body)
+            knn_resp = None
+            if self._should_retry_knn(msearch_err):
+                knn_resp = await self._search_knn_async(query_vector, vector_k, filters)
+            return response, knn_resp
+        response, knn_resp, knn_err = self._split_msearch_responses(result)
+        if knn_err is not None:
+            knn_resp = None
+            if self._should_retry_knn(knn_err):
+                knn_resp = await self._search_knn_async(query_vector, vector_k, filters)
+        return response, knn_resp
+
+    async def search_phenomena_async(self,
+                                     query: str,
+                                     system: Optional[str] = None,
+                                     part: Optional[str] = None,
+                                     vehicletype: Optional[str] = None,
+                                     fault_code: Optional[str] = None,
+                                     size: int = 10,
+                                     use_semantic: bool = True,
+                                     semantic_weight: Optional[float] = None,
+                                     vector_k: int = 50) -> Dict:
+        """search_phenomena 的异步版本，网络请求通过 AsyncOpenSearch 等待完成"""
+
+        if not self.async_enabled:
+            return await asyncio.to_thread(
+                self.search_phenomena,
+                query=query,
+                system=system,
+                part=part,
+                vehicletype=vehicletype,
+                fault_code=fault_code,
+                size=size,
+                use_semantic=use_semantic,
+                semantic_weight=semantic_weight,
+                vector_k=vector_k,
             )
 
-            results: List[Dict] = []
-            for item in merged.values():
-                bm25_raw = float(item.get('bm25_raw') or 0.0)
-                semantic_raw = float(item.get('semantic_raw') or 0.0)
+        try:
+            client = self._get_async_client()
+            filters = self._build_filters(system, part, vehicletype, fault_code)
+            keyword_body = self._build_phenomena_body(query, filters, size)
 
-                bm25_norm = logistic_from_stats(
-                    bm25_raw,
-                    bm25_stats,
-                    fallback=clamp(bm25_raw / 10.0),
+            effective_semantic, semantic_weight, vector_k = self._resolve_semantic_options(
+                use_semantic, semantic_weight, vector_k, size
+            )
+            semantic_requested = bool(effective_semantic and self.vector_field)
+            query_vector = None
+            if semantic_requested:
+                query_vector = await asyncio.to_thread(self._encode_query, query)
+
+            knn_resp = None
+            if query_vector is not None and self.use_msearch:
+                response, knn_resp = await self._msearch_phenomena_async(
+                    keyword_body, query_vector, vector_k, filters
                 )
-                semantic_norm = 0.0
-                if effective_semantic:
-                    semantic_norm = logistic_from_stats(
-                        semantic_raw,
-                        semantic_stats,
-                        fallback=clamp((semantic_raw + 1.0) / 2.0),
-                    )
-                popularity_val = _coerce_float(item.get('popularity', 0))
-                item['popularity'] = popularity_val
-                popularity_norm = clamp(math.log1p(max(0.0, popularity_val)) / 5.0)
-                search_num_val = max(0, _coerce_int(item.get('searchNum', 0)))
-                item['searchNum'] = search_num_val
-                search_norm = clamp(float(search_num_val) / 50.0)
-
-                fusion_base = semantic_weight * semantic_norm + (1.0 - semantic_weight) * bm25_norm
-                final_score = min(1.0, fusion_base + 0.05 * popularity_norm + 0.05 * search_norm)
-
-                why: List[str] = []
-                if semantic_norm >= 0.6:
-                    why.append("语义近")
-                elif semantic_norm >= 0.4:
-                    why.append("语义相关")
-                if bm25_norm >= 0.2:
-                    why.append("关键词命中")
-                if system and item.get('system') == system:
-                    why.append("系统一致")
-                if part and item.get('part') and part in item.get('part'):
-                    why.append("部件相近")
-                if popularity_val > 100:
-                    why.append("热门案例")
-                elif popularity_val > 50:
-                    why.append("常见问题")
-
-                item['final_score'] = final_score
-                item['rerank_score'] = fusion_base
-                item['bm25_score'] = bm25_norm
-                item['semantic_score'] = semantic_norm
-                item['cosine'] = semantic_norm
-                item['why'] = why or ["文本匹配"]
-                item['sources'] = sorted(set(item.get('sources', [])))
-
-                results.append(item)
-
-            results.sort(key=lambda x: x.get('final_score', 0.0), reverse=True)
-
-            metadata = {
-                "semantic_used": effective_semantic,
-                "semantic_weight": semantic_weight if effective_semantic else 0.0,
-                "vector_k": vector_k if effective_semantic else 0,
-                "keyword_size": size,
-                "bm25_stats": {
-                    "mean": bm25_stats[0],
-                    "std": bm25_stats[1],
-                } if bm25_stats else None,
-                "semantic_stats": {
-                    "mean": semantic_stats[0],
-                    "std": semantic_stats[1],
-                } if semantic_stats else None,
-            }
-
-            return {
-                "query": query,
-                "total": response['hits']['total']['value'],
-                "top": results[:size],
-                "metadata": metadata
-            }
+            else:
+                response = await client.search(
+                    index=_search_index(),
+                    body=keyword_body,
+                    size=size
+                )
+                if query_vector is not None:
+                    knn_resp = await self._search_knn_async(query_vector, vector_k, filters)
+
+            merged = self._collect_keyword_hits(response)
+            if semantic_requested:
+                if knn_resp is None:
+                    effective_semantic = False
+                else:
+                    self._merge_semantic_hits(merged, knn_resp)
+
+            return self._fuse_phenomena(
+                query,
+                merged,
+                response['hits']['total']['value'],
+                system=system,
+                part=part,
+                size=size,
+                effective_semantic=effective_semantic,
+                semantic_weight=semantic_weight,
+                vector_k=vector_k,
+            )
         except Exception as e:
             logger.error(f"搜索失败: {e}")
             return {
@@ -982,7 +1332,7 @@ class OpenSearchMatcher:
             }
 
             response = self.client.search(
-                index=INDEX_CONFIG['name'],
+                index=_search_index(),
                 body=search_body,
                 size=max(1, size)
             )
@@ -1166,7 +1516,7 @@ class OpenSearchMatcher:
     ) -> Dict:
         """支持异步 LLM 精选的匹配流程"""
 
-        search_result = self.search_phenomena(
+        search_result = await self.search_phenomena_async(
             query=query,
             system=system,
             part=part,
@@ -1269,8 +1619,9 @@ class OpenSearchMatcher:
         """获取索引统计信息"""
         try:
             # 获取索引统计
-            stats = self.client.indices.stats(index=INDEX_CONFIG['name'])
-            index_stats = stats['indices'][INDEX_CONFIG['name']]
+            # 别名背后的具体索引名会随蓝绿切换变化，使用汇总统计
+            stats = self.client.indices.stats(index=_search_index())
+            index_stats = stats['_all']
             
             # 获取系统分布
             agg_body = {
@@ -1289,7 +1640,7 @@ class OpenSearchMatcher:
             }
             
             agg_response = self.client.search(
-                index=INDEX_CONFIG['name'], 
+                index=_search_index(), 
                 body=agg_body
             )
             
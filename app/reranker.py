@@ -1,8 +1,11 @@
-
+import asyncio
+import logging
+from dataclasses import dataclass
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
-from typing import List
+from typing import List, Optional, Sequence, Tuple
 from .config import get_settings
+logger = logging.getLogger(__name__)
 def pick_device():
     if torch.cuda.is_available(): return 'cuda'
     if hasattr(torch.backends, 'mps') and torch.backends.mps.is_available(): return 'mps'
@@ -13,22 +16,141 @@ class Reranker:
         self.tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
         self.model = AutoModelForSequenceClassification.from_pretrained(model_name, trust_remote_code=True)
         self.model.to(self.device); self.model.eval()
-    @torch.inference_mode()
     def score(self, query: str, candidates: List[str], batch_size: int = 16) -> List[float]:
-        scores = []
-        for i in range(0, len(candidates), batch_size):
-            batch = candidates[i:i+batch_size]
-            pairs = [(query, c) for c in batch]
-            inputs = self.tokenizer(pairs, padding=True, truncation=True, return_tensors='pt', max_length=512)
+        return self.score_pairs([(query, c) for c in candidates], batch_size=batch_size)
+    @torch.inference_mode()
+    def score_pairs(self, pairs: Sequence[Tuple[str, str]], batch_size: int = 16) -> List[float]:
+        # 按长度排序后再分批，减少同批次内的 padding，最后按原顺序返回
+        order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+        scores = [0.0] * len(pairs)
+        for i in range(0, len(order), batch_size):
+            idx = order[i:i+batch_size]
+            batch = [pairs[j] for j in idx]
+            inputs = self.tokenizer(batch, padding=True, truncation=True, return_tensors='pt', max_length=512)
             inputs = {k: v.to(self.device) for k, v in inputs.items()}
             logits = self.model(**inputs).logits.squeeze(-1)
-            probs = torch.sigmoid(logits)
-            scores.extend(probs.detach().cpu().tolist())
+            probs = torch.sigmoid(logits).reshape(-1)
+            for j, p in zip(idx, probs.detach().cpu().tolist()):
+                scores[j] = p
         return scores
 _reranker = None
 def get_reranker() -> Reranker:
     global _reranker
     if _reranker is None:
         settings = get_settings()
-        _reranker = Reranker(settings.reranker_model)
+        if settings.inference_backend == 'onnx':
+            from .onnx_backend import load_onnx_reranker
+            _reranker = load_onnx_reranker(settings.reranker_model, settings.onnx_model_dir,
+                                           quantize=settings.onnx_quantize)
+        else:
+            _reranker = Reranker(settings.reranker_model)
     return _reranker
+
+
+@dataclass
+class _PendingPair:
+    query: str
+    candidate: str
+    future: asyncio.Future
+
+
+class RerankService:
+    """跨请求的动态微批精排服务。
+
+    各个请求的 (query, candidate) 对进入同一个队列，后台任务按
+    ``max_batch_size`` 或 ``max_wait_ms`` 先到者组批，在线程池中执行推理，
+    再把分数回填到各请求的 future，避免事件循环被同步推理阻塞。
+    """
+
+    def __init__(self, reranker: Reranker, max_batch_size: int = 32, max_wait_ms: float = 5.0,
+                 enabled: bool = True):
+        self.reranker = reranker
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.enabled = enabled
+        self.batches = 0
+        self.pairs = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def score(self, query: str, candidates: List[str]) -> List[float]:
+        if not candidates:
+            return []
+        if not self.enabled:
+            return await asyncio.to_thread(self.reranker.score, query, candidates, self.max_batch_size)
+        queue = self._ensure_worker()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for cand in candidates:
+            fut = loop.create_future()
+            queue.put_nowait(_PendingPair(query, cand, fut))
+            futures.append(fut)
+        try:
+            return list(await asyncio.gather(*futures))
+        except asyncio.CancelledError:
+            for fut in futures:
+                fut.cancel()
+            raise
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def _collect_batch(self, queue: asyncio.Queue) -> List[_PendingPair]:
+        loop = asyncio.get_running_loop()
+        batch = [await queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            try:
+                if remaining <= 0:
+                    batch.append(queue.get_nowait())
+                else:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+        return batch
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = await self._collect_batch(queue)
+            live = [item for item in batch if not item.future.done()]
+            if not live:
+                continue
+            pairs = [(item.query, item.candidate) for item in live]
+            try:
+                scores = await asyncio.to_thread(self.reranker.score_pairs, pairs, len(pairs))
+            except Exception as exc:
+                logger.error(f"精排批次推理失败: {exc}")
+                for item in live:
+                    if not item.future.done():
+                        item.future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.pairs += len(pairs)
+            for item, s in zip(live, scores):
+                if not item.future.done():
+                    item.future.set_result(float(s))
+
+    async def aclose(self) -> None:
+        worker, self._worker = self._worker, None
+        if worker is not None and not worker.done():
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+_rerank_service = None
+def get_rerank_service() -> RerankService:
+    global _rerank_service
+    if _rerank_service is None:
+        settings = get_settings()
+        _rerank_service = RerankService(get_reranker(), max_batch_size=settings.rerank_batch_size,
+                                        max_wait_ms=settings.rerank_max_wait_ms,
+                                        enabled=settings.rerank_batching)
+    return _rerank_service
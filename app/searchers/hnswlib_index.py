@@ -2,8 +2,9 @@
 import os, json, hnswlib, numpy as np
 from typing import List, Dict, Any
 from ..embedding import get_embedder
+from ..embedding_store import embedder_store_key, get_embedding_store
 from ..config import get_settings
-from ..utils.data_loader import iter_records
+from ..corpus_store import get_corpus
 
 class HNSWSearcher:
     def __init__(self, data_path: str, index_path: str):
@@ -11,10 +12,10 @@ class HNSWSearcher:
         self.data_path = data_path
         self.index_path = index_path
         self.embedder = get_embedder()
-        self.data = list(iter_records(self.data_path))
-        self.texts = [d.get('text', '') for d in self.data]
+        self.data = get_corpus(self.data_path)
+        self.texts = self.data.texts
 
-        self.dim = self.embedder.encode(['test']).shape[1]
+        self.dim = self.embedder.encode(['test'], use_cache=False).shape[1]
         self.index = hnswlib.Index(space='cosine', dim=self.dim)
         if os.path.exists(self.index_path):
             self.index.load_index(self.index_path)
@@ -23,7 +24,9 @@ class HNSWSearcher:
         else:
             self._rebuild()
     def _rebuild(self):
-        vecs = self.embedder.encode(self.texts)
+        encode = lambda texts: self.embedder.encode(texts, use_cache=False)
+        store = get_embedding_store(embedder_store_key(self.embedder))
+        vecs = store.encode(self.texts, encode) if store is not None else encode(self.texts)
         self.index.init_index(max_elements=len(self.data), ef_construction=200, M=32)
         self.index.add_items(vecs, np.arange(len(self.data)))
         self.index.set_ef(80)
@@ -4,16 +4,15 @@ import os, json, pickle
 from typing import List, Dict, Any
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import linear_kernel
+from ..corpus_store import CorpusStore, get_corpus
 
 class KeywordSearcher:
     def __init__(self, data_path: str, cache_path: str):
-        self.data: List[Dict[str, Any]] = []
-        with open(data_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                self.data.append(json.loads(line))
+        # 与 HNSWSearcher 共用同一份语料（只解析一次，之后从快照加载）
+        self.data: CorpusStore = get_corpus(data_path)
 
         # 只保留有内容的文本，避免空列表
-        self.texts = [d.get('text', '').strip() for d in self.data if d.get('text', '').strip()]
+        self.texts = [t.strip() for t in self.data.texts if t.strip()]
         if not self.texts:
             raise ValueError(f"没有可用文本：{data_path}")
 
@@ -0,0 +1,66 @@
+# app/utils/compressed_io.py
+"""Transparent streaming decompression for data files.
+
+``.gz`` / ``.zst`` are recognised by extension, otherwise by magic bytes, so a
+compressed export can be renamed without breaking the readers. ``zstandard`` is
+only imported when a zstd file is actually opened.
+"""
+import gzip
+import io
+from typing import BinaryIO, Optional, TextIO
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+_EXTENSIONS = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+_SKIP_CHUNK = 1 << 20
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """Return ``"gzip"``, ``"zstd"`` or ``None`` for plain files."""
+    lowered = path.lower()
+    for ext, kind in _EXTENSIONS.items():
+        if lowered.endswith(ext):
+            return kind
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return "gzip"
+    if magic.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def open_binary(path: str) -> BinaryIO:
+    """Open ``path`` for streaming reads, decompressing gzip/zstd on the fly."""
+    kind = detect_compression(path)
+    if kind == "gzip":
+        return gzip.open(path, "rb")
+    if kind == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError(f"读取 zstd 压缩文件需要安装 zstandard：pip install zstandard ({path})") from e
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.BufferedReader(raw, buffer_size=_SKIP_CHUNK)
+    return open(path, "rb")
+
+
+def open_text(path: str, encoding: str = "utf-8", errors: str = "strict") -> TextIO:
+    """Text-mode counterpart of :func:`open_binary`."""
+    return io.TextIOWrapper(open_binary(path), encoding=encoding, errors=errors)
+
+
+def skip_bytes(handle: BinaryIO, offset: int) -> None:
+    """Position ``handle`` at uncompressed ``offset``; non-seekable streams are read and discarded."""
+    if offset <= 0:
+        return
+    if handle.seekable():
+        handle.seek(offset)
+        return
+    remaining = offset
+    while remaining > 0:
+        chunk = handle.read(min(remaining, _SKIP_CHUNK))
+        if not chunk:
+            break
+        remaining -= len(chunk)
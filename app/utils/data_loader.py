@@ -1,12 +1,69 @@
 # app/utils/data_loader.py
 import json, csv, os, io
 
-def iter_records(path: str):
-    # 先读一点头部来判断类型
-    with open(path, "r", encoding="utf-8-sig") as f:
-        head = f.read(2048)
-        f.seek(0)
+from .compressed_io import open_text
 
+PARQUET_MAGIC = b"PAR1"
+# 构建检索索引所需的列；Parquet 文件只读取这些列
+CORPUS_COLUMNS = ("id", "text", "system", "part", "tags", "popularity")
+_PARQUET_BATCH_ROWS = 65536
+
+
+def is_parquet(path: str) -> bool:
+    if path.lower().endswith(".parquet"):
+        return True
+    with open(path, "rb") as f:
+        return f.read(4) == PARQUET_MAGIC
+
+
+def _iter_parquet(path: str, columns=None):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError(f"读取 Parquet 文件需要安装 pyarrow：pip install pyarrow ({path})") from e
+    pf = pq.ParquetFile(path)
+    names = pf.schema_arrow.names
+    # 未指定列时读全部列，并把 extra（其余字段的 JSON）展开回记录
+    wanted = [c for c in (columns or names) if c in names]
+    merge_extra = columns is None and "extra" in names
+    for batch in pf.iter_batches(batch_size=_PARQUET_BATCH_ROWS, columns=wanted):
+        for row in batch.to_pylist():
+            extra = row.pop("extra", None) if merge_extra else None
+            obj = {k: v for k, v in row.items() if v is not None}
+            if extra:
+                obj.update(json.loads(extra))
+            yield obj
+
+
+def iter_records(path: str, columns=None):
+    """逐条产出记录；``columns`` 指定时只保留这些字段（Parquet 按列读取）。"""
+    if is_parquet(path):
+        yield from _iter_parquet(path, columns)
+        return
+    if columns is None:
+        yield from _iter_text_records(path)
+        return
+    keys = tuple(columns)
+    for obj in _iter_text_records(path):
+        yield {k: obj[k] for k in keys if k in obj}
+
+
+def read_columns(path: str, columns=CORPUS_COLUMNS):
+    """按列读取为 ``{列名: 值列表}``；缺失的字段为 ``None``。"""
+    out = {c: [] for c in columns}
+    for obj in iter_records(path, columns=columns):
+        for c, values in out.items():
+            values.append(obj.get(c))
+    return out
+
+
+def _iter_text_records(path: str):
+    # 先读一点头部来判断类型；压缩流不支持回退，探测后重新打开
+    with open_text(path, encoding="utf-8-sig") as f:
+        first = f.readline()
+        head = (first + f.read(max(0, 2048 - len(first))))[:2048]
+
+    with open_text(path, encoding="utf-8-sig") as f:
         stripped = head.lstrip()
         # JSON 数组
         if stripped.startswith("["):
@@ -15,10 +72,8 @@ def iter_records(path: str):
                 yield obj
             return
 
-        # CSV（简单探测：第一行包含逗号且含 id/text）
-        first = f.readline()
-        f.seek(0)
-        if "," in first and ("id" in first.lower() or "text" in first.lower()):
+        # CSV（简单探测：第一行包含逗号且含 id/text；以 { 开头的是 JSONL）
+        if not stripped.startswith("{") and "," in first and ("id" in first.lower() or "text" in first.lower()):
             reader = csv.DictReader(f)
             for row in reader:
                 yield {
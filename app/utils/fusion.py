@@ -0,0 +1,166 @@
+"""Columnar, vectorized candidate fusion.
+
+Candidates are held as NumPy columns (one row per candidate) so that z-score
+logistic normalization and the weighted fusion run in a single pass instead of
+calling :func:`~app.utils.calibration.logistic_from_stats` per candidate. The
+helpers reproduce the scalar semantics of ``compute_stats`` /
+``logistic_from_stats``: statistics ignore missing values (``NaN``), missing
+values score as ``0.0``, and a degenerate standard deviation falls back to a
+threshold around the mean.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+Stats = Optional[Tuple[float, float]]
+
+
+def as_column(values: Iterable[Any]) -> np.ndarray:
+    """Convert ``values`` to a float64 column; ``None`` becomes ``NaN``."""
+
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def column_stats(values: np.ndarray) -> Stats:
+    """Vectorized counterpart of ``compute_stats`` that skips ``NaN`` entries."""
+
+    present = values[~np.isnan(values)]
+    if present.size == 0:
+        return None
+    mean = float(present.mean())
+    std = float(present.std()) if present.size > 1 else 0.0
+    return mean, std
+
+
+def sigmoid(z: np.ndarray) -> np.ndarray:
+    """Numerically stable logistic function over an array."""
+
+    return np.exp(-np.logaddexp(0.0, -z))
+
+
+def logistic_normalize(values: np.ndarray, fallback: np.ndarray) -> Tuple[np.ndarray, Stats]:
+    """Normalize a column like ``logistic_from_stats`` does for each element.
+
+    Args:
+        values: Raw scores with ``NaN`` for missing entries.
+        fallback: Values used when no statistics are available.
+
+    Returns:
+        ``(normalized, stats)`` where ``normalized`` lies in [0, 1].
+    """
+
+    stats = column_stats(values)
+    if stats is None:
+        return np.clip(fallback, 0.0, 1.0), None
+    raw = np.nan_to_num(values, nan=0.0)
+    mean, std = stats
+    if std <= 1e-6:
+        return (raw >= mean).astype(np.float64), stats
+    return np.clip(sigmoid((raw - mean) / std), 0.0, 1.0), stats
+
+
+def popularity_norm(popularity: np.ndarray) -> np.ndarray:
+    """``clamp(log1p(max(0, popularity)) / 5)`` with missing values treated as 0."""
+
+    raw = np.maximum(np.nan_to_num(popularity, nan=0.0), 0.0)
+    return np.clip(np.log1p(raw) / 5.0, 0.0, 1.0)
+
+
+@dataclass
+class CandidateColumns:
+    """Candidate features stored column-wise, row ``i`` belonging to ``ids[i]``."""
+
+    ids: List[str]
+    bm25: np.ndarray
+    cosine: np.ndarray
+    rerank: np.ndarray
+    popularity: np.ndarray
+    kg: np.ndarray
+
+    @classmethod
+    def from_columns(cls,
+                     ids: Sequence[str],
+                     *,
+                     bm25: Optional[Iterable[Any]] = None,
+                     cosine: Optional[Iterable[Any]] = None,
+                     rerank: Optional[Iterable[Any]] = None,
+                     popularity: Optional[Iterable[Any]] = None,
+                     kg: Optional[Iterable[Any]] = None) -> "CandidateColumns":
+        n = len(ids)
+
+        def build(values: Optional[Iterable[Any]]) -> np.ndarray:
+            if values is None:
+                return np.full(n, np.nan)
+            column = as_column(values)
+            if column.shape != (n,):
+                raise ValueError(f"列长度不一致: {column.shape[0]} != {n}")
+            return column
+
+        return cls(
+            ids=list(ids),
+            bm25=build(bm25),
+            cosine=build(cosine),
+            rerank=build(rerank),
+            popularity=build(popularity),
+            kg=build(kg),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass
+class FusedScores:
+    """Normalized component columns and the fused score for each candidate."""
+
+    rerank: np.ndarray
+    semantic: np.ndarray
+    keyword: np.ndarray
+    knowledge: np.ndarray
+    popularity: np.ndarray
+    final: np.ndarray
+    stats: Dict[str, Stats]
+
+    def order(self) -> np.ndarray:
+        """Row indices sorted by descending final score; ties keep input order."""
+
+        return np.argsort(-self.final, kind="stable")
+
+
+def fuse(columns: CandidateColumns, weights: Mapping[str, float], *, keyword_scale: float = 20.0) -> FusedScores:
+    """Normalize every column and apply the ``FusionWeights`` weighted sum.
+
+    Missing rerank/cosine/BM25 values score as ``0.0``; when a column has no
+    values at all the clamped raw value is used, mirroring ``main.match``.
+    """
+
+    rerank_raw = np.nan_to_num(columns.rerank, nan=0.0)
+    cosine_raw = np.nan_to_num(columns.cosine, nan=0.0)
+    bm25_raw = np.nan_to_num(columns.bm25, nan=0.0)
+
+    rerank, rerank_stats = logistic_normalize(columns.rerank, rerank_raw)
+    semantic, cosine_stats = logistic_normalize(columns.cosine, np.clip(cosine_raw, 0.0, 1.0))
+    keyword, bm25_stats = logistic_normalize(columns.bm25, np.clip(bm25_raw / keyword_scale, 0.0, 1.0))
+    knowledge = np.minimum(np.nan_to_num(columns.kg, nan=0.0), 1.0)
+    popularity = popularity_norm(columns.popularity)
+
+    final = (
+        weights.get("rerank", 0.0) * rerank
+        + weights.get("semantic", 0.0) * semantic
+        + weights.get("keyword", 0.0) * keyword
+        + weights.get("knowledge", 0.0) * knowledge
+        + weights.get("popularity", 0.0) * popularity
+    )
+    return FusedScores(
+        rerank=rerank,
+        semantic=semantic,
+        keyword=keyword,
+        knowledge=knowledge,
+        popularity=popularity,
+        final=final,
+        stats={"rerank": rerank_stats, "cosine": cosine_stats, "bm25": bm25_stats},
+    )
@@ -4,13 +4,21 @@
 分析popularity字段的分布情况
 """
 
-import json
+import os
+import sys
 
-def analyze_popularity():
-    data = []
-    with open('case_recovery_phenomena.jsonl', 'r', encoding='utf-8') as f:
-        for line in f:
-            data.append(json.loads(line))
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from app.utils.data_loader import iter_records  # noqa: E402
+
+# 只需要这几列；Parquet 输入时按列读取
+COLUMNS = ("id", "popularity", "system", "text")
+
+
+def analyze_popularity(path='case_recovery_phenomena.jsonl'):
+    data = list(iter_records(path, columns=COLUMNS))
     
     # 按popularity排序
     sorted_data = sorted(data, key=lambda x: x['popularity'], reverse=True)
@@ -48,4 +56,4 @@ def analyze_popularity():
         print(f"  {system}: {avg_pop:.1f} (共{len(pops)}条)")
 
 if __name__ == "__main__":
-    analyze_popularity()
+    analyze_popularity(*sys.argv[1:2])
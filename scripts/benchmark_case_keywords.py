@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""案例关键词派生字段基准：逐规则子串扫描 vs. 预编译多关键词匹配器。
+
+对同一批合成案例分别计算 system / tags / popularity，先逐行校验两种实现输出一致，
+再分别计时。默认 100 万行，分批生成以控制内存。
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from scripts.convert_sql_to_jsonl import (  # noqa: E402
+    BRAND_FACTORS,
+    FREQUENCY_RULES,
+    SEVERITY_RULES,
+    SYSTEM_FACTORS,
+    SYSTEM_KEYWORDS,
+    TAG_RULES,
+    _parse_int,
+    calculate_popularity,
+    extract_system_from_discussion,
+    generate_tags_from_content,
+    match_case_keywords,
+)
+
+FILLER = "车辆行驶过程中出现问题客户反映检查后发现需要进一步确认更换后正常试车"
+BRANDS = ["大众", "丰田", "比亚迪", "宝马", "保时捷", "未知品牌", ""]
+
+
+def iter_batches(
+    n: int, batch_size: int = 10_000, seed: int = 42, keyword_rate: float = 0.03
+) -> Iterator[List[Tuple[str, str, str, Optional[int]]]]:
+    """分批生成合成案例，避免一次性在内存中保留百万行文本。"""
+
+    rng = random.Random(seed)
+    keywords = sorted(
+        {
+            keyword
+            for rules in (SYSTEM_KEYWORDS.values(), (k for k, _ in SEVERITY_RULES),
+                          (k for k, _ in FREQUENCY_RULES), (k for k, _ in TAG_RULES))
+            for group in rules
+            for keyword in group
+        }
+    ) + ["ecu", "Abs"]
+    tokens = list(FILLER) + keywords
+    weights = [(1 - keyword_rate) / len(FILLER)] * len(FILLER) + [keyword_rate / len(keywords)] * len(keywords)
+
+    def text(length: int) -> str:
+        return "".join(rng.choices(tokens, weights, k=length))
+
+    for start in range(0, n, batch_size):
+        yield [
+            (text(rng.randint(20, 120)), text(rng.randint(40, 300)), rng.choice(BRANDS),
+             rng.choice([None, rng.randint(0, 5000)]))
+            for _ in range(min(batch_size, n - start))
+        ]
+
+
+# ---- 原实现（每条记录逐关键词子串扫描） ----
+
+def legacy_system(discussion: str) -> str:
+    discussion_lower = discussion.lower()
+    for system, keywords in SYSTEM_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword.lower() in discussion_lower:
+                return system
+    return "其他"
+
+
+def legacy_tags(symptoms: str, discussion: str, brand: str) -> List[str]:
+    tags = [brand] if brand else []
+    content = (symptoms + " " + discussion).lower()
+    for words, tag in TAG_RULES:
+        if any(word in content for word in words):
+            tags.append(tag)
+    if not tags:
+        tags.append("故障诊断")
+    tags.append("维修案例")
+    return tags[:5]
+
+
+def legacy_popularity(symptoms: str, discussion: str, brand: str, system: str, *, search_num: Any = None) -> int:
+    content = (symptoms + " " + discussion).lower()
+    severity_factor = next((f for words, f in SEVERITY_RULES if any(w in content for w in words)), 1.0)
+    frequency_factor = next((f for words, f in FREQUENCY_RULES if any(w in content for w in words)), 1.0)
+    popularity = int(100 * BRAND_FACTORS.get(brand, 1.0) * SYSTEM_FACTORS.get(system, 1.0)
+                     * severity_factor * frequency_factor)
+    import random as legacy_random
+    legacy_random.seed(hash(symptoms + discussion) % 2147483647)
+    popularity += legacy_random.randint(-10, 10)
+    popularity = max(50, min(500, popularity))
+    search_value = _parse_int(search_num)
+    if search_value is None:
+        return popularity
+    scaled = max(50, min(500, int(20 + 40 * math.log1p(max(search_value, 0)))))
+    return max(50, min(500, int(round(0.6 * scaled + 0.4 * popularity))))
+
+
+def legacy_derive(symptoms: str, discussion: str, brand: str, search_num: Any) -> tuple:
+    system = legacy_system(discussion) if discussion else "其他"
+    return (system, legacy_tags(symptoms, discussion, brand),
+            legacy_popularity(symptoms, discussion, brand, system, search_num=search_num))
+
+
+def matcher_derive(symptoms: str, discussion: str, brand: str, search_num: Any) -> tuple:
+    hits = match_case_keywords(symptoms, discussion)
+    system = extract_system_from_discussion(discussion, hits=hits) if discussion else "其他"
+    return (system, generate_tags_from_content(symptoms, discussion, brand, hits=hits),
+            calculate_popularity(symptoms, discussion, brand, system, search_num=search_num, hits=hits))
+
+
+def measure(fn, rows) -> float:
+    start = time.perf_counter()
+    for row in rows:
+        fn(*row)
+    return time.perf_counter() - start
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="案例关键词派生字段基准")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="合成案例数量")
+    parser.add_argument("--keyword-rate", type=float, default=0.03, help="每个字符位置插入关键词的概率")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    legacy_s = matcher_s = 0.0
+    mismatches = 0
+    for rows in iter_batches(args.rows, seed=args.seed, keyword_rate=args.keyword_rate):
+        mismatches += sum(1 for row in rows if legacy_derive(*row) != matcher_derive(*row))
+        legacy_s += measure(legacy_derive, rows)
+        matcher_s += measure(matcher_derive, rows)
+
+    if mismatches:
+        print(f"警告: {mismatches} 行输出不一致")
+    print(f"{'rows':>10} {'legacy':>10} {'matcher':>10} {'speedup':>8}")
+    print(f"{args.rows:>10} {legacy_s:>9.2f}s {matcher_s:>9.2f}s {legacy_s / matcher_s:>7.2f}x")
+    print(f"{'':>10} {legacy_s / args.rows * 1e6:>8.1f}us {matcher_s / args.rows * 1e6:>8.1f}us  每行")
+    return 0 if not mismatches else 1
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI 入口
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""对比 PyTorch 与 ONNX Runtime (fp32 / int8) 推理后端的延迟。
+
+需先运行 ``scripts/export_onnx_models.py`` 导出模型。默认模拟一次 /match
+请求：对 100 个候选做精排，并对单条查询编码。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from app.config import get_settings  # noqa: E402
+from app.onnx_backend import OnnxReranker, OnnxSentenceEncoder, compare_outputs, model_export_dir  # noqa: E402
+
+SAMPLE_CANDIDATES: List[str] = [
+    "发动机无法启动，起动机工作但发动机点火失败，需要检查发动机控制系统",
+    "刹车踏板变软制动力不足，制动距离变长，应检查制动系统",
+    "变速器换挡顿挫，低速时出现冲击，需要检查变速箱控制逻辑",
+    "空调不制冷，鼓风机正常但出风温度偏高",
+    "仪表故障灯常亮，车辆偶发熄火，冷车启动困难",
+]
+
+
+def measure(fn: Callable[[], object], repeats: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    timings: List[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    timings.sort()
+    return {
+        "p50_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))],
+        "mean_ms": statistics.fmean(timings),
+    }
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="比较 PyTorch 与 ONNX Runtime 推理延迟")
+    parser.add_argument("--reranker-model", default=settings.reranker_model, help="精排模型 ID 或路径")
+    parser.add_argument("--embedding-model", default=settings.embedding_model, help="embedding 模型 ID 或路径")
+    parser.add_argument("--onnx-dir", default=settings.onnx_model_dir, help="ONNX 模型目录")
+    parser.add_argument("--candidates", type=int, default=100, help="每次精排的候选数量")
+    parser.add_argument("--batch-size", type=int, default=32, help="精排批大小")
+    parser.add_argument("--repeats", type=int, default=20, help="计时重复次数")
+    parser.add_argument("--warmup", type=int, default=3, help="预热次数")
+    parser.add_argument("--query", default="发动机冷车启动困难并伴有异响", help="测试查询")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    candidates = [SAMPLE_CANDIDATES[i % len(SAMPLE_CANDIDATES)] + f" #{i}" for i in range(args.candidates)]
+
+    from sentence_transformers import SentenceTransformer
+
+    from app.reranker import Reranker
+
+    rerankers: Dict[str, object] = {"torch": Reranker(args.reranker_model)}
+    embedders: Dict[str, object] = {
+        "torch": SentenceTransformer(args.embedding_model, trust_remote_code=True, device="cpu")
+    }
+    reranker_dir = model_export_dir(args.onnx_dir, args.reranker_model)
+    embedder_dir = model_export_dir(args.onnx_dir, args.embedding_model)
+    for label, quantized in (("onnx-fp32", False), ("onnx-int8", True)):
+        reranker = OnnxReranker(reranker_dir, quantized=quantized)
+        embedder = OnnxSentenceEncoder(embedder_dir, quantized=quantized)
+        if quantized and not (reranker.quantized and embedder.quantized):
+            continue
+        rerankers[label] = reranker
+        embedders[label] = embedder
+
+    reference_scores = rerankers["torch"].score(args.query, candidates, batch_size=args.batch_size)
+
+    print(f"精排: {args.candidates} 个候选, batch_size={args.batch_size}; 编码: 单条查询; 重复 {args.repeats} 次")
+    print(f"{'backend':<10} {'rerank p50':>11} {'rerank p95':>11} {'embed p50':>10} {'embed p95':>10} {'max diff':>9}")
+    for label in rerankers:
+        reranker, embedder = rerankers[label], embedders[label]
+        rerank_stats = measure(lambda: reranker.score(args.query, candidates, batch_size=args.batch_size),
+                               args.repeats, args.warmup)
+        embed_stats = measure(lambda: embedder.encode([args.query], normalize_embeddings=True,
+                                                      show_progress_bar=False),
+                              args.repeats, args.warmup)
+        diff = compare_outputs(reference_scores, reranker.score(args.query, candidates, batch_size=args.batch_size))
+        print(
+            f"{label:<10} {rerank_stats['p50_ms']:>9.1f}ms {rerank_stats['p95_ms']:>9.1f}ms "
+            f"{embed_stats['p50_ms']:>8.1f}ms {embed_stats['p95_ms']:>8.1f}ms {diff['max_abs_diff']:>9.5f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI 入口
+    sys.exit(main())
@@ -9,23 +9,27 @@
 * 自动跳过无关表，或根据 `--tables` 参数仅选择部分表；
 * 尽量保留原始字段与数据类型，不对字段名做额外修改；
 * 输出的 JSON 行包含 `_id`、`_index` 以及 `_source`，与导入脚本保持兼容；
+* 也可输出固定 schema 的 Parquet 文件（需要 pyarrow），供检索服务按列加载；
 * 通过日志输出转换统计信息，便于排查潜在的解析问题。
 """
 
 from __future__ import annotations
 
 import argparse
+import codecs
 import html
 import json
 import logging
 import math
 import os
+import random
 import re
 import sys
-from collections import Counter
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
-from zipfile import ZipFile
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from zipfile import ZipFile, ZipInfo
 
 LOGGER = logging.getLogger(__name__)
 
@@ -40,6 +44,27 @@ CREATE_TABLE_REGEX = re.compile(
 COLUMN_NAME_REGEX = re.compile(r"^`?(?P<name>[A-Za-z0-9_]+)`?")
 NUMBER_REGEX = re.compile(r"^-?\d+(?:\.\d+)?$")
 
+STREAM_CHUNK_SIZE = 1 << 20
+# --workers 模式下每个任务包含的 VALUES 文本量（字符数）
+PARALLEL_BATCH_CHARS = 4 << 20
+
+# Parquet 输出的固定列；其余字段以 JSON 文本保存在 extra 列中
+PARQUET_STRING_COLUMNS = ("text", "system", "part", "symptoms", "discussion", "search_content", "brand", "vehicletype")
+PARQUET_INT_COLUMNS = ("popularity", "search_num")
+PARQUET_EXTRA_COLUMN = "extra"
+PARQUET_ROW_GROUP_SIZE = 50_000
+# 跨块匹配 INSERT/CREATE 语句头时保留的尾部长度（需大于最长的列名列表）
+_HEAD_KEEP_CHARS = 64 * 1024
+_VALUES_SPECIAL = re.compile(r"['\"();]")
+_STRING_SPECIAL = {"'": re.compile(r"[\\']"), '"': re.compile(r'[\\"]')}
+_TUPLE_SPECIAL = re.compile(r"['()]")
+# 常见情形的整元组匹配：字符串均已闭合、字符串外没有嵌套括号（展开写法，避免回溯爆炸）
+_SIMPLE_TUPLE = re.compile(r"\(([^'()]*(?:'[^'\\]*(?:\\[\s\S][^'\\]*)*'[^'()]*)*)\)")
+# 元组内的一个值及其后的逗号：单引号字符串（'' 与反斜杠转义，未闭合时读到末尾）或到下一个逗号为止的裸值
+_VALUE_TOKEN = re.compile(r"(?:'([^'\\]*(?:(?:\\[\s\S]?|'')[^'\\]*)*)'?|([^,]*))\s*,?\s*")
+_STRING_ESCAPE = re.compile(r"\\(.)|''", re.DOTALL)
+_SKIP_SPACE = re.compile(r"\s*")
+
 
 @dataclass
 class InsertStatement:
@@ -52,133 +77,81 @@ class SQLParseError(RuntimeError):
     """Raised when a values tuple cannot be parsed."""
 
 
-def _decode_bytes(data: bytes, encodings: Sequence[str]) -> str:
-    last_exc: Optional[Exception] = None
-    for encoding in encodings:
-        try:
-            return data.decode(encoding)
-        except Exception as exc:  # pragma: no cover - 非常规编码
-            last_exc = exc
-    if last_exc:
-        raise last_exc
-    return data.decode()
-
-
 def _split_value_tuples(block: str) -> Iterator[str]:
+    # 与 _scan_values_block 相同：用正则跳到下一个有意义的字符，而不是逐字符循环
     depth = 0
-    in_string = False
-    escape = False
-    current: List[str] = []
-
-    for char in block:
-        if in_string:
-            current.append(char)
-            if escape:
-                escape = False
-            elif char == "\\":
-                escape = True
-            elif char == "'":
-                in_string = False
-            continue
+    start = 0
+    index = 0
+    length = len(block)
 
+    while index < length:
+        match = _TUPLE_SPECIAL.search(block, index)
+        if match is None:
+            break
+        index = match.end()
+        char = match.group()
         if char == "'":
-            in_string = True
-            current.append(char)
-            continue
-
-        if char == "(":
+            while True:
+                match = _STRING_SPECIAL["'"].search(block, index)
+                if match is None:
+                    index = length
+                    break
+                if match.group() == "\\":
+                    index = match.end() + 1
+                    continue
+                index = match.end()
+                break
+        elif char == "(":
             if depth == 0:
-                current = ["("]
-            else:
-                current.append(char)
+                simple = _SIMPLE_TUPLE.match(block, index - 1)
+                if simple is not None:
+                    yield simple.group(1)
+                    index = simple.end()
+                    continue
+                start = index
             depth += 1
-            continue
-
-        if char == ")":
-            if depth > 0:
-                current.append(char)
+        else:
             depth -= 1
             if depth == 0:
-                tuple_text = "".join(current).strip()
-                if tuple_text.endswith(","):
-                    tuple_text = tuple_text[:-1].rstrip()
-                if tuple_text.startswith("(") and tuple_text.endswith(")"):
-                    yield tuple_text[1:-1]
-                else:
-                    yield tuple_text
-            continue
-
-        if depth > 0:
-            current.append(char)
+                yield block[start:index - 1]
 
     if depth != 0:
         raise SQLParseError("VALUES 语句括号不匹配")
 
 
+def _unescape_sql_string(raw: str) -> str:
+    if "\\" not in raw and "''" not in raw:
+        return raw
+    # 末尾孤立的反斜杠保持原样
+    return _STRING_ESCAPE.sub(lambda m: m.group(1) if m.group(1) is not None else "'", raw)
+
+
+def _parse_unquoted(token: str) -> object:
+    upper = token.upper()
+    if not token or upper == "NULL":
+        return None
+    if upper in {"TRUE", "FALSE"}:
+        return upper == "TRUE"
+    if NUMBER_REGEX.match(token):
+        try:
+            return float(token) if "." in token else int(token)
+        except ValueError:
+            return token
+    return token
+
+
 def _parse_value_tuple(tuple_text: str) -> List[object]:
     values: List[object] = []
     length = len(tuple_text)
-    index = 0
-
-    while index < length:
-        while index < length and tuple_text[index].isspace():
-            index += 1
-        if index >= length:
+    # 每次匹配都从上一个值的结尾开始，只有到达末尾时才会出现空匹配
+    for match in _VALUE_TOKEN.finditer(tuple_text, _SKIP_SPACE.match(tuple_text).end()):
+        if match.start() >= length:
             break
-
-        char = tuple_text[index]
-        if char == "'":
-            index += 1
-            buffer: List[str] = []
-            while index < length:
-                current = tuple_text[index]
-                if current == "'":
-                    next_index = index + 1
-                    if next_index < length and tuple_text[next_index] == "'":
-                        buffer.append("'")
-                        index += 2
-                        continue
-                    index += 1
-                    break
-                if current == "\\":
-                    next_index = index + 1
-                    if next_index < length:
-                        buffer.append(tuple_text[next_index])
-                        index += 2
-                        continue
-                buffer.append(current)
-                index += 1
-            values.append("".join(buffer))
+        quoted, bare = match.groups()
+        if quoted is not None:
+            values.append(_unescape_sql_string(quoted))
         else:
-            start = index
-            while index < length and tuple_text[index] != ",":
-                index += 1
-            token = tuple_text[start:index].strip()
-            upper = token.upper()
-            if not token:
-                values.append(None)
-            elif upper == "NULL":
-                values.append(None)
-            elif upper in {"TRUE", "FALSE"}:
-                values.append(upper == "TRUE")
-            else:
-                if NUMBER_REGEX.match(token):
-                    if "." in token:
-                        try:
-                            values.append(float(token))
-                        except ValueError:
-                            values.append(token)
-                    else:
-                        try:
-                            values.append(int(token))
-                        except ValueError:
-                            values.append(token)
-                else:
-                    values.append(token)
-        while index < length and tuple_text[index].isspace():
-            index += 1
-        if index < length and tuple_text[index] == ",":
-            index += 1
+            values.append(_parse_unquoted(bare.strip()))
 
     return values
 
@@ -293,40 +266,23 @@ def _extract_parenthesized_block(text: str, start_index: int) -> Tuple[str, int]
     raise SQLParseError("CREATE TABLE 定义缺少右括号")
 
 
-def _extract_table_columns(sql_text: str) -> Dict[str, List[str]]:
-    columns_map: Dict[str, List[str]] = {}
-    position = 0
+def _collect_create_columns(block: str) -> List[str]:
     reserved_prefixes = ("primary", "unique", "key", "constraint", "foreign", "index", "fulltext")
+    collected: List[str] = []
 
-    while True:
-        match = CREATE_TABLE_REGEX.search(sql_text, position)
-        if not match:
-            break
-
-        table = match.group("table")
-        block, end_index = _extract_parenthesized_block(sql_text, match.end() - 1)
-        inner = block[1:-1]
-        definitions = _split_column_block(inner)
-        collected: List[str] = []
-
-        for definition in definitions:
-            stripped = definition.strip()
-            if not stripped:
-                continue
-            lower = stripped.lstrip("`\"").lower()
-            if lower.startswith(reserved_prefixes):
-                continue
-
-            name_match = COLUMN_NAME_REGEX.match(stripped)
-            if name_match:
-                collected.append(name_match.group("name"))
-
-        if collected:
-            columns_map[table.lower()] = collected
+    for definition in _split_column_block(block[1:-1]):
+        stripped = definition.strip()
+        if not stripped:
+            continue
+        lower = stripped.lstrip("`\"").lower()
+        if lower.startswith(reserved_prefixes):
+            continue
 
-        position = end_index
+        name_match = COLUMN_NAME_REGEX.match(stripped)
+        if name_match:
+            collected.append(name_match.group("name"))
 
-    return columns_map
+    return collected
 
 
 def _normalize_columns(
@@ -360,103 +316,376 @@ def iter_insert_statements(
     *,
     column_definitions: Optional[Dict[str, Sequence[str]]] = None,
 ) -> Iterator[InsertStatement]:
-    position = 0
-    length = len(sql_text)
+    return _iter_sql_statements([sql_text], column_definitions=column_definitions, track_create_table=False)
+
+
+def iter_insert_statements_stream(
+    chunks: Iterable[str],
+    *,
+    column_definitions: Optional[Dict[str, Sequence[str]]] = None,
+) -> Iterator[InsertStatement]:
+    """流式解析 SQL 文本块，逐条产出 ``InsertStatement``。
+
+    引号、转义与括号状态跨块保持，内存中最多保留一条 INSERT 语句与一个读取块。
+    遇到 ``CREATE TABLE`` 时会把列定义记录到 ``column_definitions``（就地更新），
+    供其后没有显式列名的 INSERT 使用。
+    """
+
+    if column_definitions is None:
+        column_definitions = {}
+    return _iter_sql_statements(chunks, column_definitions=column_definitions, track_create_table=True)
+
+
+class _ChunkBuffer:
+    """SQL 文本缓冲区：``start`` 之前的内容已消费，补充数据时才真正丢弃，避免每条语句都复制缓冲区。"""
+
+    def __init__(self, chunks: Iterable[str]) -> None:
+        self._chunks = iter(chunks)
+        self.text = ""
+        self.start = 0
+
+    def fill(self) -> Optional[int]:
+        """追加下一块数据并丢弃已消费部分；返回位置偏移量，无更多数据时返回 ``None``。"""
+
+        for chunk in self._chunks:
+            if chunk:
+                shift = self.start
+                self.text = self.text[shift:] + chunk
+                self.start = 0
+                return shift
+        return None
+
+
+def _iter_sql_statements(
+    chunks: Iterable[str],
+    *,
+    column_definitions: Optional[Dict[str, Sequence[str]]],
+    track_create_table: bool,
+) -> Iterator[InsertStatement]:
+    for table, raw_columns, values_block in _iter_values_blocks(
+        chunks, column_definitions=column_definitions, track_create_table=track_create_table
+    ):
+        yield from _statements_from_block(table, raw_columns, values_block, column_definitions)
+
+
+def _iter_values_blocks(
+    chunks: Iterable[str],
+    *,
+    column_definitions: Optional[Dict[str, Sequence[str]]],
+    track_create_table: bool,
+) -> Iterator[Tuple[str, Optional[str], str]]:
+    """逐条产出 ``(table, raw_columns, values_block)``，尚未拆分/解析 VALUES 元组。"""
+
+    buffer = _ChunkBuffer(chunks)
+    buffer.fill()
 
     while True:
-        match = INSERT_HEAD_REGEX.search(sql_text, position)
-        if not match:
-            break
+        text, start = buffer.text, buffer.start
+        insert = INSERT_HEAD_REGEX.search(text, start)
+        create = None
+        if track_create_table:
+            # 只在下一条 INSERT 之前查找 CREATE TABLE，避免每条语句都扫描整个缓冲区
+            create = CREATE_TABLE_REGEX.search(text, start, insert.start() if insert else len(text))
+
+        if create and (insert is None or create.start() < insert.start()):
+            try:
+                block, end_index = _extract_parenthesized_block(text, create.end() - 1)
+            except SQLParseError:
+                if buffer.fill() is not None:
+                    continue
+                raise
+            collected = _collect_create_columns(block)
+            if collected:
+                column_definitions[create.group("table").lower()] = collected
+            # 与整体解析一致：INSERT 的查找不受 CREATE TABLE 块边界影响
+            buffer.start = create.end()
+            continue
 
-        table = match.group("table")
-        raw_columns = match.group("columns")
-        values_start = match.end()
-        index = values_start
-        in_string: Optional[str] = None
-        escape = False
-        depth = 0
-        values_block: Optional[str] = None
+        if insert is None:
+            # 语句头可能跨块，只保留尾部一段继续匹配
+            buffer.start = max(start, len(text) - _HEAD_KEEP_CHARS)
+            if buffer.fill() is None:
+                return
+            continue
+
+        table = insert.group("table")
+        raw_columns = insert.group("columns")
+        values_block = _scan_values_block(buffer, insert.end())
+
+        values_block = values_block.strip()
+        if not values_block:
+            continue
+        yield table, raw_columns, values_block
 
-        while index < length:
-            char = sql_text[index]
 
+def _scan_values_block(buffer: _ChunkBuffer, values_start: int) -> str:
+    """从 VALUES 之后扫描到顶层分号，返回 VALUES 内容并把缓冲区推进到分号之后。
+
+    用正则跳到下一个有意义的字符，而不是逐字符循环；数据不足时从缓冲区继续读取。
+    单引号字符串中的 ``''`` 等价于先闭合再打开，无需向后查看。
+    """
+
+    index = values_start
+    in_string: Optional[str] = None
+    escape = False
+    depth = 0
+
+    while True:
+        text = buffer.text
+        length = len(text)
+        while index < length:
+            if escape:
+                escape = False
+                index += 1
+                continue
             if in_string:
-                if escape:
-                    escape = False
-                elif char == "\\":
+                match = _STRING_SPECIAL[in_string].search(text, index)
+                if match is None:
+                    index = length
+                    break
+                index = match.end()
+                if match.group() == "\\":
                     escape = True
-                elif char == in_string:
-                    if char == "'" and index + 1 < length and sql_text[index + 1] == "'":
-                        index += 1
-                    else:
-                        in_string = None
-                index += 1
+                else:
+                    in_string = None
                 continue
 
+            match = _VALUES_SPECIAL.search(text, index)
+            if match is None:
+                index = length
+                break
+            char = match.group()
+            index = match.end()
             if char in ("'", '"'):
                 in_string = char
-                index += 1
-                continue
-
-            if char == "(":
+            elif char == "(":
                 depth += 1
-                index += 1
-                continue
-
-            if char == ")":
+            elif char == ")":
                 if depth > 0:
                     depth -= 1
-                index += 1
-                continue
+            elif depth == 0:
+                buffer.start = index
+                return text[values_start:index - 1]
 
-            if char == ";" and depth == 0:
-                values_block = sql_text[values_start:index]
-                index += 1
-                break
+        buffer.start = values_start
+        shift = buffer.fill()
+        if shift is None:
+            buffer.start = length
+            return text[values_start:].rstrip()
+        values_start -= shift
+        index -= shift
 
-            index += 1
 
-        if values_block is None:
-            values_block = sql_text[values_start:].rstrip()
-            index = length
+def _statements_from_block(
+    table: str,
+    raw_columns: Optional[str],
+    values_block: str,
+    column_definitions: Optional[Dict[str, Sequence[str]]],
+) -> Iterator[InsertStatement]:
+    try:
+        for tuple_text in _split_value_tuples(values_block):
+            parsed_values = _parse_value_tuple(tuple_text)
+            fallback = None
+            if column_definitions:
+                fallback = column_definitions.get(table.lower())
+            columns = _normalize_columns(
+                raw_columns,
+                len(parsed_values),
+                fallback=fallback,
+                table=table,
+            )
+            if len(columns) != len(parsed_values):
+                LOGGER.warning(
+                    "列数量与数据数量不一致 (table=%s): %s vs %s", table, len(columns), len(parsed_values)
+                )
+                continue
+            yield InsertStatement(table=table, columns=columns, values=parsed_values)
+    except SQLParseError as exc:
+        LOGGER.warning("解析 INSERT 语句失败 (table=%s): %s", table, exc)
 
-        position = index
 
-        values_block = values_block.strip()
-        if not values_block:
-            continue
+def _detect_entry_encoding(archive: ZipFile, entry: ZipInfo, encodings: Sequence[str]) -> str:
+    """流式校验整个条目，返回第一个能完整解码的编码（与一次性 decode 的选择一致）。"""
 
+    last_exc: Optional[Exception] = None
+    for encoding in encodings:
         try:
-            for tuple_text in _split_value_tuples(values_block):
-                parsed_values = _parse_value_tuple(tuple_text)
-                fallback = None
-                if column_definitions:
-                    fallback = column_definitions.get(table.lower())
-                columns = _normalize_columns(
-                    raw_columns,
-                    len(parsed_values),
-                    fallback=fallback,
-                    table=table,
-                )
-                if len(columns) != len(parsed_values):
-                    LOGGER.warning(
-                        "列数量与数据数量不一致 (table=%s): %s vs %s", table, len(columns), len(parsed_values)
-                    )
-                    continue
-                yield InsertStatement(table=table, columns=columns, values=parsed_values)
-        except SQLParseError as exc:
-            LOGGER.warning("解析 INSERT 语句失败 (table=%s): %s", table, exc)
-            continue
+            decoder = codecs.getincrementaldecoder(encoding)()
+            with archive.open(entry) as raw:
+                for chunk in iter(lambda: raw.read(STREAM_CHUNK_SIZE), b""):
+                    decoder.decode(chunk)
+            decoder.decode(b"", final=True)
+            return encoding
+        except Exception as exc:  # pragma: no cover - 非常规编码
+            last_exc = exc
+    if last_exc:
+        raise last_exc
+    return "utf-8"
+
+
+def _iter_entry_text(archive: ZipFile, entry: ZipInfo, encoding: str) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with archive.open(entry) as raw:
+        for chunk in iter(lambda: raw.read(STREAM_CHUNK_SIZE), b""):
+            yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
 
 
-def _determine_id(columns: Sequence[str], row: dict, table: str, fallback_counter: int) -> str:
-    preferred = {"id", "case_id", "caseid", "doc_id", "document_id"}
+_PREFERRED_ID_COLUMNS = {"id", "case_id", "caseid", "doc_id", "document_id"}
+
+
+def _preferred_id(columns: Sequence[str], row: dict) -> Optional[str]:
     for column in columns:
-        if column.lower() in preferred:
+        if column.lower() in _PREFERRED_ID_COLUMNS:
             value = row.get(column)
             if value is not None and value != "":
                 return str(value)
-    return f"{table}-{fallback_counter}"
+    return None
+
+
+# (table, raw_columns, values_block, CREATE TABLE 列定义)
+ValuesBlock = Tuple[str, Optional[str], str, Optional[Sequence[str]]]
+# (table, _source（dict 或其 JSON 文本）, 由 id 类字段得到的 _id 或 None)
+ConvertedRow = Tuple[str, Any, Optional[str]]
+
+
+def _convert_blocks(blocks: Sequence[ValuesBlock], serialize: bool = True) -> List[ConvertedRow]:
+    """解析并增强一批 INSERT 语句（可在子进程中执行）。
+
+    回退 ``_id`` 依赖按表的全局计数，只能在合并时按顺序分配，因此这里只给出
+    id 类字段的值，没有时返回 ``None``。
+    """
+
+    converted: List[ConvertedRow] = []
+    for table, raw_columns, values_block, fallback in blocks:
+        definitions = {table.lower(): fallback} if fallback else None
+        for statement in _statements_from_block(table, raw_columns, values_block, definitions):
+            row = dict(zip(statement.columns, statement.values))
+            if table.lower() == "case_recovery":
+                row = enrich_case_recovery_row(row)
+            source = json.dumps(row, ensure_ascii=False) if serialize else row
+            converted.append((table, source, _preferred_id(statement.columns, row)))
+    return converted
+
+
+def _iter_block_batches(
+    archive: ZipFile,
+    allowed_tables: Optional[set],
+    decode_encodings: Sequence[str],
+    batch_chars: int,
+) -> Iterator[List[ValuesBlock]]:
+    """按压缩包中的顺序切分 INSERT 语句，每批 VALUES 文本约 ``batch_chars`` 个字符。"""
+
+    for entry in archive.infolist():
+        if entry.is_dir():
+            continue
+        if not entry.filename.lower().endswith(".sql"):
+            continue
+
+        encoding = _detect_entry_encoding(archive, entry, decode_encodings)
+        LOGGER.info("正在解析 SQL 文件: %s (%s)", entry.filename, encoding)
+        column_map: Dict[str, List[str]] = {}
+        batch: List[ValuesBlock] = []
+        size = 0
+
+        for table, raw_columns, values_block in _iter_values_blocks(
+            _iter_entry_text(archive, entry, encoding),
+            column_definitions=column_map,
+            track_create_table=True,
+        ):
+            table_lower = table.lower()
+            if allowed_tables and table_lower not in allowed_tables:
+                continue
+            batch.append((table, raw_columns, values_block, column_map.get(table_lower)))
+            size += len(values_block)
+            if size >= batch_chars:
+                yield batch
+                batch = []
+                size = 0
+        if batch:
+            yield batch
+
+
+def _write_converted(handle, rows: Iterable[ConvertedRow], stats: Counter, index_name: Optional[str]) -> int:
+    """按顺序累计表计数、分配回退 ``_id`` 并写出；格式与 ``json.dumps(record)`` 完全一致。"""
+
+    index_suffix = f', "_index": {json.dumps(index_name, ensure_ascii=False)}' if index_name else ""
+    written = 0
+    for table, source_json, doc_id in rows:
+        stats[table] += 1
+        if doc_id is None:
+            doc_id = f"{table}-{stats[table]}"
+        handle.write(f'{{"_source": {source_json}, "_id": {json.dumps(doc_id, ensure_ascii=False)}{index_suffix}}}\n')
+        written += 1
+    return written
+
+
+def _iter_converted_rows(
+    zip_path: str,
+    *,
+    include_tables: Optional[Sequence[str]],
+    decode_encodings: Optional[Sequence[str]],
+    workers: int,
+    batch_chars: int,
+    serialize: bool,
+) -> Iterator[List[ConvertedRow]]:
+    """按压缩包中的顺序逐批产出转换结果；``workers > 1`` 时由进程池并行转换、按提交顺序合并。"""
+
+    if decode_encodings is None:
+        decode_encodings = ("utf-8", "utf-8-sig", "gb18030", "latin-1")
+    allowed_tables = {table.lower() for table in include_tables} if include_tables else None
+
+    with ZipFile(zip_path, "r") as archive:
+        batches = _iter_block_batches(archive, allowed_tables, decode_encodings, batch_chars)
+        if workers <= 1:
+            for batch in batches:
+                yield _convert_blocks(batch, serialize)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending: Deque[Future] = deque()
+            for batch in batches:
+                pending.append(pool.submit(_convert_blocks, batch, serialize))
+                # 限制在途批次数量，避免解析速度快于写出时内存无限增长
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+
+def iter_zip_records(
+    zip_path: str,
+    *,
+    index_name: Optional[str] = "cases",
+    include_tables: Optional[Sequence[str]] = None,
+    decode_encodings: Optional[Sequence[str]] = None,
+    workers: int = 1,
+    batch_chars: int = PARALLEL_BATCH_CHARS,
+    stats: Optional[Counter] = None,
+) -> Iterator[Dict[str, Any]]:
+    """逐条产出与 JSONL 输出相同的 ``{"_source", "_id", "_index"}`` 记录，不落盘。
+
+    ``stats`` 会按表就地累计，供调用方在迭代结束后读取。
+    """
+
+    if stats is None:
+        stats = Counter()
+    for rows in _iter_converted_rows(
+        zip_path,
+        include_tables=include_tables,
+        decode_encodings=decode_encodings,
+        workers=workers,
+        batch_chars=batch_chars,
+        serialize=False,
+    ):
+        for table, source, doc_id in rows:
+            stats[table] += 1
+            if doc_id is None:
+                doc_id = f"{table}-{stats[table]}"
+            record = {"_source": source, "_id": doc_id}
+            if index_name:
+                record["_index"] = index_name
+            yield record
 
 
 def convert_zip_to_jsonl(
@@ -466,46 +695,120 @@ def convert_zip_to_jsonl(
     index_name: Optional[str] = "cases",
     include_tables: Optional[Sequence[str]] = None,
     decode_encodings: Optional[Sequence[str]] = None,
+    workers: int = 1,
+    batch_chars: int = PARALLEL_BATCH_CHARS,
 ) -> Tuple[int, Counter]:
-    if decode_encodings is None:
-        decode_encodings = ("utf-8", "utf-8-sig", "gb18030", "latin-1")
+    """转换压缩包中的所有 ``.sql`` 文件。
+
+    ``workers > 1`` 时，主进程只负责切分语句，VALUES 解析、HTML 清洗与关键词提取
+    分发到进程池；结果按提交顺序合并，``stats`` 与回退 ``_id`` 和单进程完全一致。
+    """
 
-    allowed_tables = {table.lower() for table in include_tables} if include_tables else None
     stats: Counter = Counter()
     written = 0
 
     os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
 
-    with ZipFile(zip_path, "r") as archive, open(output_path, "w", encoding="utf-8") as handle:
-        for entry in archive.infolist():
-            if entry.is_dir():
-                continue
-            if not entry.filename.lower().endswith(".sql"):
-                continue
+    with open(output_path, "w", encoding="utf-8") as handle:
+        for rows in _iter_converted_rows(
+            zip_path,
+            include_tables=include_tables,
+            decode_encodings=decode_encodings,
+            workers=workers,
+            batch_chars=batch_chars,
+            serialize=True,
+        ):
+            written += _write_converted(handle, rows, stats, index_name)
 
-            raw_text = _decode_bytes(archive.read(entry), decode_encodings)
-            LOGGER.info("正在解析 SQL 文件: %s", entry.filename)
-            column_map = _extract_table_columns(raw_text)
+    return written, stats
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise RuntimeError("输出 Parquet 需要安装 pyarrow：pip install pyarrow") from exc
+    return pyarrow, pyarrow.parquet
+
+
+def parquet_schema():
+    pa, _ = _import_pyarrow()
+    return pa.schema(
+        [("id", pa.string()), ("table", pa.string())]
+        + [(column, pa.string()) for column in PARQUET_STRING_COLUMNS]
+        + [("tags", pa.list_(pa.string()))]
+        + [(column, pa.int64()) for column in PARQUET_INT_COLUMNS]
+        + [(PARQUET_EXTRA_COLUMN, pa.string())]
+    )
 
-            for statement in iter_insert_statements(
-                raw_text,
-                column_definitions=column_map,
-            ):
-                table_lower = statement.table.lower()
-                if allowed_tables and table_lower not in allowed_tables:
-                    continue
 
-                row = dict(zip(statement.columns, statement.values))
-                if table_lower == "case_recovery":
-                    row = enrich_case_recovery_row(row)
-                stats[statement.table] += 1
-                doc_id = _determine_id(statement.columns, row, statement.table, stats[statement.table])
-                record = {"_source": row, "_id": doc_id}
-                if index_name:
-                    record["_index"] = index_name
-                handle.write(json.dumps(record, ensure_ascii=False))
-                handle.write("\n")
-                written += 1
+def _parquet_row(table: str, source: Dict[str, Any], doc_id: str) -> Dict[str, Any]:
+    """按固定 schema 拆分一行；类型不符或不在 schema 中的字段原样放入 extra。"""
+
+    row: Dict[str, Any] = {"id": doc_id, "table": table}
+    extra: Dict[str, Any] = {}
+    for key, value in source.items():
+        if value is None or key in ("id", "table"):
+            continue
+        if key in PARQUET_STRING_COLUMNS and isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            row[key] = str(value)
+        elif key in PARQUET_INT_COLUMNS and _parse_int(value) is not None:
+            row[key] = _parse_int(value)
+        elif key == "tags" and isinstance(value, (list, tuple)):
+            row[key] = [str(tag) for tag in value if tag is not None]
+        else:
+            extra[key] = value
+    if extra:
+        row[PARQUET_EXTRA_COLUMN] = json.dumps(extra, ensure_ascii=False)
+    return row
+
+
+def convert_zip_to_parquet(
+    zip_path: str,
+    output_path: str,
+    *,
+    include_tables: Optional[Sequence[str]] = None,
+    decode_encodings: Optional[Sequence[str]] = None,
+    workers: int = 1,
+    batch_chars: int = PARALLEL_BATCH_CHARS,
+    row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+) -> Tuple[int, Counter]:
+    """与 :func:`convert_zip_to_jsonl` 相同的转换，输出为固定 schema 的 Parquet 文件。
+
+    ``id`` 与 JSONL 中的 ``_id`` 相同；读取端可只加载所需的列（见
+    ``app.utils.data_loader.iter_records(path, columns=...)``）。
+    """
+
+    pa, pq = _import_pyarrow()
+    schema = parquet_schema()
+    stats: Counter = Counter()
+    written = 0
+    pending: List[Dict[str, Any]] = []
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    with pq.ParquetWriter(output_path, schema, compression="zstd") as writer:
+        for rows in _iter_converted_rows(
+            zip_path,
+            include_tables=include_tables,
+            decode_encodings=decode_encodings,
+            workers=workers,
+            batch_chars=batch_chars,
+            serialize=False,
+        ):
+            for table, source, doc_id in rows:
+                stats[table] += 1
+                if doc_id is None:
+                    doc_id = f"{table}-{stats[table]}"
+                pending.append(_parquet_row(table, source, doc_id))
+            if len(pending) >= row_group_size:
+                writer.write_table(pa.Table.from_pylist(pending, schema=schema))
+                written += len(pending)
+                pending = []
+        if pending:
+            writer.write_table(pa.Table.from_pylist(pending, schema=schema))
+            written += len(pending)
 
     return written, stats
 
@@ -513,7 +816,12 @@ def convert_zip_to_jsonl(
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="将 SQL dump 转换为 OpenSearch JSONL 数据")
     parser.add_argument("--zip", required=True, help="包含 SQL 文件的压缩包，例如 case_recovery.zip")
-    parser.add_argument("--output", "-o", required=True, help="输出 JSONL 文件路径")
+    parser.add_argument("--output", "-o", required=True, help="输出文件路径")
+    parser.add_argument(
+        "--format",
+        choices=("jsonl", "parquet"),
+        help="输出格式；默认按 --output 扩展名判断（.parquet 为 Parquet，其余为 JSONL）",
+    )
     parser.add_argument("--index", "-i", default="cases", help="写入记录时使用的 _index 值；留空表示不写入")
     parser.add_argument(
         "--tables",
@@ -526,6 +834,12 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         default=["utf-8", "utf-8-sig", "gb18030", "latin-1"],
         help="按优先顺序尝试的文本编码",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="解析进程数；大于 1 时按 INSERT 语句分批并行转换，输出顺序与单进程一致（0 表示使用全部 CPU）",
+    )
     parser.add_argument("--verbose", "-v", action="count", default=0, help="输出更详细的日志")
     return parser.parse_args(argv)
 
@@ -547,14 +861,26 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         LOGGER.error("压缩包不存在: %s", args.zip)
         return 1
 
+    output_format = args.format or ("parquet" if args.output.lower().endswith(".parquet") else "jsonl")
+    workers = args.workers or os.cpu_count() or 1
     try:
-        total, stats = convert_zip_to_jsonl(
-            args.zip,
-            args.output,
-            index_name=(args.index or None),
-            include_tables=args.tables,
-            decode_encodings=args.encoding,
-        )
+        if output_format == "parquet":
+            total, stats = convert_zip_to_parquet(
+                args.zip,
+                args.output,
+                include_tables=args.tables,
+                decode_encodings=args.encoding,
+                workers=workers,
+            )
+        else:
+            total, stats = convert_zip_to_jsonl(
+                args.zip,
+                args.output,
+                index_name=(args.index or None),
+                include_tables=args.tables,
+                decode_encodings=args.encoding,
+                workers=workers,
+            )
     except Exception as exc:  # pragma: no cover - 运行时异常统一兜底
         LOGGER.error("转换失败: %s", exc)
         return 1
@@ -658,27 +984,186 @@ def parse_sql_values(values_str: str) -> List[str]:
     
     return fields
 
-def extract_system_from_discussion(discussion: str) -> str:
+# 常见汽车系统关键词（按优先级排列，命中第一个系统即返回）
+SYSTEM_KEYWORDS: Dict[str, List[str]] = {
+    "发动机": ["发动机", "引擎", "ECM", "ECU", "点火", "燃油", "进气", "排气", "冷却", "润滑"],
+    "制动": ["制动", "刹车", "ABS", "ESP", "制动器", "制动盘", "制动片"],
+    "变速箱/传动": ["变速箱", "变速器", "离合器", "传动", "CVT", "差速器", "传动轴"],
+    "底盘/悬挂": ["悬挂", "减震", "弹簧", "控制臂", "稳定杆", "底盘", "副车架"],
+    "转向": ["转向", "方向盘", "助力", "转向机", "转向拉杆"],
+    "空调": ["空调", "制冷", "压缩机", "冷凝器", "蒸发器", "鼓风机"],
+    "电子电气": ["电瓶", "电池", "线束", "插头", "传感器", "模块", "控制器", "MCU"],
+    "车身": ["车门", "车窗", "大灯", "尾灯", "雨刮", "后视镜"]
+}
+
+# 品牌影响因子（基于市场占有率和普及度）
+BRAND_FACTORS = {
+    "大众": 1.3, "丰田": 1.3, "本田": 1.2, "日产": 1.2, "现代": 1.2,
+    "比亚迪": 1.4, "吉利": 1.3, "长安": 1.2, "奇瑞": 1.1, "长城": 1.1,
+    "奔驰": 1.1, "宝马": 1.1, "奥迪": 1.2, "福特": 1.2, "别克": 1.1,
+    "雪佛兰": 1.1, "起亚": 1.1, "马自达": 1.0, "三菱": 1.0, "斯巴鲁": 0.9,
+    "保时捷": 0.8, "法拉利": 0.7, "兰博基尼": 0.6, "劳斯莱斯": 0.6
+}
+
+# 系统影响因子（基于故障频率）
+SYSTEM_FACTORS = {
+    "发动机": 1.5,      # 发动机故障最常见
+    "电子电气": 1.4,    # 电子系统故障频发
+    "变速箱/传动": 1.3, # 传动系统故障较多
+    "制动": 1.2,        # 制动系统安全相关
+    "空调": 1.1,        # 空调故障较常见
+    "转向": 1.1,        # 转向系统重要
+    "底盘/悬挂": 1.0,   # 底盘故障中等
+    "车身": 0.9,        # 车身故障相对较少
+    "其他": 0.8
+}
+
+# 故障严重程度因子（按顺序取第一个命中的规则）
+SEVERITY_RULES = [
+    (["无法启动", "不能启动", "打不着火"], 1.6),  # 启动故障严重
+    (["失去动力", "动力中断", "突然熄火"], 1.5),  # 动力故障严重
+    (["制动失效", "刹车失灵", "制动距离长"], 1.4),  # 制动故障安全相关
+    (["故障灯", "报警", "警告灯"], 1.3),  # 故障灯提示问题
+    (["异响", "噪音", "声音异常"], 1.2),  # 异响问题常见
+    (["抖动", "震动", "颤抖"], 1.2),  # 抖动问题影响驾驶
+    (["漏油", "渗油", "油液泄漏"], 1.1),  # 漏油问题需要关注
+]
+
+# 故障频率因子（按顺序取第一个命中的规则）
+FREQUENCY_RULES = [
+    (["偶发", "间歇", "偶尔"], 0.8),  # 偶发故障相对少见
+    (["持续", "一直", "经常"], 1.3),  # 持续故障更常见
+    (["冷车", "热车"], 1.1),  # 温度相关故障较常见
+]
+
+# 故障类型标签（每条规则独立判断）
+TAG_RULES = [
+    (["无法启动", "启动困难", "打不着火"], "启动故障"),
+    (["异响", "噪音", "声音"], "异响"),
+    (["漏油", "渗油", "油液"], "漏油"),
+    (["故障灯", "报警", "警告灯"], "故障灯"),
+    (["抖动", "震动", "颤抖"], "抖动"),
+    (["无力", "动力不足", "加速慢"], "动力不足"),
+    (["过热", "高温", "温度高"], "过热"),
+    (["漏电", "短路", "断路"], "电路故障"),
+]
+
+
+class KeywordMatcher:
+    """预编译的多关键词匹配器，一次扫描即可得到文本中出现的全部关键词（含相互重叠的）。
+
+    思路与 Aho–Corasick 相同：关键词按公共前缀合并成字典树并编译为单个正则，
+    由 ``re`` 在 C 层完成 goto 跳转，每个匹配内部包含的关键词在构建时预先算好
+    （对应失败链接上的输出）。非重叠扫描会跳过从某个匹配中间开始、又越过其结尾的
+    关键词，因此构建时把这类重叠拼接成更长的模式（如 ``颤抖`` + ``抖动`` → ``颤抖动``），
+    同一位置优先匹配最长模式即可覆盖；拼接过长时退回到逐个 ``in`` 补查。
+    """
+
+    _MAX_FUSED_FACTOR = 2
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = frozenset(keyword for keyword in keywords if keyword)
+        patterns = set(self.keywords)
+        fallback = set()
+        max_length = self._MAX_FUSED_FACTOR * max((len(keyword) for keyword in self.keywords), default=0)
+        pending = list(patterns)
+        while pending:
+            pattern = pending.pop()
+            for offset in range(1, len(pattern)):
+                suffix = pattern[offset:]
+                for keyword in self.keywords:
+                    if len(keyword) <= len(suffix) or not keyword.startswith(suffix):
+                        continue
+                    fused = pattern[:offset] + keyword
+                    if len(fused) > max_length:
+                        fallback.add(keyword)
+                    elif fused not in patterns:
+                        patterns.add(fused)
+                        pending.append(fused)
+
+        trie: Dict[str, Any] = {}
+        for pattern in patterns:
+            node = trie
+            for char in pattern:
+                node = node.setdefault(char, {})
+            node[""] = True
+        self._pattern = re.compile(self._trie_pattern(trie)) if patterns else None
+        self._inside = {
+            pattern: frozenset(keyword for keyword in self.keywords if keyword in pattern) for pattern in patterns
+        }
+        self._fallback = tuple(sorted(fallback))
+
+    @classmethod
+    def _trie_pattern(cls, node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + cls._trie_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # 贪婪可选：同一位置优先匹配更长的模式
+            pattern = ("(?:" + pattern + ")" if len(branches) == 1 else pattern) + "?"
+        return pattern
+
+    def scan(self, text: str) -> frozenset:
+        """返回 ``text`` 中出现的全部关键词，与逐个 ``keyword in text`` 的结果相同。"""
+
+        if self._pattern is None:
+            return frozenset()
+        inside = self._inside
+        found = frozenset().union(*[inside[pattern] for pattern in self._pattern.findall(text)])
+        for keyword in self._fallback:
+            if keyword not in found and keyword in text:
+                found |= inside[keyword]
+        return found
+
+
+@dataclass(frozen=True)
+class CaseKeywordHits:
+    content: frozenset  # 症状 + 故障点中出现的关键词（小写）
+    discussion: frozenset  # 仅故障点中出现的关键词（小写）
+
+
+def _lowered_rules(rules: Iterable[Tuple[Sequence[str], Any]]) -> List[Tuple[frozenset, Any]]:
+    return [(frozenset(keyword.lower() for keyword in keywords), value) for keywords, value in rules]
+
+
+_SYSTEM_RULES = _lowered_rules((keywords, system) for system, keywords in SYSTEM_KEYWORDS.items())
+_SEVERITY_RULES = _lowered_rules(SEVERITY_RULES)
+_FREQUENCY_RULES = _lowered_rules(FREQUENCY_RULES)
+_TAG_RULES = _lowered_rules(TAG_RULES)
+_CASE_KEYWORD_MATCHER = KeywordMatcher(
+    keyword
+    for rules in (_SYSTEM_RULES, _SEVERITY_RULES, _FREQUENCY_RULES, _TAG_RULES)
+    for keywords, _ in rules
+    for keyword in keywords
+)
+# 与 random.seed/randint 的结果一致，但不会修改全局随机数状态
+_POPULARITY_RANDOM = random.Random()
+
+
+def match_case_keywords(symptoms: str, discussion: str) -> CaseKeywordHits:
+    """对一条案例只扫描一次，结果供系统提取、标签生成与流行度计算共用。"""
+
+    discussion_hits = _CASE_KEYWORD_MATCHER.scan(discussion.lower())
+    # 关键词不含空格，"症状 + 空格 + 故障点" 中的命中即两段各自命中的并集
+    return CaseKeywordHits(
+        content=_CASE_KEYWORD_MATCHER.scan(symptoms.lower()) | discussion_hits,
+        discussion=discussion_hits,
+    )
+
+
+def _first_matching_rule(rules: List[Tuple[frozenset, Any]], hits: frozenset, default: Any) -> Any:
+    for keywords, value in rules:
+        if not keywords.isdisjoint(hits):
+            return value
+    return default
+
+
+def extract_system_from_discussion(discussion: str, *, hits: Optional[CaseKeywordHits] = None) -> str:
     """从故障点描述中提取系统信息"""
-    # 常见汽车系统关键词
-    systems = {
-        "发动机": ["发动机", "引擎", "ECM", "ECU", "点火", "燃油", "进气", "排气", "冷却", "润滑"],
-        "制动": ["制动", "刹车", "ABS", "ESP", "制动器", "制动盘", "制动片"],
-        "变速箱/传动": ["变速箱", "变速器", "离合器", "传动", "CVT", "差速器", "传动轴"],
-        "底盘/悬挂": ["悬挂", "减震", "弹簧", "控制臂", "稳定杆", "底盘", "副车架"],
-        "转向": ["转向", "方向盘", "助力", "转向机", "转向拉杆"],
-        "空调": ["空调", "制冷", "压缩机", "冷凝器", "蒸发器", "鼓风机"],
-        "电子电气": ["电瓶", "电池", "线束", "插头", "传感器", "模块", "控制器", "MCU"],
-        "车身": ["车门", "车窗", "大灯", "尾灯", "雨刮", "后视镜"]
-    }
-    
-    discussion_lower = discussion.lower()
-    for system, keywords in systems.items():
-        for keyword in keywords:
-            if keyword.lower() in discussion_lower:
-                return system
-    
-    return "其他"
+    if hits is None:
+        hits = match_case_keywords("", discussion)
+    return _first_matching_rule(_SYSTEM_RULES, hits.discussion, "其他")
 
 def extract_part_from_discussion(discussion: str) -> Optional[str]:
     """从故障点描述中提取具体部件信息"""
@@ -713,68 +1198,25 @@ def calculate_popularity(
     system: str,
     *,
     search_num: Optional[Any] = None,
+    hits: Optional[CaseKeywordHits] = None,
 ) -> int:
     """基于故障特征计算流行度分数"""
     base_score = 100
-    content = (symptoms + " " + discussion).lower()
-    
-    # 品牌影响因子（基于市场占有率和普及度）
-    brand_factors = {
-        "大众": 1.3, "丰田": 1.3, "本田": 1.2, "日产": 1.2, "现代": 1.2,
-        "比亚迪": 1.4, "吉利": 1.3, "长安": 1.2, "奇瑞": 1.1, "长城": 1.1,
-        "奔驰": 1.1, "宝马": 1.1, "奥迪": 1.2, "福特": 1.2, "别克": 1.1,
-        "雪佛兰": 1.1, "起亚": 1.1, "马自达": 1.0, "三菱": 1.0, "斯巴鲁": 0.9,
-        "保时捷": 0.8, "法拉利": 0.7, "兰博基尼": 0.6, "劳斯莱斯": 0.6
-    }
-    brand_factor = brand_factors.get(brand, 1.0)
-    
-    # 系统影响因子（基于故障频率）
-    system_factors = {
-        "发动机": 1.5,      # 发动机故障最常见
-        "电子电气": 1.4,    # 电子系统故障频发
-        "变速箱/传动": 1.3, # 传动系统故障较多
-        "制动": 1.2,        # 制动系统安全相关
-        "空调": 1.1,        # 空调故障较常见
-        "转向": 1.1,        # 转向系统重要
-        "底盘/悬挂": 1.0,   # 底盘故障中等
-        "车身": 0.9,        # 车身故障相对较少
-        "其他": 0.8
-    }
-    system_factor = system_factors.get(system, 1.0)
-    
-    # 故障严重程度因子
-    severity_factor = 1.0
-    if any(word in content for word in ["无法启动", "不能启动", "打不着火"]):
-        severity_factor = 1.6  # 启动故障严重
-    elif any(word in content for word in ["失去动力", "动力中断", "突然熄火"]):
-        severity_factor = 1.5  # 动力故障严重
-    elif any(word in content for word in ["制动失效", "刹车失灵", "制动距离长"]):
-        severity_factor = 1.4  # 制动故障安全相关
-    elif any(word in content for word in ["故障灯", "报警", "警告灯"]):
-        severity_factor = 1.3  # 故障灯提示问题
-    elif any(word in content for word in ["异响", "噪音", "声音异常"]):
-        severity_factor = 1.2  # 异响问题常见
-    elif any(word in content for word in ["抖动", "震动", "颤抖"]):
-        severity_factor = 1.2  # 抖动问题影响驾驶
-    elif any(word in content for word in ["漏油", "渗油", "油液泄漏"]):
-        severity_factor = 1.1  # 漏油问题需要关注
-    
-    # 故障频率因子（基于关键词出现频率）
-    frequency_factor = 1.0
-    if any(word in content for word in ["偶发", "间歇", "偶尔"]):
-        frequency_factor = 0.8  # 偶发故障相对少见
-    elif any(word in content for word in ["持续", "一直", "经常"]):
-        frequency_factor = 1.3  # 持续故障更常见
-    elif any(word in content for word in ["冷车", "热车"]):
-        frequency_factor = 1.1  # 温度相关故障较常见
+    if hits is None:
+        hits = match_case_keywords(symptoms, discussion)
+
+    brand_factor = BRAND_FACTORS.get(brand, 1.0)
+    system_factor = SYSTEM_FACTORS.get(system, 1.0)
+
+    severity_factor = _first_matching_rule(_SEVERITY_RULES, hits.content, 1.0)
+    frequency_factor = _first_matching_rule(_FREQUENCY_RULES, hits.content, 1.0)
     
     # 计算最终流行度
     popularity = int(base_score * brand_factor * system_factor * severity_factor * frequency_factor)
 
     # 添加随机扰动，避免完全相同的分数
-    import random
-    random.seed(hash(symptoms + discussion) % 2147483647)  # 基于内容的固定种子
-    popularity += random.randint(-10, 10)
+    _POPULARITY_RANDOM.seed(hash(symptoms + discussion) % 2147483647)  # 基于内容的固定种子
+    popularity += _POPULARITY_RANDOM.randint(-10, 10)
 
     popularity = max(50, min(500, popularity))
 
@@ -789,7 +1231,9 @@ def calculate_popularity(
     combined = int(round(0.6 * scaled + 0.4 * popularity))
     return max(50, min(500, combined))
 
-def generate_tags_from_content(symptoms: str, discussion: str, brand: str) -> List[str]:
+def generate_tags_from_content(
+    symptoms: str, discussion: str, brand: str, *, hits: Optional[CaseKeywordHits] = None
+) -> List[str]:
     """根据内容生成标签"""
     tags = []
     
@@ -797,26 +1241,12 @@ def generate_tags_from_content(symptoms: str, discussion: str, brand: str) -> Li
     if brand:
         tags.append(brand)
     
-    # 根据症状和讨论内容生成标签
-    content = (symptoms + " " + discussion).lower()
-    
-    # 故障类型标签
-    if any(word in content for word in ["无法启动", "启动困难", "打不着火"]):
-        tags.append("启动故障")
-    if any(word in content for word in ["异响", "噪音", "声音"]):
-        tags.append("异响")
-    if any(word in content for word in ["漏油", "渗油", "油液"]):
-        tags.append("漏油")
-    if any(word in content for word in ["故障灯", "报警", "警告灯"]):
-        tags.append("故障灯")
-    if any(word in content for word in ["抖动", "震动", "颤抖"]):
-        tags.append("抖动")
-    if any(word in content for word in ["无力", "动力不足", "加速慢"]):
-        tags.append("动力不足")
-    if any(word in content for word in ["过热", "高温", "温度高"]):
-        tags.append("过热")
-    if any(word in content for word in ["漏电", "短路", "断路"]):
-        tags.append("电路故障")
+    # 根据症状和讨论内容生成故障类型标签
+    if hits is None:
+        hits = match_case_keywords(symptoms, discussion)
+    for keywords, tag in _TAG_RULES:
+        if not keywords.isdisjoint(hits.content):
+            tags.append(tag)
     
     # 确保至少有基本标签
     if not tags:
@@ -847,10 +1277,13 @@ def enrich_case_recovery_row(row: Dict[str, Any]) -> Dict[str, Any]:
     symptoms_clean = clean_html_content(symptoms_source)
     discussion_clean = clean_html_content(discussion_source)
     brand = (enriched.get("vehiclebrand") or enriched.get("brand") or "").strip()
+    keyword_hits = match_case_keywords(symptoms_clean, discussion_clean)
 
     system_info = enriched.get("system")
     if not system_info:
-        system_info = extract_system_from_discussion(discussion_clean) if discussion_clean else "其他"
+        system_info = (
+            extract_system_from_discussion(discussion_clean, hits=keyword_hits) if discussion_clean else "其他"
+        )
 
     part_info = enriched.get("part")
     if not part_info:
@@ -860,7 +1293,7 @@ def enrich_case_recovery_row(row: Dict[str, Any]) -> Dict[str, Any]:
 
     tags_info = enriched.get("tags")
     if not tags_info:
-        tags_info = generate_tags_from_content(symptoms_clean, discussion_clean, brand)
+        tags_info = generate_tags_from_content(symptoms_clean, discussion_clean, brand, hits=keyword_hits)
 
     search_value = enriched.get("search_num")
     if search_value is None:
@@ -872,6 +1305,7 @@ def enrich_case_recovery_row(row: Dict[str, Any]) -> Dict[str, Any]:
         brand,
         system_info,
         search_num=search_value,
+        hits=keyword_hits,
     )
 
     search_content_raw = enriched.get("search") or enriched.get("search_content") or ""
@@ -27,6 +27,11 @@ def delete_index():
         
         index_name = INDEX_CONFIG['name']
         
+        # 蓝绿部署下该名称是查询别名，直接删除/重建会让线上查询中断
+        if client.indices.exists_alias(name=index_name):
+            print(f"⚠️  {index_name} 是蓝绿部署的查询别名，请改用 import_to_opensearch.py --blue-green 重建或 --rollback 回滚")
+            return False
+        
         print(f"🗑️  删除索引: {index_name}")
         
         # 检查索引是否存在
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""导出 embedding 与精排模型为 ONNX，并与 PyTorch 输出做一致性校验。
+
+导出结果写入 ``<onnx-dir>/<模型名>/``，服务端设置 ``INFERENCE_BACKEND=onnx``
+后即从该目录加载（``ONNX_QUANTIZE=1`` 时使用 int8 动态量化模型）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+from typing import List, Optional, Sequence
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from app.config import get_settings  # noqa: E402
+from app.onnx_backend import (  # noqa: E402
+    OnnxReranker,
+    OnnxSentenceEncoder,
+    compare_outputs,
+    export_embedder,
+    export_reranker,
+    model_export_dir,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+PARITY_QUERIES: List[str] = [
+    "发动机无法启动",
+    "刹车踏板变软制动力不足",
+    "空调不制冷，出风温度偏高",
+    "变速箱换挡顿挫",
+]
+PARITY_CANDIDATES: List[str] = [
+    "发动机无法启动，起动机工作但发动机点火失败，需要检查发动机控制系统",
+    "刹车踏板变软制动力不足，制动距离变长，应检查制动系统",
+    "变速器换挡顿挫，低速时出现冲击，需要检查变速箱控制逻辑",
+    "空调不制冷，鼓风机正常但出风温度偏高",
+    "仪表故障灯常亮，车辆偶发熄火",
+]
+
+
+def check_reranker_parity(model_name: str, model_dir: str) -> List[dict]:
+    from app.reranker import Reranker
+
+    torch_model = Reranker(model_name)
+    reference = [torch_model.score(q, PARITY_CANDIDATES) for q in PARITY_QUERIES]
+    reports = []
+    for quantized in (False, True):
+        onnx_model = OnnxReranker(model_dir, quantized=quantized)
+        if quantized and not onnx_model.quantized:
+            continue
+        candidate = [onnx_model.score(q, PARITY_CANDIDATES) for q in PARITY_QUERIES]
+        reports.append({"model": "reranker", "quantized": quantized, **compare_outputs(reference, candidate)})
+    return reports
+
+
+def check_embedder_parity(model_name: str, model_dir: str) -> List[dict]:
+    from sentence_transformers import SentenceTransformer
+
+    texts = PARITY_QUERIES + PARITY_CANDIDATES
+    torch_model = SentenceTransformer(model_name, trust_remote_code=True, device="cpu")
+    reference = torch_model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
+    reports = []
+    for quantized in (False, True):
+        onnx_model = OnnxSentenceEncoder(model_dir, quantized=quantized)
+        if quantized and not onnx_model.quantized:
+            continue
+        candidate = onnx_model.encode(texts, normalize_embeddings=True)
+        cosine = (reference * candidate).sum(axis=1)
+        reports.append({
+            "model": "embedder",
+            "quantized": quantized,
+            **compare_outputs(reference, candidate),
+            "min_cosine": float(cosine.min()),
+        })
+    return reports
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="导出 ONNX 推理模型并校验与 PyTorch 的一致性")
+    parser.add_argument("--reranker-model", default=settings.reranker_model, help="精排模型 ID 或路径")
+    parser.add_argument("--embedding-model", default=settings.embedding_model, help="embedding 模型 ID 或路径")
+    parser.add_argument("--onnx-dir", default=settings.onnx_model_dir, help="ONNX 模型输出目录")
+    parser.add_argument("--no-quantize", action="store_true", help="不生成 int8 动态量化模型")
+    parser.add_argument("--opset", type=int, default=14, help="ONNX opset 版本")
+    parser.add_argument("--skip-reranker", action="store_true", help="跳过精排模型")
+    parser.add_argument("--skip-embedder", action="store_true", help="跳过 embedding 模型")
+    parser.add_argument("--skip-parity", action="store_true", help="跳过一致性校验")
+    parser.add_argument("--tolerance", type=float, default=1e-3, help="fp32 模型允许的最大绝对误差")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    quantize = not args.no_quantize
+    reports: List[dict] = []
+
+    if not args.skip_reranker:
+        model_dir = model_export_dir(args.onnx_dir, args.reranker_model)
+        export_reranker(args.reranker_model, model_dir, quantize=quantize, opset=args.opset)
+        if not args.skip_parity:
+            reports.extend(check_reranker_parity(args.reranker_model, model_dir))
+
+    if not args.skip_embedder:
+        model_dir = model_export_dir(args.onnx_dir, args.embedding_model)
+        export_embedder(args.embedding_model, model_dir, quantize=quantize, opset=args.opset)
+        if not args.skip_parity:
+            reports.extend(check_embedder_parity(args.embedding_model, model_dir))
+
+    failed = False
+    for report in reports:
+        logger.info(
+            "一致性校验 %s (%s): max_abs_diff=%.6f mean_abs_diff=%.6f%s",
+            report["model"],
+            "int8" if report["quantized"] else "fp32",
+            report["max_abs_diff"],
+            report["mean_abs_diff"],
+            f" min_cosine={report['min_cosine']:.6f}" if "min_cosine" in report else "",
+        )
+        if not report["quantized"] and report["max_abs_diff"] > args.tolerance:
+            logger.error("%s fp32 ONNX 输出与 PyTorch 差异超出阈值 %s", report["model"], args.tolerance)
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI 入口
+    sys.exit(main())
@@ -120,6 +120,7 @@ if [[ "${DATA_FILE}" == *.zip ]]; then
     --zip "${DATA_FILE}" \
     --output "${TEMP_JSON}" \
     --index "${INDEX}" \
+    --workers "${SQL_WORKERS:-1}" \
     "${TABLE_ARGS[@]}"
   DATA_FILE="${TEMP_JSON}"
 fi
@@ -146,6 +147,7 @@ if [[ "${DATA_FILE}" == *.zip ]]; then
     --zip "${DATA_FILE}" \
     --output "${TEMP_JSON}" \
     --index "${INDEX}" \
+    --workers "${SQL_WORKERS:-1}" \
     "${TABLE_ARGS[@]}"
   DATA_FILE="${TEMP_JSON}"
 fi
@@ -6,6 +6,7 @@
 * 将原始 JSON 行数据转换成应用所需字段结构；
 * 按批次写入 OpenSearch；
 * 可选地启用 `knn_vector` 字段写入，并在需要时自动准备 embedding 模型。
+* 通过 `--zip` 直接解析 SQL dump 压缩包并流式导入，无需先生成 JSONL 中间文件。
 
 脚本尽可能复用应用内部的 embedding 加载逻辑，同时在缺少依赖时优雅回退。
 """
@@ -13,33 +14,54 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import copy
+import hashlib
 import importlib
 import importlib.util
 import json
 import logging
 import os
+import queue
 import re
 import sys
+import threading
+import time
+from collections import Counter
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from urllib.parse import urlparse
 
 from opensearchpy import OpenSearch
-from opensearchpy.helpers import bulk
+from opensearchpy.helpers import bulk, scan, streaming_bulk
 
 # 为了能够复用 app 内部的工具，将项目根目录加入 sys.path
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
+from app.utils.compressed_io import open_binary, skip_bytes  # noqa: E402
+from scripts.convert_sql_to_jsonl import iter_zip_records  # noqa: E402
+from scripts.opensearch_config import INDEX_CONFIG  # noqa: E402
+
 # 尝试加载应用内的 embedding 与配置模块（若缺失则在运行期回退）
 embedding_spec = importlib.util.find_spec("app.embedding")
 if embedding_spec is not None:
     embedding_module = importlib.import_module("app.embedding")
     get_embedder = getattr(embedding_module, "get_embedder", None)
+    Embedder = getattr(embedding_module, "Embedder", None)
 else:  # pragma: no cover - 离线导入脚本允许缺省模型
     get_embedder = None
+    Embedder = None
+
+store_spec = importlib.util.find_spec("app.embedding_store")
+if store_spec is not None:
+    store_module = importlib.import_module("app.embedding_store")
+    EmbeddingStore = getattr(store_module, "EmbeddingStore", None)
+    embedder_store_key = getattr(store_module, "embedder_store_key", None)
+else:  # pragma: no cover - 持久化向量存储为可选功能
+    EmbeddingStore = None
+    embedder_store_key = None
 
 config_spec = importlib.util.find_spec("app.config")
 if config_spec is not None:
@@ -64,6 +86,15 @@ else:  # pragma: no cover - huggingface_hub 并非必需
 
 
 DEFAULT_EMBEDDING_MODEL = "BAAI/bge-small-zh-v1.5"
+DEFAULT_MAX_BULK_BYTES = 10 * 1024 * 1024
+BULK_INITIAL_BACKOFF = 2
+BULK_MAX_BACKOFF = 60
+FORCE_MERGE_TIMEOUT = 3600
+CONTENT_HASH_FIELD = "content_hash"
+DEFAULT_SAMPLE_QUERY = "发动机故障"
+
+# 流水线各阶段之间传递的结束标记
+_PIPELINE_END = object()
 
 
 class _SentenceTransformerWrapper:
@@ -84,6 +115,87 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class ImportCheckpoint:
+    """记录最近一次被 bulk 确认的数据文件位置，用于 ``--resume`` 断点续传。
+
+    检查点只在对应批次全部写入成功后推进；流水线模式下批次可能乱序完成，
+    因此只推进到连续成功批次的末尾（低水位），保证每个批次恰好导入一次。
+    """
+
+    def __init__(self, path: str, json_file: str, index_name: str) -> None:
+        self.path = path
+        self.json_file = os.path.abspath(json_file)
+        self.index_name = index_name
+        self.offset = 0
+        self.line = 0
+        self._lock = threading.Lock()
+        self._next_seq = 0
+        self._acked: Dict[int, Tuple[int, int]] = {}
+
+    @staticmethod
+    def default_path(json_file: str) -> str:
+        return f"{json_file}.checkpoint.json"
+
+    def _fingerprint(self) -> Dict[str, Any]:
+        stat = os.stat(self.json_file)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def load(self) -> Tuple[int, int]:
+        """读取检查点；文件或索引不匹配时从头开始。"""
+
+        if not os.path.exists(self.path):
+            logger.info("未找到检查点 %s，将从头导入", self.path)
+            return 0, 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                state = json.load(handle)
+        except (OSError, ValueError) as exc:
+            logger.warning("检查点 %s 无法读取，将从头导入: %s", self.path, exc)
+            return 0, 0
+
+        if (
+            state.get("file") != self.json_file
+            or state.get("index") != self.index_name
+            or state.get("fingerprint") != self._fingerprint()
+        ):
+            logger.warning("检查点 %s 与当前数据文件/索引不匹配，将从头导入", self.path)
+            return 0, 0
+
+        self.offset = int(state.get("offset", 0))
+        self.line = int(state.get("line", 0))
+        logger.info("从检查点恢复: 第 %s 行之后 (字节偏移 %s)", self.line, self.offset)
+        return self.offset, self.line
+
+    def save(self, offset: int, line: int) -> None:
+        self.offset, self.line = offset, line
+        state = {
+            "file": self.json_file,
+            "index": self.index_name,
+            "fingerprint": self._fingerprint(),
+            "offset": offset,
+            "line": line,
+            "updated_at": datetime.now().isoformat(),
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(state, handle, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def ack(self, seq: int, offset: int, line: int) -> None:
+        """标记批次 ``seq`` 已成功写入，并推进到连续成功批次的末尾。"""
+
+        with self._lock:
+            self._acked[seq] = (offset, line)
+            advanced = None
+            while self._next_seq in self._acked:
+                advanced = self._acked.pop(self._next_seq)
+                self._next_seq += 1
+            if advanced is not None:
+                self.save(*advanced)
+
+
 class OpenSearchImporter:
     @staticmethod
     def _coerce_bool(name: str, value: Any, *, default: bool = False) -> bool:
@@ -267,6 +379,8 @@ class OpenSearchImporter:
         clone_source_index: Optional[str] = "automotive_cases",
         preserve_source_fields: bool = False,
         recreate_index: bool = False,
+        embedding_batch_size: int = 64,
+        embedding_store_dir: Optional[str] = None,
     ) -> None:
         """初始化 OpenSearch 连接并准备向量写入。"""
 
@@ -365,7 +479,15 @@ class OpenSearchImporter:
         self.preserve_source_fields = preserve_flag
         self.recreate_index = recreate_flag
         self.embedder: Optional[Any] = None
+        self.embedding_store: Optional[Any] = None
         self._prepared_model_path: Optional[str] = None
+        self.embedding_batch_size = max(1, int(embedding_batch_size or 1))
+        self.import_stats: Dict[str, float] = self._new_import_stats()
+        self._stats_lock = threading.Lock()
+        # 本次导入中已被 bulk 确认写入的 _id；重复 _id 只会覆盖，蓝绿校验按去重后的数量比较
+        self._written_ids: set = set()
+        self.delta_import = False
+        self._seen_ids: Optional[set] = None
 
         if self.model_cache_dir:
             self._configure_model_cache_env()
@@ -382,6 +504,7 @@ class OpenSearchImporter:
                     self.enable_vector = False
                 else:
                     self._sync_vector_dimension()
+                    self.embedding_store = self._open_embedding_store(embedding_store_dir)
                     logger.info(
                         "已启用语义向量写入: 字段=%s, 维度=%s, 模型=%s",
                         self.vector_field,
@@ -500,7 +623,7 @@ class OpenSearchImporter:
 
         if dimension is None:
             try:
-                probe = self.embedder.encode(["dimension probe"])
+                probe = self._encode_uncached(["dimension probe"])
                 vector = self._normalize_vector_output(probe)
                 if vector:
                     dimension = len(vector)
@@ -559,7 +682,11 @@ class OpenSearchImporter:
             return len(current) == 0
         return False
 
-    def transform_record(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def transform_record(
+        self, record: Dict[str, Any], *, with_vector: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """转换单条记录；``with_vector=False`` 时由调用方稍后批量写入向量。"""
+
         source = record.get("_source") or {}
         transformed: Dict[str, Any] = copy.deepcopy(source)
 
@@ -575,25 +702,9 @@ class OpenSearchImporter:
             ):
                 transformed["id"] = doc_id
 
-            if (
-                self.enable_vector
-                and self.embedder is not None
-                and self.vector_field
-                and (
-                    self.vector_field not in transformed
-                    or self._should_replace_field(transformed.get(self.vector_field))
-                )
-            ):
-                text_for_vector = (
-                    transformed.get("search_content")
-                    or transformed.get("search")
-                    or transformed.get("discussion")
-                    or transformed.get("symptoms")
-                    or ""
-                )
-                vector = self._build_vector(text_for_vector)
-                if vector is not None:
-                    transformed[self.vector_field] = vector
+            transformed[CONTENT_HASH_FIELD] = self._content_hash(transformed)
+            if with_vector:
+                self._attach_vectors([transformed])
 
             return transformed
 
@@ -627,18 +738,68 @@ class OpenSearchImporter:
         ):
             transformed["search_num"] = source.get("searchNum")
 
-        if self.enable_vector and self.embedder is not None:
-            text_for_vector = (
+        transformed[CONTENT_HASH_FIELD] = self._content_hash(transformed)
+        if with_vector:
+            self._attach_vectors([transformed])
+
+        return transformed
+
+    def _content_hash(self, transformed: Dict[str, Any]) -> str:
+        """对 ``_source`` 计算稳定哈希，忽略导入时间、向量与哈希字段本身。"""
+
+        excluded = {"import_time", CONTENT_HASH_FIELD, self.vector_field}
+        payload = {key: value for key, value in transformed.items() if key not in excluded}
+        encoded = json.dumps(
+            payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str
+        )
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _vector_text(self, transformed: Dict[str, Any]) -> Optional[str]:
+        """返回需要编码的文本；无需（或无法）写入向量时返回 ``None``。"""
+
+        if not self.enable_vector or self.embedder is None or not self.vector_field:
+            return None
+
+        if self.preserve_source_fields:
+            if not self._should_replace_field(transformed.get(self.vector_field)):
+                return None
+            return (
                 transformed.get("search_content")
+                or transformed.get("search")
                 or transformed.get("discussion")
                 or transformed.get("symptoms")
                 or ""
             )
-            vector = self._build_vector(text_for_vector)
-            if vector is not None:
-                transformed[self.vector_field] = vector
 
-        return transformed
+        return (
+            transformed.get("search_content")
+            or transformed.get("discussion")
+            or transformed.get("symptoms")
+            or ""
+        )
+
+    def _attach_vectors(self, documents: Sequence[Dict[str, Any]]) -> int:
+        """为一批文档批量生成向量并写入向量字段，返回成功写入的数量。"""
+
+        pending: List[Tuple[Dict[str, Any], str]] = []
+        for document in documents:
+            text = self._vector_text(document)
+            if text is not None:
+                pending.append((document, text))
+        if not pending:
+            return 0
+
+        start = time.perf_counter()
+        vectors = self._build_vectors([text for _, text in pending])
+        self.import_stats["embed_seconds"] += time.perf_counter() - start
+        self.import_stats["embed_docs"] += len(pending)
+
+        attached = 0
+        for (document, _), vector in zip(pending, vectors):
+            if vector is not None:
+                document[self.vector_field] = vector
+                attached += 1
+        return attached
 
     def _normalize_vector_output(self, batch: Any) -> Optional[List[float]]:
         if batch is None:
@@ -665,29 +826,79 @@ class OpenSearchImporter:
             logger.warning("向量结果无法转换为 float: %s", vector)
             return None
 
-    def _build_vector(self, text: str) -> Optional[List[float]]:
-        content = text.strip()
-        if not content:
+    def _open_embedding_store(self, directory: Optional[str]) -> Optional[Any]:
+        """打开持久化向量存储；未指定目录时沿用应用配置 ``EMBEDDING_STORE_DIR``，空字符串表示禁用。"""
+
+        if EmbeddingStore is None:
             return None
-        try:
-            batch = self.embedder.encode([content])
-        except Exception as exc:
-            logger.warning("生成语义向量失败: %s", exc)
+        if directory is None and get_settings is not None:
+            try:
+                directory = getattr(get_settings(), "embedding_store_dir", "")
+            except Exception:
+                directory = ""
+        if not directory:
             return None
 
-        vector = self._normalize_vector_output(batch)
-        if vector is None:
+        model_key = embedder_store_key(self.embedder) if embedder_store_key is not None else None
+        model_key = model_key or self.embedding_model
+        if not model_key:
+            logger.warning("无法确定模型名称，已禁用持久化向量存储")
             return None
+        try:
+            store = EmbeddingStore(directory, model_key)
+        except OSError as exc:
+            logger.warning("无法打开持久化向量存储 %s: %s", directory, exc)
+            return None
+        logger.info("持久化向量存储: %s (模型=%s, 已有 %s 条)", directory, model_key, len(store))
+        return store
 
-        if self.vector_dimension and len(vector) != self.vector_dimension:
-            logger.warning(
-                "向量维度与配置不一致: got=%s expected=%s，将按模型输出更新配置",
-                len(vector),
-                self.vector_dimension,
-            )
-            self.vector_dimension = len(vector)
+    def _encode_uncached(self, texts: List[str]) -> Any:
+        # 应用内 Embedder 的 LRU 只服务在线查询，批量编码语料时绕过它以免挤掉热门查询
+        if Embedder is not None and isinstance(self.embedder, Embedder):
+            return self.embedder.encode(texts, use_cache=False)
+        return self.embedder.encode(texts)
+
+    def _encode_texts(self, texts: List[str]) -> Any:
+        if self.embedding_store is None:
+            return self._encode_uncached(texts)
+        return self.embedding_store.encode(texts, self._encode_uncached)
+
+    def _build_vector(self, text: str) -> Optional[List[float]]:
+        return self._build_vectors([text])[0]
+
+    def _build_vectors(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """按 ``embedding_batch_size`` 分批编码，空文本或失败的批次对应 ``None``。"""
+
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        indexed = [(idx, text.strip()) for idx, text in enumerate(texts) if text and text.strip()]
+
+        for offset in range(0, len(indexed), self.embedding_batch_size):
+            chunk = indexed[offset:offset + self.embedding_batch_size]
+            try:
+                batch = self._encode_texts([content for _, content in chunk])
+            except Exception as exc:
+                logger.warning("生成语义向量失败: %s", exc)
+                continue
+
+            rows = batch.tolist() if hasattr(batch, "tolist") else list(batch)
+            if len(rows) != len(chunk):
+                logger.warning("向量数量与输入不一致: got=%s expected=%s", len(rows), len(chunk))
+                continue
+
+            for (idx, _), row in zip(chunk, rows):
+                vector = self._normalize_vector_output([row])
+                if vector is None:
+                    continue
+                if self.vector_dimension and len(vector) != self.vector_dimension:
+                    logger.warning(
+                        "向量维度与配置不一致: got=%s expected=%s，将按模型输出更新配置",
+                        len(vector),
+                        self.vector_dimension,
+                    )
+                    self.vector_dimension = len(vector)
+                results[idx] = vector
 
-        return vector
+        return results
 
     # ------------------------------------------------------------------
     # 索引管理 & 导入流程
@@ -699,7 +910,11 @@ class OpenSearchImporter:
             logger.warning("无法读取源索引 %s 的映射: %s", source_index, exc)
             return None
 
-        mapping = response.get(source_index, {}).get("mappings")
+        entry = response.get(source_index)
+        if entry is None and len(response) == 1:
+            # 源为别名时响应以别名背后的具体索引名为键
+            entry = next(iter(response.values()))
+        mapping = (entry or {}).get("mappings")
         if not mapping:
             return None
 
@@ -724,6 +939,7 @@ class OpenSearchImporter:
                     "created_at": {"type": "date"},
                     "source_index": {"type": "keyword"},
                     "source_type": {"type": "keyword"},
+                    "content_hash": {"type": "keyword"},
                 }
             }
         }
@@ -760,6 +976,7 @@ class OpenSearchImporter:
                     "created_at": {"type": "date"},
                     "source_index": {"type": "keyword"},
                     "source_type": {"type": "keyword"},
+                    "content_hash": {"type": "keyword"},
                 }
             }
         }
@@ -907,7 +1124,29 @@ class OpenSearchImporter:
         except Exception:
             pass
 
-    def import_data(self, json_file: str, index_name: str, batch_size: int = 100) -> bool:
+    def import_data(
+        self,
+        json_file: str,
+        index_name: str,
+        batch_size: int = 100,
+        *,
+        pipeline: bool = False,
+        bulk_threads: int = 4,
+        max_bulk_bytes: int = DEFAULT_MAX_BULK_BYTES,
+        queue_size: int = 8,
+        max_retries: int = 5,
+        bulk_load_mode: bool = False,
+        force_merge_segments: Optional[int] = None,
+        warmup_knn: bool = False,
+        checkpoint_path: Optional[str] = None,
+        resume: bool = False,
+        delta: bool = False,
+        delete_missing: bool = False,
+        sql_zip: bool = False,
+        sql_tables: Optional[Sequence[str]] = None,
+    ) -> bool:
+        """导入数据文件；``sql_zip=True`` 时 ``json_file`` 为 SQL dump 压缩包，解析后直接流式写入。"""
+
         if not os.path.exists(json_file):
             logger.error("数据文件不存在: %s", json_file)
             return False
@@ -915,14 +1154,91 @@ class OpenSearchImporter:
         if batch_size <= 0:
             batch_size = 100
 
+        records = None
+        if sql_zip:
+            if checkpoint_path or resume:
+                logger.warning("SQL 压缩包直接导入不支持断点续传，已忽略检查点设置")
+                checkpoint_path, resume = None, False
+            # SQL 解析 -> 转换 -> bulk 之间始终通过有界队列衔接
+            pipeline = True
+            records = self._iter_sql_zip_records(json_file, index_name, sql_tables)
+
+        checkpoint: Optional[ImportCheckpoint] = None
+        start_offset = start_line = 0
+        if checkpoint_path or resume:
+            checkpoint = ImportCheckpoint(
+                checkpoint_path or ImportCheckpoint.default_path(json_file), json_file, index_name
+            )
+            if resume:
+                start_offset, start_line = checkpoint.load()
+                if start_offset and self.recreate_index:
+                    logger.warning("断点续传时忽略 --recreate-index，保留已导入的数据")
+                    self.recreate_index = False
+
         if not self.create_index_mapping(index_name):
             return False
 
+        self.import_stats = self._new_import_stats()
+        self._written_ids = set()
+        self.delta_import = bool(delta)
+        if delete_missing and start_offset:
+            logger.warning("断点续传时无法得知完整的文档集合，已跳过删除过期文档")
+            delete_missing = False
+        self._seen_ids = set() if delete_missing else None
+        original_settings = self._enter_bulk_load_mode(index_name) if bulk_load_mode else None
+        succeeded = False
+        try:
+            with self._timed_phase("导入"):
+                if pipeline:
+                    succeeded = self._import_pipelined(
+                        json_file,
+                        index_name,
+                        batch_size,
+                        bulk_threads=bulk_threads,
+                        max_bulk_bytes=max_bulk_bytes,
+                        queue_size=queue_size,
+                        max_retries=max_retries,
+                        checkpoint=checkpoint,
+                        start=(start_offset, start_line),
+                        records=records,
+                    )
+                else:
+                    succeeded = self._import_serial(
+                        json_file,
+                        index_name,
+                        batch_size,
+                        checkpoint=checkpoint,
+                        start=(start_offset, start_line),
+                    )
+            if succeeded and delete_missing:
+                with self._timed_phase("删除过期文档"):
+                    self._delete_missing_documents(index_name)
+        finally:
+            if original_settings is not None:
+                self._exit_bulk_load_mode(
+                    index_name,
+                    original_settings,
+                    force_merge_segments=force_merge_segments if succeeded else None,
+                    warmup_knn=warmup_knn and succeeded,
+                )
+        return succeeded
+
+    def _import_serial(
+        self,
+        json_file: str,
+        index_name: str,
+        batch_size: int,
+        *,
+        checkpoint: Optional[ImportCheckpoint] = None,
+        start: Tuple[int, int] = (0, 0),
+    ) -> bool:
         actions: List[Dict[str, Any]] = []
         total = 0
+        position = start
 
-        for record in self._iter_records(json_file):
-            transformed = self.transform_record(record)
+        for record, offset, line_num in self._iter_records_with_offsets(json_file, *start):
+            position = (offset, line_num)
+            transformed = self.transform_record(record, with_vector=False)
             if not transformed:
                 continue
 
@@ -935,57 +1251,664 @@ class OpenSearchImporter:
             actions.append(action)
 
             if len(actions) >= batch_size:
-                total += self._flush_bulk(actions)
+                success = self._embed_and_flush(actions)
+                total += success
+                if checkpoint is not None and not self._checkpoint_batch(checkpoint, success, actions, position):
+                    return False
                 actions = []
 
         if actions:
-            total += self._flush_bulk(actions)
+            success = self._embed_and_flush(actions)
+            total += success
+            if checkpoint is not None and not self._checkpoint_batch(checkpoint, success, actions, position):
+                return False
 
         logger.info("成功导入 %s 条文档", total)
+        self._log_import_stats()
+        return True
+
+    @staticmethod
+    def _checkpoint_batch(
+        checkpoint: ImportCheckpoint,
+        success: int,
+        actions: List[Dict[str, Any]],
+        position: Tuple[int, int],
+    ) -> bool:
+        if success != len(actions):
+            logger.error(
+                "批次写入不完整 (%s/%s)，已停止导入；检查点保留在第 %s 行，可使用 --resume 重试",
+                success,
+                len(actions),
+                checkpoint.line,
+            )
+            return False
+        checkpoint.save(*position)
+        return True
+
+    # ------------------------------------------------------------------
+    # 批量加载模式：导入期间关闭 refresh 与副本，结束后恢复
+    # ------------------------------------------------------------------
+    @contextlib.contextmanager
+    def _timed_phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            logger.info("阶段 [%s] 耗时 %.2fs", name, time.perf_counter() - start)
+
+    def _enter_bulk_load_mode(self, index_name: str) -> Optional[Dict[str, Any]]:
+        """记录原始 refresh_interval / number_of_replicas 并切换为批量加载设置。"""
+
+        with self._timed_phase("进入批量加载模式"):
+            try:
+                response = self.client.indices.get_settings(index=index_name)
+                entry = response.get(index_name)
+                if entry is None:
+                    if len(response) != 1:
+                        logger.warning(
+                            "%s 是指向 %d 个索引的别名，无法记录原始设置，将按当前设置导入",
+                            index_name,
+                            len(response),
+                        )
+                        return None
+                    # 目标为别名时响应以别名背后的具体索引名为键
+                    entry = next(iter(response.values()))
+                index_settings = entry.get("settings", {}).get("index", {})
+                original = {
+                    # 未显式设置时恢复为 None，即回到集群默认值
+                    "refresh_interval": index_settings.get("refresh_interval"),
+                    "number_of_replicas": index_settings.get("number_of_replicas"),
+                }
+                self.client.indices.put_settings(
+                    index=index_name,
+                    body={"index": {"refresh_interval": "-1", "number_of_replicas": 0}},
+                )
+            except Exception as exc:
+                logger.warning("无法切换到批量加载模式，将按当前设置导入: %s", exc)
+                return None
+            logger.info(
+                "已进入批量加载模式: refresh_interval=-1, number_of_replicas=0 (原始设置: %s)",
+                original,
+            )
+        return original
+
+    def _exit_bulk_load_mode(
+        self,
+        index_name: str,
+        original: Dict[str, Any],
+        *,
+        force_merge_segments: Optional[int] = None,
+        warmup_knn: bool = False,
+    ) -> None:
+        with self._timed_phase("恢复索引设置"):
+            try:
+                self.client.indices.put_settings(index=index_name, body={"index": dict(original)})
+                logger.info("已恢复索引设置: %s", original)
+            except Exception as exc:
+                logger.error("恢复索引 %s 设置失败，请手动恢复 %s: %s", index_name, original, exc)
+
+        with self._timed_phase("refresh"):
+            try:
+                self.client.indices.refresh(index=index_name)
+            except Exception as exc:
+                logger.warning("刷新索引 %s 失败: %s", index_name, exc)
+
+        if force_merge_segments:
+            with self._timed_phase("force merge"):
+                try:
+                    self.client.indices.forcemerge(
+                        index=index_name,
+                        max_num_segments=int(force_merge_segments),
+                        request_timeout=FORCE_MERGE_TIMEOUT,
+                    )
+                    logger.info("已将索引 %s 合并到 %s 个段", index_name, force_merge_segments)
+                except Exception as exc:
+                    logger.warning("force merge 失败: %s", exc)
+
+        if warmup_knn and self.enable_vector:
+            with self._timed_phase("kNN 预热"):
+                try:
+                    self.client.transport.perform_request(
+                        "GET", f"/_plugins/_knn/warmup/{index_name}"
+                    )
+                    logger.info("已预热索引 %s 的 kNN 图", index_name)
+                except Exception as exc:
+                    logger.warning("kNN 预热失败（lucene 引擎无需预热）: %s", exc)
+
+    @staticmethod
+    def _new_import_stats() -> Dict[str, float]:
+        return {
+            "embed_docs": 0,
+            "embed_seconds": 0.0,
+            "bulk_docs": 0,
+            "bulk_seconds": 0.0,
+            "unchanged_docs": 0,
+            "indexed_docs": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # 流水线导入：读取线程 -> 转换/向量化（当前线程）-> N 个 bulk 发送线程
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _put_until_stopped(target: "queue.Queue[Any]", item: Any, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _get_until_stopped(source: "queue.Queue[Any]", stop: threading.Event) -> Any:
+        while not stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _PIPELINE_END
+
+    def _send_bulk(
+        self,
+        actions: List[Dict[str, Any]],
+        *,
+        max_bulk_bytes: int,
+        max_retries: int,
+    ) -> Tuple[int, int]:
+        """发送一批文档；429 / es_rejected_execution_exception 由 streaming_bulk 指数退避重试。"""
+
+        success = failed = 0
+        written: List[str] = []
+        start = time.perf_counter()
+        for ok, info in streaming_bulk(
+            self.client,
+            actions,
+            chunk_size=max(1, len(actions)),
+            max_chunk_bytes=max_bulk_bytes,
+            max_retries=max_retries,
+            initial_backoff=BULK_INITIAL_BACKOFF,
+            max_backoff=BULK_MAX_BACKOFF,
+            raise_on_error=False,
+            raise_on_exception=False,
+        ):
+            if ok:
+                success += 1
+                written.extend(str(item["_id"]) for item in info.values() if "_id" in item)
+            else:
+                failed += 1
+                if failed <= 5:
+                    logger.warning("Bulk 文档写入失败: %s", info)
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self.import_stats["bulk_seconds"] += elapsed
+            self.import_stats["bulk_docs"] += len(actions)
+            self.import_stats["indexed_docs"] += success
+            self._written_ids.update(written)
+        return success, failed
+
+    def _import_pipelined(
+        self,
+        json_file: str,
+        index_name: str,
+        batch_size: int,
+        *,
+        bulk_threads: int,
+        max_bulk_bytes: int,
+        queue_size: int,
+        max_retries: int,
+        checkpoint: Optional[ImportCheckpoint] = None,
+        start: Tuple[int, int] = (0, 0),
+        records: Optional[Iterable[Tuple[Dict[str, Any], int, int]]] = None,
+    ) -> bool:
+        """``records`` 为 ``(record, offset, line)`` 序列，缺省时按行读取 ``json_file``。"""
+
+        bulk_threads = max(1, int(bulk_threads))
+        queue_size = max(1, int(queue_size))
+        record_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size * batch_size)
+        batch_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        stop = threading.Event()
+        failures: List[BaseException] = []
+        counters = {"read": 0, "transformed": 0, "indexed": 0, "failed": 0}
+        # 各阶段实际工作耗时（不含在队列上等待的时间），用于计算每个阶段的吞吐
+        stage_seconds = {"read": 0.0, "transform": 0.0}
+        started = time.perf_counter()
+
+        def reader() -> None:
+            source = iter(records if records is not None else self._iter_records_with_offsets(json_file, *start))
+            try:
+                while True:
+                    began = time.perf_counter()
+                    item = next(source, _PIPELINE_END)
+                    stage_seconds["read"] += time.perf_counter() - began
+                    if item is _PIPELINE_END:
+                        return
+                    if not self._put_until_stopped(record_queue, item, stop):
+                        return
+                    counters["read"] += 1
+            except BaseException as exc:  # pragma: no cover - 读文件异常
+                failures.append(exc)
+                stop.set()
+            finally:
+                self._put_until_stopped(record_queue, _PIPELINE_END, stop)
+
+        def sender() -> None:
+            while True:
+                batch = self._get_until_stopped(batch_queue, stop)
+                if batch is _PIPELINE_END:
+                    return
+                seq, position, actions = batch
+                try:
+                    success, failed = self._send_bulk(
+                        actions, max_bulk_bytes=max_bulk_bytes, max_retries=max_retries
+                    )
+                except BaseException as exc:
+                    failures.append(exc)
+                    stop.set()
+                    return
+                with self._stats_lock:
+                    counters["indexed"] += success
+                    counters["failed"] += failed
+                if checkpoint is not None:
+                    if failed:
+                        # 该批次之后的检查点不能再推进，停止流水线等待 --resume
+                        failures.append(RuntimeError(f"批次 {seq} 有 {failed} 条文档写入失败"))
+                        stop.set()
+                        return
+                    checkpoint.ack(seq, *position)
+
+        threads = [threading.Thread(target=reader, name="import-reader", daemon=True)]
+        threads.extend(
+            threading.Thread(target=sender, name=f"import-bulk-{idx}", daemon=True)
+            for idx in range(bulk_threads)
+        )
+        for thread in threads:
+            thread.start()
+
+        try:
+            actions: List[Dict[str, Any]] = []
+            position = start
+            seq = 0
+            while True:
+                item = self._get_until_stopped(record_queue, stop)
+                if item is _PIPELINE_END:
+                    break
+                record, offset, line_num = item
+                position = (offset, line_num)
+                began = time.perf_counter()
+                transformed = self.transform_record(record, with_vector=False)
+                stage_seconds["transform"] += time.perf_counter() - began
+                if not transformed:
+                    continue
+                counters["transformed"] += 1
+                actions.append({"_index": index_name, "_id": transformed.get("id"), "_source": transformed})
+                if len(actions) >= batch_size:
+                    self._prepare_batch(actions, index_name)
+                    if not self._put_until_stopped(batch_queue, (seq, position, actions), stop):
+                        break
+                    seq += 1
+                    actions = []
+            if actions and not stop.is_set():
+                self._prepare_batch(actions, index_name)
+                self._put_until_stopped(batch_queue, (seq, position, actions), stop)
+        except BaseException as exc:
+            failures.append(exc)
+            stop.set()
+        finally:
+            for _ in range(bulk_threads):
+                self._put_until_stopped(batch_queue, _PIPELINE_END, stop)
+            for thread in threads:
+                thread.join()
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "流水线导入完成: 读取 %s, 转换 %s, 写入成功 %s, 失败 %s, 总耗时 %.2fs (%.1f docs/s)",
+            counters["read"],
+            counters["transformed"],
+            counters["indexed"],
+            counters["failed"],
+            elapsed,
+            counters["indexed"] / max(elapsed, 1e-9),
+        )
+        logger.info(
+            "阶段吞吐: 读取 %.1f docs/s (%.2fs), 转换 %.1f docs/s (%.2fs), bulk %.1f docs/s (%.2fs, %s 线程合计)",
+            counters["read"] / max(stage_seconds["read"], 1e-9),
+            stage_seconds["read"],
+            counters["transformed"] / max(stage_seconds["transform"], 1e-9),
+            stage_seconds["transform"],
+            self.import_stats["bulk_docs"] / max(self.import_stats["bulk_seconds"], 1e-9),
+            self.import_stats["bulk_seconds"],
+            bulk_threads,
+        )
+        self._log_import_stats()
+        if failures:
+            logger.error("流水线导入中断: %s", failures[0])
+            return False
         return True
 
+    def _embed_and_flush(self, actions: List[Dict[str, Any]]) -> int:
+        if actions:
+            self._prepare_batch(actions, actions[0]["_index"])
+        return self._flush_bulk(actions)
+
+    def _prepare_batch(self, actions: List[Dict[str, Any]], index_name: str) -> None:
+        """增量模式下就地剔除内容未变化的文档，然后为剩余文档批量生成向量。"""
+
+        if self._seen_ids is not None:
+            self._seen_ids.update(str(action["_id"]) for action in actions)
+        if self.delta_import and actions:
+            existing = self._fetch_existing_hashes(index_name, [action["_id"] for action in actions])
+            changed = [
+                action
+                for action in actions
+                if existing.get(str(action["_id"])) != action["_source"].get(CONTENT_HASH_FIELD)
+            ]
+            self.import_stats["unchanged_docs"] += len(actions) - len(changed)
+            actions[:] = changed
+        self._attach_vectors([action["_source"] for action in actions])
+
+    def _fetch_existing_hashes(self, index_name: str, doc_ids: Sequence[Any]) -> Dict[str, Optional[str]]:
+        try:
+            response = self.client.mget(
+                index=index_name,
+                body={"ids": [str(doc_id) for doc_id in doc_ids]},
+                _source_includes=[CONTENT_HASH_FIELD],
+            )
+        except Exception as exc:
+            logger.warning("读取已有文档哈希失败，本批次按全部变更处理: %s", exc)
+            return {}
+        return {
+            str(doc.get("_id")): (doc.get("_source") or {}).get(CONTENT_HASH_FIELD)
+            for doc in response.get("docs", [])
+            if doc.get("found")
+        }
+
+    def _delete_missing_documents(self, index_name: str) -> int:
+        """删除索引中存在、但本次数据文件里已不存在的文档。"""
+
+        seen = self._seen_ids or set()
+        stale = (
+            {"_op_type": "delete", "_index": index_name, "_id": hit["_id"]}
+            for hit in scan(self.client, index=index_name, query={"query": {"match_all": {}}}, _source=False)
+            if str(hit["_id"]) not in seen
+        )
+        deleted, errors = bulk(self.client, stale, raise_on_error=False)
+        if errors:
+            logger.warning("删除过期文档时存在错误: %s", errors[:5])
+        logger.info("已删除数据文件中不存在的文档 %s 条", deleted)
+        return deleted
+
+    def _log_import_stats(self) -> None:
+        stats = self.import_stats
+        if self.delta_import:
+            logger.info("增量导入: 跳过未变化文档 %s 条", stats["unchanged_docs"])
+        if self.embedding_store is not None:
+            store_info = self.embedding_store.info()
+            logger.info(
+                "持久化向量存储: 命中 %s 条, 新编码 %s 条, 共 %s 条",
+                store_info["hits"],
+                store_info["misses"],
+                store_info["size"],
+            )
+        if stats["embed_docs"]:
+            logger.info(
+                "向量编码: %s 条, 耗时 %.2fs, %.1f docs/s",
+                stats["embed_docs"],
+                stats["embed_seconds"],
+                stats["embed_docs"] / max(stats["embed_seconds"], 1e-9),
+            )
+        if stats["bulk_docs"]:
+            logger.info(
+                "Bulk 写入: %s 条, 耗时 %.2fs, %.1f docs/s",
+                stats["bulk_docs"],
+                stats["bulk_seconds"],
+                stats["bulk_docs"] / max(stats["bulk_seconds"], 1e-9),
+            )
+
     def _iter_records(self, json_file: str) -> Iterable[Dict[str, Any]]:
-        with open(json_file, "r", encoding="utf-8") as handle:
-            for line_num, line in enumerate(handle, 1):
-                text = line.strip()
+        for record, _, _ in self._iter_records_with_offsets(json_file):
+            yield record
+
+    def _iter_records_with_offsets(
+        self, json_file: str, start_offset: int = 0, start_line: int = 0
+    ) -> Iterator[Tuple[Dict[str, Any], int, int]]:
+        """逐行解析 JSONL（支持 .gz/.zst），同时返回该行结束处的字节偏移与行号，便于断点续传。
+
+        压缩文件的偏移按解压后的字节计算，续传时顺序解压并跳过已确认的部分。
+        """
+
+        with open_binary(json_file) as handle:
+            skip_bytes(handle, start_offset)
+            offset, line_num = start_offset, start_line
+            for raw in handle:
+                offset += len(raw)
+                line_num += 1
+                try:
+                    text = raw.decode("utf-8").strip()
+                except UnicodeDecodeError as exc:
+                    logger.warning("第 %s 行编码错误: %s", line_num, exc)
+                    continue
                 if not text:
                     continue
                 try:
-                    yield json.loads(text)
+                    record = json.loads(text)
                 except json.JSONDecodeError as exc:
                     logger.warning("第 %s 行 JSON 解析失败: %s", line_num, exc)
                     continue
+                yield record, offset, line_num
+
+    def _iter_sql_zip_records(
+        self, zip_path: str, index_name: str, tables: Optional[Sequence[str]] = None
+    ) -> Iterator[Tuple[Dict[str, Any], int, int]]:
+        """解析 SQL dump 压缩包并逐条产出记录（与 convert_sql_to_jsonl.py 的 JSONL 行一致），不写中间文件。"""
+
+        stats: Counter = Counter()
+        count = 0
+        for record in iter_zip_records(zip_path, index_name=index_name, include_tables=tables, stats=stats):
+            count += 1
+            yield record, 0, count
+        for table, rows in stats.items():
+            logger.info("SQL 表 %s: 解析 %s 条", table, rows)
 
     def _flush_bulk(self, actions: List[Dict[str, Any]]) -> int:
         if not actions:
             return 0
 
+        start = time.perf_counter()
         try:
             success, errors = bulk(self.client, actions)
             if errors:
                 logger.warning("Bulk 导入存在错误: %s", errors)
+            self.import_stats["indexed_docs"] += success
+            # bulk 默认遇到失败文档即抛出异常，走到这里说明整批都已写入
+            self._written_ids.update(
+                str(a["_id"]) for a in actions if "_id" in a and a.get("_op_type", "index") != "delete"
+            )
             return success
         except Exception as exc:
             logger.error("批量导入失败: %s", exc)
             return 0
+        finally:
+            self.import_stats["bulk_seconds"] += time.perf_counter() - start
+            self.import_stats["bulk_docs"] += len(actions)
 
-    def run_test_query(self, index_name: str, query_text: str = "发动机故障") -> None:
+    # ------------------------------------------------------------------
+    # 蓝绿部署：导入到版本化索引，验证通过后原子切换别名
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _versioned_index_name(alias: str) -> str:
+        return f"{alias}_v{time.strftime('%Y%m%d%H%M%S')}"
+
+    def _alias_targets(self, alias: str) -> List[str]:
         try:
-            body = {
-                "size": 5,
-                "query": {
-                    "multi_match": {
-                        "query": query_text,
-                        "fields": [
-                            "discussion^3",
-                            "symptoms^2",
-                            "solution",
-                            "search_content",
-                        ],
-                    }
-                },
-            }
+            if not self.client.indices.exists_alias(name=alias):
+                return []
+            return sorted(self.client.indices.get_alias(name=alias))
+        except Exception as exc:
+            logger.warning("读取别名 %s 失败: %s", alias, exc)
+            return []
+
+    def _list_versions(self, alias: str) -> List[str]:
+        pattern = re.compile(rf"^{re.escape(alias)}_v\d{{14}}$")
+        try:
+            response = self.client.indices.get(index=f"{alias}_v*")
+        except Exception as exc:
+            logger.warning("列出 %s 的历史版本失败: %s", alias, exc)
+            return []
+        # 时间戳定长，按名称排序即按构建时间排序
+        return sorted(name for name in response if pattern.match(name))
 
+    def _validate_index(
+        self,
+        index_name: str,
+        *,
+        previous_count: int = 0,
+        min_doc_ratio: float = 0.9,
+        sample_query: str = DEFAULT_SAMPLE_QUERY,
+    ) -> bool:
+        """切换前校验新索引：文档数与写入的不重复 _id 数一致、不明显少于旧版本，且示例查询有结果。"""
+
+        try:
+            self.client.indices.refresh(index=index_name)
+            count = int(self.client.count(index=index_name)["count"])
+            response = self.client.search(index=index_name, body=self._sample_query_body(sample_query, 1))
+        except Exception as exc:
+            logger.error("校验新索引 %s 失败: %s", index_name, exc)
+            return False
+
+        expected = len(self._written_ids)
+        if count == 0 or count != expected:
+            logger.error("新索引 %s 文档数 %s 与写入的不重复 _id 数 %s 不一致", index_name, count, expected)
+            return False
+        if previous_count and count < previous_count * min_doc_ratio:
+            logger.error(
+                "新索引 %s 文档数 %s 低于当前版本 %s 的 %.0f%%，拒绝切换",
+                index_name,
+                count,
+                previous_count,
+                min_doc_ratio * 100,
+            )
+            return False
+        if not response.get("hits", {}).get("hits"):
+            logger.error("新索引 %s 的示例查询 %r 没有返回结果", index_name, sample_query)
+            return False
+        logger.info("新索引 %s 校验通过: %s 条文档", index_name, count)
+        return True
+
+    def _point_alias(self, alias: str, target: str, *, remove_concrete: bool = False) -> None:
+        actions: List[Dict[str, Any]] = [
+            {"remove": {"index": current, "alias": alias}} for current in self._alias_targets(alias)
+        ]
+        if remove_concrete:
+            actions.append({"remove_index": {"index": alias}})
+        actions.append({"add": {"index": target, "alias": alias}})
+        # 同一个 _aliases 请求内的动作原子生效，查询不会看到空别名或半成品索引
+        self.client.indices.update_aliases(body={"actions": actions})
+        logger.info("别名 %s 已指向 %s", alias, target)
+
+    def _prune_versions(self, alias: str, keep_versions: int) -> List[str]:
+        live = set(self._alias_targets(alias))
+        previous = [name for name in self._list_versions(alias) if name not in live]
+        stale = previous[:-keep_versions] if keep_versions > 0 else previous
+        for name in stale:
+            try:
+                self.client.indices.delete(index=name)
+                logger.info("已删除过期版本 %s", name)
+            except Exception as exc:
+                logger.warning("删除过期版本 %s 失败: %s", name, exc)
+        return stale
+
+    def import_blue_green(
+        self,
+        json_file: str,
+        alias: str,
+        batch_size: int = 100,
+        *,
+        keep_versions: int = 2,
+        min_doc_ratio: float = 0.9,
+        sample_query: str = DEFAULT_SAMPLE_QUERY,
+        replace_concrete_index: bool = False,
+        **import_kwargs: Any,
+    ) -> bool:
+        """构建 ``<alias>_v<时间戳>``，校验通过后原子切换别名，并保留 ``keep_versions`` 个旧版本用于回滚。"""
+
+        live = self._alias_targets(alias)
+        concrete = not live and self.client.indices.exists(index=alias)
+        if concrete and not replace_concrete_index:
+            logger.error(
+                "已存在与别名同名的具体索引 %s；确认可在切换时删除它后请加上 --replace-concrete-index",
+                alias,
+            )
+            return False
+        previous_count = 0
+        if live or concrete:
+            try:
+                previous_count = int(self.client.count(index=alias)["count"])
+            except Exception as exc:
+                logger.warning("读取当前版本文档数失败: %s", exc)
+
+        new_index = self._versioned_index_name(alias)
+        logger.info("蓝绿部署: 构建新版本 %s (当前版本: %s)", new_index, live or ("具体索引" if concrete else "无"))
+        built = self.import_data(json_file, new_index, batch_size, **import_kwargs)
+        if not built or not self._validate_index(
+            new_index,
+            previous_count=previous_count,
+            min_doc_ratio=min_doc_ratio,
+            sample_query=sample_query,
+        ):
+            logger.error("新版本 %s 未通过校验，别名 %s 保持不变，新索引将被删除", new_index, alias)
+            try:
+                self.client.indices.delete(index=new_index)
+            except Exception as exc:
+                logger.warning("删除未通过校验的索引 %s 失败: %s", new_index, exc)
+            return False
+
+        with self._timed_phase("切换别名"):
+            try:
+                self._point_alias(alias, new_index, remove_concrete=concrete)
+            except Exception as exc:
+                logger.error("切换别名 %s 失败，当前版本保持不变: %s", alias, exc)
+                return False
+        self._prune_versions(alias, keep_versions)
+        return True
+
+    def rollback_alias(self, alias: str) -> bool:
+        """将别名切回当前版本之前最近的一个历史版本。"""
+
+        live = self._alias_targets(alias)
+        if not live:
+            logger.error("别名 %s 不存在，无法回滚", alias)
+            return False
+        previous = [name for name in self._list_versions(alias) if name < min(live)]
+        if not previous:
+            logger.error("别名 %s 没有可回滚的历史版本", alias)
+            return False
+        try:
+            self._point_alias(alias, previous[-1])
+        except Exception as exc:
+            logger.error("回滚别名 %s 失败: %s", alias, exc)
+            return False
+        return True
+
+    @staticmethod
+    def _sample_query_body(query_text: str, size: int) -> Dict[str, Any]:
+        return {
+            "size": size,
+            "query": {
+                "multi_match": {
+                    "query": query_text,
+                    "fields": [
+                        "discussion^3",
+                        "symptoms^2",
+                        "solution",
+                        "search_content",
+                    ],
+                }
+            },
+        }
+
+    def run_test_query(self, index_name: str, query_text: str = DEFAULT_SAMPLE_QUERY) -> None:
+        try:
+            body = self._sample_query_body(query_text, 5)
             response = self.client.search(index=index_name, body=body)
             hits = response.get("hits", {}).get("hits", [])
             logger.info("测试查询返回 %s 条结果", len(hits))
@@ -1007,7 +1930,17 @@ class OpenSearchImporter:
 
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="将 JSONL 数据导入 OpenSearch")
-    parser.add_argument("--file", "-f", required=True, help="JSON 行文件路径")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--file", "-f", help="JSON 行文件路径（--rollback 时可省略）")
+    source.add_argument(
+        "--zip",
+        help="SQL dump 压缩包（如 case_recovery.zip）：解析后直接流式导入，不生成中间 JSONL 文件",
+    )
+    parser.add_argument(
+        "--tables",
+        nargs="*",
+        help="配合 --zip 使用，仅导入指定的表（不区分大小写）",
+    )
     parser.add_argument("--index", "-i", default="automotive_cases", help="目标索引名称")
     parser.add_argument("--host", default="localhost", help="OpenSearch 主机")
     parser.add_argument("--port", type=int, default=9200, help="OpenSearch 端口")
@@ -1016,6 +1949,86 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser.add_argument("--ssl", action="store_true", help="使用 SSL 连接")
     parser.add_argument("--verify-certs", action="store_true", help="验证 SSL 证书")
     parser.add_argument("--batch-size", type=int, default=100, help="批量导入大小")
+    parser.add_argument("--embedding-batch-size", type=int, default=64, help="向量编码批大小")
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="启用流水线导入：读取、转换/向量化与多线程 bulk 并行执行",
+    )
+    parser.add_argument("--bulk-threads", type=int, default=4, help="流水线模式下的 bulk 发送线程数")
+    parser.add_argument(
+        "--max-bulk-bytes",
+        type=int,
+        default=DEFAULT_MAX_BULK_BYTES,
+        help="单个 bulk 请求的最大字节数",
+    )
+    parser.add_argument("--queue-size", type=int, default=8, help="流水线各阶段间队列可缓存的批次数")
+    parser.add_argument("--max-retries", type=int, default=5, help="bulk 遇到 429 拒绝时的最大重试次数")
+    parser.add_argument(
+        "--bulk-load-mode",
+        action="store_true",
+        help="导入期间设置 refresh_interval=-1、number_of_replicas=0，结束（或失败）后恢复原设置并刷新",
+    )
+    parser.add_argument(
+        "--force-merge-segments",
+        type=int,
+        default=None,
+        help="批量加载模式下导入成功后 force merge 到指定段数",
+    )
+    parser.add_argument(
+        "--warmup-knn",
+        action="store_true",
+        help="批量加载模式下导入成功后预热 kNN 图",
+    )
+    parser.add_argument(
+        "--checkpoint-file",
+        default=None,
+        help="检查点文件路径（默认 <数据文件>.checkpoint.json）；指定后每个成功批次都会记录进度",
+    )
+    parser.add_argument(
+        "--blue-green",
+        action="store_true",
+        help="蓝绿部署：导入到 <别名>_v<时间戳>，校验通过后原子切换别名",
+    )
+    parser.add_argument("--alias", help="蓝绿部署的查询别名（默认与 --index 相同）")
+    parser.add_argument(
+        "--keep-versions",
+        type=int,
+        default=INDEX_CONFIG.get("keep_versions", 2),
+        help="蓝绿部署保留的历史版本数（默认取 opensearch_config.INDEX_CONFIG['keep_versions']）",
+    )
+    parser.add_argument(
+        "--min-doc-ratio",
+        type=float,
+        default=0.9,
+        help="新版本文档数不得低于当前版本的该比例，否则拒绝切换",
+    )
+    parser.add_argument(
+        "--sample-query",
+        default=DEFAULT_SAMPLE_QUERY,
+        help="蓝绿部署切换前校验及 --test 使用的示例查询，需能在新数据中命中",
+    )
+    parser.add_argument(
+        "--replace-concrete-index",
+        action="store_true",
+        help="首次切换时删除与别名同名的旧具体索引",
+    )
+    parser.add_argument("--rollback", action="store_true", help="将别名切回上一个历史版本后退出")
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="增量导入：按 content_hash 比对已有文档，只编码并写入新增或变化的文档",
+    )
+    parser.add_argument(
+        "--delete-missing",
+        action="store_true",
+        help="导入完成后删除索引中存在但数据文件里已不存在的文档",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="从检查点记录的位置继续导入（隐含启用检查点）",
+    )
     parser.add_argument("--timeout", type=int, default=30, help="请求超时 (秒)")
 
     # 向量相关参数
@@ -1024,6 +2037,10 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser.add_argument("--vector-dim", type=int, default=512, help="向量维度")
     parser.add_argument("--embedding-model", help="SentenceTransformer 模型 ID")
     parser.add_argument("--model-cache", help="embedding 模型缓存目录")
+    parser.add_argument(
+        "--embedding-store",
+        help="持久化向量存储目录（默认沿用 EMBEDDING_STORE_DIR，传空字符串禁用）",
+    )
     parser.add_argument(
         "--clone-mapping-from",
         default=None,
@@ -1043,7 +2060,14 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     )
 
     parser.add_argument("--test", action="store_true", help="导入完成后执行一次示例查询")
-    return parser.parse_args(argv)
+    args = parser.parse_args(argv)
+    if not args.file and not args.zip and not args.rollback:
+        parser.error("缺少 --file 或 --zip 参数")
+    if args.zip and (args.resume or args.checkpoint_file):
+        parser.error("--zip 直接导入不支持 --resume/--checkpoint-file")
+    if args.blue_green and (args.delta or args.delete_missing or args.resume or args.checkpoint_file):
+        parser.error("--blue-green 每次构建全新索引，不能与 --delta/--delete-missing/--resume/--checkpoint-file 同时使用")
+    return args
 
 
 def main(argv: Optional[Sequence[str]] = None) -> int:
@@ -1066,14 +2090,57 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
             clone_source_index=args.clone_mapping_from,
             preserve_source_fields=args.preserve_source_fields,
             recreate_index=args.recreate_index,
+            embedding_batch_size=args.embedding_batch_size,
+            embedding_store_dir=args.embedding_store,
         )
     except ValueError:
         return 1
 
-    success = importer.import_data(args.file, args.index, batch_size=args.batch_size)
+    alias = args.alias or args.index
+    if args.rollback:
+        return 0 if importer.rollback_alias(alias) else 1
+
+    import_kwargs = dict(
+        pipeline=args.pipeline,
+        bulk_threads=args.bulk_threads,
+        max_bulk_bytes=args.max_bulk_bytes,
+        queue_size=args.queue_size,
+        max_retries=args.max_retries,
+        bulk_load_mode=args.bulk_load_mode,
+        force_merge_segments=args.force_merge_segments,
+        warmup_knn=args.warmup_knn,
+    )
+    if args.zip:
+        import_kwargs.update(sql_zip=True, sql_tables=args.tables)
+    data_file = args.zip or args.file
+    if args.blue_green:
+        success = importer.import_blue_green(
+            data_file,
+            alias,
+            batch_size=args.batch_size,
+            keep_versions=args.keep_versions,
+            min_doc_ratio=args.min_doc_ratio,
+            sample_query=args.sample_query,
+            replace_concrete_index=args.replace_concrete_index,
+            **import_kwargs,
+        )
+        if success and args.test:
+            importer.run_test_query(alias, args.sample_query)
+        return 0 if success else 1
+
+    success = importer.import_data(
+        data_file,
+        args.index,
+        batch_size=args.batch_size,
+        checkpoint_path=args.checkpoint_file,
+        resume=args.resume,
+        delta=args.delta,
+        delete_missing=args.delete_missing,
+        **import_kwargs,
+    )
 
     if success and args.test:
-        importer.run_test_query(args.index)
+        importer.run_test_query(args.index, args.sample_query)
 
     return 0 if success else 1
 
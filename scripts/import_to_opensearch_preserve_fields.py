@@ -11,6 +11,7 @@ import os
 import logging
 import re
 from datetime import datetime
+from typing import Any, Iterable, Iterator, List, Optional, TextIO, Tuple
 from opensearchpy import OpenSearch
 from opensearch_config import OPENSEARCH_CONFIG, INDEX_CONFIG, IMPORT_CONFIG
 
@@ -21,6 +22,99 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+READ_CHUNK_SIZE = 1 << 20
+MAX_RECORD_SIZE = 64 << 20
+
+
+def _iter_json_array(handle: TextIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Any]:
+    """增量解析 JSON 数组：按块读取，逐个产出数组元素，缓冲区只保留未解析的尾部"""
+    decoder = json.JSONDecoder()
+    buffer = handle.read(chunk_size)
+    pos = 0
+    eof = not buffer
+    expect_value = True
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        more = handle.read(chunk_size)
+        if not more:
+            eof = True
+            return False
+        buffer = buffer[pos:] + more
+        pos = 0
+        return True
+
+    def skip_whitespace() -> Optional[str]:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                return None
+
+    if skip_whitespace() != '[':
+        raise ValueError("JSON文件格式错误，应该是数组格式或JSONL格式")
+    pos += 1
+
+    while True:
+        char = skip_whitespace()
+        if char is None:
+            raise ValueError("JSON 数组未正确结束")
+        if char == ']':
+            return
+        if char == ',' and not expect_value:
+            pos += 1
+            expect_value = True
+            continue
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            # 元素跨块时读入更多数据重试；单个元素超过上限视为文件损坏，避免把整个文件读进内存
+            if len(buffer) - pos < MAX_RECORD_SIZE and fill():
+                continue
+            raise ValueError(f"JSON 数组解析失败: {e}") from e
+        if end >= len(buffer) and fill():
+            # 元素恰好停在块尾时（例如数字）可能被截断，读入更多数据后重新解析
+            continue
+        pos = end
+        expect_value = False
+        yield value
+        if pos >= chunk_size:
+            buffer = buffer[pos:]
+            pos = 0
+
+
+def _iter_jsonl(handle: TextIO) -> Iterator[Any]:
+    for line_num, line in enumerate(handle, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.warning(f"第 {line_num} 行JSON解析失败: {e}")
+            continue
+
+
+def iter_json_records(json_file: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Any]:
+    """流式读取 JSON 数组或 JSONL 文件，内存占用与文件大小无关"""
+    with open(json_file, 'r', encoding='utf-8') as f:
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        f.seek(0)
+        if head == '[':
+            logger.info("检测到JSON数组格式，增量解析...")
+            yield from _iter_json_array(f, chunk_size)
+        else:
+            logger.info("检测到JSONL格式，按行解析...")
+            yield from _iter_jsonl(f)
+
+
 class OpenSearchImporterPreserveFields:
     def __init__(self):
         """初始化 OpenSearch 连接"""
@@ -314,127 +408,96 @@ class OpenSearchImporterPreserveFields:
             logger.info("尝试跳过索引创建，直接导入数据...")
             return True
 
+    def iter_actions(self, records: Iterable[dict]) -> Iterator[Tuple[str, dict]]:
+        """逐条转换记录，产出 ``(原有ID, 文档)``；缺少 _id 或转换失败的记录被跳过"""
+        for i, record in enumerate(records):
+            try:
+                # 保留原有的ID
+                doc_id = record.get('_id')
+                if not doc_id:
+                    logger.warning(f"记录 {i} 缺少 _id 字段，跳过")
+                    continue
+                yield doc_id, self.transform_record(record)
+            except Exception as e:
+                logger.warning(f"转换记录 {i} 失败: {e}")
+                continue
+
+    def _bulk_batch(self, batch: List[Tuple[str, dict]], index_name: str) -> Tuple[int, int]:
+        """发送一批文档，返回 (成功数, 失败数)"""
+        bulk_body = []
+        for doc_id, document in batch:
+            bulk_body.append({
+                "index": {
+                    "_index": index_name,
+                    "_id": doc_id  # 使用原有ID
+                }
+            })
+            bulk_body.append(document)
+
+        success_count = 0
+        error_count = 0
+        try:
+            response = self.client.bulk(body=bulk_body)
+            for item in response['items']:
+                if 'index' in item:
+                    if item['index']['status'] in [200, 201]:
+                        success_count += 1
+                    else:
+                        error_count += 1
+                        logger.warning(f"导入失败: {item['index'].get('error', 'Unknown error')}")
+        except Exception as e:
+            logger.error(f"批量导入失败: {e}")
+            error_count += len(batch)
+        return success_count, error_count
+
     def import_data(self, json_file: str, index_name: str, batch_size: int = 100):
-        """导入数据到 OpenSearch，保留原有ID"""
+        """流式导入数据到 OpenSearch，保留原有ID
+
+        读取、转换与 bulk 串成生成器流水线，内存中最多只保留一个批次，
+        第一批数据解析完成后立即开始写入。
+        """
         
         # 创建索引
         if not self.create_index_mapping(index_name):
             return False
         
+        logger.info(f"流式读取数据文件: {json_file}")
+        success_count = 0
+        error_count = 0
+        batch: List[Tuple[str, dict]] = []
+        
+        try:
+            for item in self.iter_actions(iter_json_records(json_file)):
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    ok, failed = self._bulk_batch(batch, index_name)
+                    success_count += ok
+                    error_count += failed
+                    batch = []
+                    logger.info(f"已导入 {success_count + error_count} 条记录")
+            if batch:
+                ok, failed = self._bulk_batch(batch, index_name)
+                success_count += ok
+                error_count += failed
+        except (OSError, ValueError) as e:
+            # 数组格式损坏时已写入的批次保留，后续数据不再导入
+            logger.error(f"读取数据失败: {e}")
+            logger.info(f"中断前已导入: 成功 {success_count} 条, 失败 {error_count} 条")
+            return False
+        
+        if success_count + error_count == 0:
+            logger.error("没有有效的数据可以导入")
+            return False
+        
+        logger.info(f"导入完成: 成功 {success_count} 条, 失败 {error_count} 条")
+        
         try:
-            # 读取JSON文件（支持JSONL格式）
-            logger.info(f"读取数据文件: {json_file}")
-            data = []
-            
-            with open(json_file, 'r', encoding='utf-8') as f:
-                # 尝试读取为标准JSON
-                content = f.read().strip()
-                
-                # 检查是否是JSONL格式（每行一个JSON对象）
-                if content.startswith('{') and '\n{' in content:
-                    logger.info("检测到JSONL格式，按行解析...")
-                    f.seek(0)
-                    for line_num, line in enumerate(f, 1):
-                        line = line.strip()
-                        if line:
-                            try:
-                                record = json.loads(line)
-                                data.append(record)
-                            except json.JSONDecodeError as e:
-                                logger.warning(f"第 {line_num} 行JSON解析失败: {e}")
-                                continue
-                else:
-                    # 尝试作为标准JSON数组解析
-                    try:
-                        data = json.loads(content)
-                        if not isinstance(data, list):
-                            logger.error("JSON文件格式错误，应该是数组格式或JSONL格式")
-                            return False
-                    except json.JSONDecodeError:
-                        logger.error("文件既不是标准JSON数组也不是JSONL格式")
-                        return False
-            
-            logger.info(f"共读取 {len(data)} 条记录")
-            
-            # 转换数据
-            logger.info("开始转换数据...")
-            transformed_data = []
-            
-            for i, record in enumerate(data):
-                try:
-                    transformed = self.transform_record(record)
-                    
-                    # 保留原有的ID
-                    doc_id = record.get('_id')
-                    if not doc_id:
-                        logger.warning(f"记录 {i} 缺少 _id 字段，跳过")
-                        continue
-                    
-                    transformed_data.append({
-                        'id': doc_id,  # 使用原有ID
-                        'data': transformed
-                    })
-                    
-                    if (i + 1) % 1000 == 0:
-                        logger.info(f"已转换 {i + 1} 条记录")
-                        
-                except Exception as e:
-                    logger.warning(f"转换记录 {i} 失败: {e}")
-                    continue
-            
-            logger.info(f"成功转换 {len(transformed_data)} 条记录")
-            
-            if not transformed_data:
-                logger.error("没有有效的数据可以导入")
-                return False
-            
-            # 批量导入
-            logger.info("开始批量导入到 OpenSearch...")
-            success_count = 0
-            error_count = 0
-            
-            for i in range(0, len(transformed_data), batch_size):
-                batch = transformed_data[i:i + batch_size]
-                
-                # 构建批量操作
-                bulk_body = []
-                for item in batch:
-                    bulk_body.append({
-                        "index": {
-                            "_index": index_name,
-                            "_id": item['id']  # 使用原有ID
-                        }
-                    })
-                    bulk_body.append(item['data'])
-                
-                try:
-                    response = self.client.bulk(body=bulk_body)
-                    
-                    # 检查结果
-                    for item in response['items']:
-                        if 'index' in item:
-                            if item['index']['status'] in [200, 201]:
-                                success_count += 1
-                            else:
-                                error_count += 1
-                                logger.warning(f"导入失败: {item['index'].get('error', 'Unknown error')}")
-                    
-                    logger.info(f"已导入 {min(i + batch_size, len(transformed_data))}/{len(transformed_data)} 条记录")
-                    
-                except Exception as e:
-                    logger.error(f"批量导入失败: {e}")
-                    error_count += len(batch)
-            
-            logger.info(f"导入完成: 成功 {success_count} 条, 失败 {error_count} 条")
-            
             # 刷新索引
             self.client.indices.refresh(index=index_name)
-            
-            return success_count > 0
-            
         except Exception as e:
-            logger.error(f"导入数据失败: {e}")
-            return False
+            logger.warning(f"刷新索引失败: {e}")
+        
+        return success_count > 0
 
     def search_phenomena(self, query: str, system: str = None, part: str = None, size: int = 10):
         """按照 README.md 设计进行故障现象搜索"""
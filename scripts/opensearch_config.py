@@ -15,11 +15,15 @@ OPENSEARCH_CONFIG = {
     'ssl_assert_hostname': False,  # VPC 端点可能需要关闭主机名验证
     'ssl_show_warn': False,  # 关闭 SSL 警告
     'timeout': 30,  # 连接超时时间
+    'async_enabled': True,  # 异步接口使用 AsyncOpenSearch（需安装 opensearch-py[async]）
+    'async_pool_maxsize': 20,  # AsyncOpenSearch 连接池大小
 }
 
 # 索引配置
 INDEX_CONFIG = {
-    'name': 'cases_recovery',  # 索引名称
+    'name': 'cases_recovery',  # 索引名称（蓝绿部署时为版本索引的前缀）
+    'alias': 'cases_recovery',  # 查询别名：匹配器只查询别名，导入脚本 --blue-green 原子切换
+    'keep_versions': 2,  # 蓝绿部署保留的历史版本数，用于回滚
     'shards': 1,  # 分片数
     'replicas': 0,  # 副本数
     # 语义检索相关配置
@@ -27,6 +31,11 @@ INDEX_CONFIG = {
     'embedding_dim': 512,  # 向量维度（需与导入时生成的向量一致）
     'default_semantic_weight': 0.6,  # 语义得分在最终融合中的默认权重
     'vector_num_candidates': 200,  # kNN 搜索的候选数量
+    'use_msearch': True,  # 关键词与 kNN 召回合并为一次 _msearch 请求
+    # 现象检索返回的 _source 字段：None 使用匹配器内置字段列表，[] 返回全部字段
+    'phenomena_source_includes': None,
+    # 额外排除的 _source 字段（向量字段始终排除），例如 ['search', 'search_content']
+    'phenomena_source_excludes': [],
 }
 
 # 导入配置
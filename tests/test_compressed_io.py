@@ -0,0 +1,72 @@
+import gzip
+import io
+import json
+
+import pytest
+
+from app.utils.compressed_io import detect_compression, open_binary, skip_bytes
+from app.utils.data_loader import iter_records
+from scripts.import_to_opensearch import OpenSearchImporter
+
+RECORDS = [{"id": f"P{idx:03d}", "text": f"发动机异响{idx}"} for idx in range(20)]
+
+
+def _jsonl_bytes() -> bytes:
+    return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in RECORDS).encode("utf-8")
+
+
+def test_gzip_detected_by_extension_and_magic(tmp_path) -> None:
+    gz = tmp_path / "cases.jsonl.gz"
+    gz.write_bytes(gzip.compress(_jsonl_bytes()))
+    renamed = tmp_path / "cases.jsonl"
+    renamed.write_bytes(gz.read_bytes())
+    plain = tmp_path / "plain.jsonl"
+    plain.write_bytes(_jsonl_bytes())
+
+    assert detect_compression(str(gz)) == "gzip"
+    assert detect_compression(str(renamed)) == "gzip"
+    assert detect_compression(str(plain)) is None
+    assert list(iter_records(str(renamed))) == RECORDS
+
+
+def test_compressed_json_array(tmp_path) -> None:
+    path = tmp_path / "cases.json.gz"
+    path.write_bytes(gzip.compress(json.dumps(RECORDS, ensure_ascii=False).encode("utf-8")))
+
+    assert list(iter_records(str(path))) == RECORDS
+
+
+def test_zstd_stream(tmp_path) -> None:
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "cases.jsonl.zst"
+    path.write_bytes(zstandard.ZstdCompressor().compress(_jsonl_bytes()))
+
+    assert list(iter_records(str(path))) == RECORDS
+    with open_binary(str(path)) as handle:
+        skip_bytes(handle, 10)
+        assert handle.read() == _jsonl_bytes()[10:]
+
+
+def test_skip_bytes_reads_through_non_seekable_stream() -> None:
+    class Unseekable(io.BytesIO):
+        def seekable(self):
+            return False
+
+    handle = Unseekable(b"0123456789")
+    skip_bytes(handle, 4)
+
+    assert handle.read() == b"456789"
+
+
+def test_importer_resumes_inside_gzip_file(tmp_path) -> None:
+    path = tmp_path / "cases.jsonl.gz"
+    path.write_bytes(gzip.compress(_jsonl_bytes()))
+    importer = object.__new__(OpenSearchImporter)
+
+    rows = list(importer._iter_records_with_offsets(str(path)))
+    _, offset, line = rows[4]
+    resumed = list(importer._iter_records_with_offsets(str(path), offset, line))
+
+    assert [r for r, _, _ in rows] == RECORDS
+    assert [r for r, _, _ in resumed] == RECORDS[5:]
+    assert resumed[0][2] == 6
@@ -1,6 +1,24 @@
+import json
 import textwrap
+from collections import Counter
+from zipfile import ZipFile
 
-from scripts.convert_sql_to_jsonl import iter_insert_statements
+import pytest
+
+from app.utils.data_loader import iter_records, read_columns
+from scripts.convert_sql_to_jsonl import (
+    KeywordMatcher,
+    _parse_value_tuple,
+    _split_value_tuples,
+    calculate_popularity,
+    convert_zip_to_jsonl,
+    convert_zip_to_parquet,
+    extract_system_from_discussion,
+    generate_tags_from_content,
+    iter_insert_statements,
+    iter_insert_statements_stream,
+    match_case_keywords,
+)
 
 
 def test_iter_insert_handles_semicolon_inside_string():
@@ -14,3 +32,147 @@ def test_iter_insert_handles_semicolon_inside_string():
 
     assert len(statements) == 1
     assert statements[0].values[1] == "foo;bar"
+
+
+def test_value_tuples_fast_path_and_fallback_agree():
+    # 第一个元组走整元组正则；第二个在字符串外含嵌套括号，走逐个特殊字符的回退路径
+    block = "(2,'it''s','x\\'y', -3.5 ,NULL,TRUE), (1,'a(b',POINT(1,2))"
+
+    tuples = list(_split_value_tuples(block))
+
+    assert tuples == ["2,'it''s','x\\'y', -3.5 ,NULL,TRUE", "1,'a(b',POINT(1,2)"]
+    assert _parse_value_tuple(tuples[0]) == [2, "it's", "x'y", -3.5, None, True]
+    assert _parse_value_tuple(tuples[1]) == [1, "a(b", "POINT(1", "2)"]
+    assert _parse_value_tuple(" 'tail\\") == ["tail\\"]
+    assert _parse_value_tuple("1,,2,") == [1, None, 2]
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+SQL_DUMP = textwrap.dedent(
+    """
+    -- it's a dump
+    CREATE TABLE `case_recovery` (
+      `id` int NOT NULL,
+      `symptoms` text,
+      PRIMARY KEY (`id`)
+    );
+    INSERT INTO `case_recovery` VALUES (1, 'a;b(c'), (2, 'it''s \\\\ fine\\');'), (3, NULL);
+    INSERT INTO `other` (`k`, `v`) VALUES ('x', 1.5);
+    INSERT INTO `case_recovery` VALUES (4, '尾部')
+    """
+)
+
+
+def test_stream_matches_whole_text_for_any_chunk_size():
+    expected = [
+        (s.table, list(s.columns), list(s.values))
+        for s in iter_insert_statements(SQL_DUMP, column_definitions={"case_recovery": ["id", "symptoms"]})
+    ]
+
+    for size in (1, 2, 3, 7, 64, len(SQL_DUMP)):
+        streamed = [
+            (s.table, list(s.columns), list(s.values))
+            for s in iter_insert_statements_stream(_chunks(SQL_DUMP, size))
+        ]
+        assert streamed == expected, size
+
+    assert [row[2] for row in expected] == [
+        [1, "a;b(c"], [2, "it's \\ fine');"], [3, None], ["x", 1.5], [4, "尾部"],
+    ]
+    assert expected[0][1] == ["id", "symptoms"]
+
+
+def test_convert_zip_streams_each_entry(tmp_path):
+    archive_path = tmp_path / "dump.zip"
+    with ZipFile(archive_path, "w") as archive:
+        archive.writestr("a.sql", SQL_DUMP)
+        archive.writestr("b.sql", "INSERT INTO `t2` VALUES (1,'汉字');".encode("gb18030"))
+
+    output = tmp_path / "out.jsonl"
+    written, stats = convert_zip_to_jsonl(str(archive_path), str(output), include_tables=["other", "t2"])
+
+    rows = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert written == 2 and stats == Counter({"other": 1, "t2": 1})
+    assert rows[1]["_source"] == {"col_0": 1, "col_1": "汉字"}
+
+
+def test_convert_zip_workers_match_single_process(tmp_path):
+    inserts = "".join(
+        f"INSERT INTO `logs` VALUES ('m{i};x',{i}),('n{i}',NULL);\n"
+        f"INSERT INTO `cases` (`id`,`title`) VALUES ({i},'标题{i}');\n"
+        for i in range(40)
+    )
+    archive_path = tmp_path / "dump.zip"
+    with ZipFile(archive_path, "w") as archive:
+        archive.writestr("a.sql", inserts)
+        archive.writestr("b.sql", inserts[: len(inserts) // 2])
+
+    outputs = {}
+    for workers in (1, 3):
+        output = tmp_path / f"out{workers}.jsonl"
+        outputs[workers] = convert_zip_to_jsonl(
+            str(archive_path), str(output), index_name=None, workers=workers, batch_chars=64
+        ) + (output.read_bytes(),)
+
+    assert outputs[1] == outputs[3]
+    ids = [json.loads(line)["_id"] for line in outputs[3][2].decode("utf-8").splitlines()]
+    assert [doc_id for doc_id in ids if doc_id.startswith("logs-")][-1] == f"logs-{outputs[3][1]['logs']}"
+
+
+def test_keyword_matcher_finds_overlapping_keywords():
+    keywords = ["制动", "制动失效", "动力不足", "颤抖", "抖动", "油液泄漏", "漏油", "ab", "ba"]
+    matcher = KeywordMatcher(keywords)
+    texts = ["制动力不足", "颤抖动力不足", "制动失效", "油液泄漏油液泄漏油", "ababab", "无关内容", ""]
+
+    for text in texts:
+        assert matcher.scan(text) == {keyword for keyword in keywords if keyword in text}
+
+
+def test_case_keyword_derivations_share_one_scan():
+    symptoms, discussion = "冷车无法启动，仪表故障灯亮", "检查发现ECU插头松动"
+    hits = match_case_keywords(symptoms, discussion)
+
+    assert "故障灯" in hits.content and "故障灯" not in hits.discussion
+    assert extract_system_from_discussion(discussion, hits=hits) == extract_system_from_discussion(discussion) == "发动机"
+    assert generate_tags_from_content(symptoms, discussion, "大众", hits=hits) == ["大众", "启动故障", "故障灯", "维修案例"]
+    assert calculate_popularity(symptoms, discussion, "大众", "发动机", hits=hits) == calculate_popularity(
+        symptoms, discussion, "大众", "发动机"
+    )
+
+
+def test_convert_zip_to_parquet_matches_jsonl(tmp_path):
+    pytest.importorskip("pyarrow")
+    inserts = "".join(
+        f"INSERT INTO `cases` (`id`,`text`,`popularity`,`tags`,`note`) VALUES ({i},'文本{i}','{i}',NULL,'备注');\n"
+        for i in range(30)
+    )
+    archive_path = tmp_path / "dump.zip"
+    with ZipFile(archive_path, "w") as archive:
+        archive.writestr("a.sql", inserts)
+
+    jsonl, parquet = tmp_path / "out.jsonl", tmp_path / "out.parquet"
+    convert_zip_to_jsonl(str(archive_path), str(jsonl))
+    written, stats = convert_zip_to_parquet(str(archive_path), str(parquet), row_group_size=7)
+
+    expected = [json.loads(line) for line in jsonl.read_text(encoding="utf-8").splitlines()]
+    assert written == 30 and stats == Counter({"cases": 30})
+    rows = list(iter_records(str(parquet)))
+    assert [row["id"] for row in rows] == [row["_id"] for row in expected]
+    assert rows[3]["text"] == "文本3" and rows[3]["popularity"] == 3 and rows[3]["note"] == "备注"
+    assert read_columns(str(parquet), ("id", "popularity"))["popularity"] == list(range(30))
+    assert list(iter_records(str(parquet), columns=("text",)))[0] == {"text": "文本0"}
+
+
+def test_iter_records_projects_columns_for_json(tmp_path):
+    path = tmp_path / "cases.jsonl"
+    path.write_text(
+        json.dumps({"id": "A1", "text": "刹车异响", "discussion": "长文本", "popularity": 120}, ensure_ascii=False)
+        + "\n",
+        encoding="utf-8",
+    )
+
+    assert list(iter_records(str(path), columns=("id", "text", "system"))) == [{"id": "A1", "text": "刹车异响"}]
+    assert read_columns(str(path), ("id", "system")) == {"id": ["A1"], "system": [None]}
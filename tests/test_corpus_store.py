@@ -0,0 +1,101 @@
+import builtins
+import importlib
+import json
+import os
+import sys
+
+import pytest
+
+from app import corpus_store
+from app.corpus_store import get_corpus, load_corpus
+
+RECORDS = [
+    {"id": "A1", "text": "发动机无法启动", "system": "发动机", "popularity": 120, "discussion": "长文本"},
+    {"id": "A2", "text": "刹车异响", "tags": ["制动"]},
+]
+
+
+def _write(path, records) -> None:
+    path.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records), encoding="utf-8")
+
+
+def _no_parse(*args, **kwargs):
+    raise AssertionError("data file should not be parsed")
+
+
+def test_second_load_comes_from_snapshot(tmp_path, monkeypatch) -> None:
+    data, snapshot = tmp_path / "cases.jsonl", tmp_path / "corpus.pkl"
+    _write(data, RECORDS)
+
+    cold = load_corpus(str(data), str(snapshot))
+    monkeypatch.setattr(corpus_store, "read_columns", _no_parse)
+    warm = load_corpus(str(data), str(snapshot))
+
+    assert (cold.source, warm.source) == ("parsed", "snapshot")
+    assert list(warm) == list(cold) == [
+        {"id": "A1", "text": "发动机无法启动", "system": "发动机", "popularity": 120},
+        {"id": "A2", "text": "刹车异响", "tags": ["制动"]},
+    ]
+    assert warm.texts == ["发动机无法启动", "刹车异响"]
+    assert warm.stats()["records"] == 2 and warm.stats()["rss_mb"] > 0
+
+
+def test_touched_file_reuses_snapshot_by_hash(tmp_path, monkeypatch) -> None:
+    data, snapshot = tmp_path / "cases.jsonl", tmp_path / "corpus.pkl"
+    _write(data, RECORDS)
+    load_corpus(str(data), str(snapshot))
+    st = os.stat(data)
+    os.utime(data, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    monkeypatch.setattr(corpus_store, "read_columns", _no_parse)
+    assert load_corpus(str(data), str(snapshot)).source == "snapshot"
+    with open(snapshot, "rb") as handle:
+        assert corpus_store.pickle.load(handle)["mtime_ns"] == st.st_mtime_ns + 10**9
+
+
+def test_changed_file_invalidates_snapshot(tmp_path) -> None:
+    data, snapshot = tmp_path / "cases.jsonl", tmp_path / "corpus.pkl"
+    _write(data, RECORDS)
+    load_corpus(str(data), str(snapshot))
+    _write(data, RECORDS[:1])
+
+    store = load_corpus(str(data), str(snapshot))
+
+    assert store.source == "parsed" and len(store) == 1
+
+
+def test_corrupt_snapshot_falls_back_to_parsing(tmp_path) -> None:
+    data, snapshot = tmp_path / "cases.jsonl", tmp_path / "corpus.pkl"
+    _write(data, RECORDS)
+    snapshot.write_bytes(b"not a pickle")
+
+    store = load_corpus(str(data), str(snapshot))
+
+    assert store.source == "parsed" and len(store) == 2
+    assert load_corpus(str(data), str(snapshot)).source == "snapshot"
+
+
+def test_searchers_share_one_corpus(tmp_path, monkeypatch) -> None:
+    data = tmp_path / "cases.jsonl"
+    _write(data, RECORDS)
+    monkeypatch.setattr(corpus_store, "_corpora", {})
+
+    first = get_corpus(str(data), "")
+    assert get_corpus(os.path.relpath(data), "") is first
+    with pytest.raises(ValueError):
+        corpus_store.CorpusStore({"id": ["A1"], "text": []})
+
+
+def test_imports_without_resource_module(monkeypatch) -> None:
+    real_open = builtins.open
+
+    def no_proc(path, *args, **kwargs):
+        if str(path).startswith("/proc/"):
+            raise FileNotFoundError(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setitem(sys.modules, "resource", None)  # Windows 上不存在
+    monkeypatch.setattr(builtins, "open", no_proc)
+    module = importlib.reload(corpus_store)
+
+    assert module._rss_mb() == 0.0
@@ -0,0 +1,100 @@
+import threading
+from typing import List
+
+import numpy as np
+
+from app.embedding import Embedder, EmbeddingCache
+
+
+class CountingModel:
+    def __init__(self) -> None:
+        self.calls: List[List[str]] = []
+
+    def encode(self, texts, normalize_embeddings=True, show_progress_bar=False):
+        self.calls.append(list(texts))
+        return np.array([[float(len(t)), float(sum(map(ord, t)) % 97), 1.0] for t in texts], dtype=np.float32)
+
+
+def _make_embedder(cache_size: int = 8) -> Embedder:
+    embedder = object.__new__(Embedder)
+    embedder.model_name = "dummy-model"
+    embedder.model = CountingModel()
+    embedder.cache = EmbeddingCache(cache_size)
+    return embedder
+
+
+def test_repeated_query_hits_cache() -> None:
+    embedder = _make_embedder()
+
+    first = embedder.encode(["发动机无法启动"])
+    second = embedder.encode(["  发动机无法启动 "])
+
+    assert np.array_equal(first, second)
+    assert embedder.model.calls == [["发动机无法启动"]]
+    info = embedder.cache_info()
+    assert (info["hits"], info["misses"], info["size"]) == (1, 1, 1)
+
+
+def test_batch_only_encodes_missing_texts_once() -> None:
+    embedder = _make_embedder()
+    embedder.encode(["刹车异响"])
+
+    result = embedder.encode(["刹车异响", "空调不制冷", "空调不制冷"])
+
+    assert result.shape == (3, 3)
+    assert embedder.model.calls[-1] == ["空调不制冷"]
+    assert np.array_equal(result[1], result[2])
+
+
+def test_cache_is_bounded_lru() -> None:
+    embedder = _make_embedder(cache_size=2)
+    embedder.encode(["a"])
+    embedder.encode(["b"])
+    embedder.encode(["a"])
+    embedder.encode(["c"])
+
+    embedder.encode(["a"])
+    embedder.encode(["b"])
+
+    assert embedder.cache_info()["size"] == 2
+    assert embedder.model.calls == [["a"], ["b"], ["c"], ["b"]]
+
+
+def test_model_encodes_original_text() -> None:
+    embedder = _make_embedder()
+
+    first = embedder.encode(["ＡＢＳ  故障灯亮"])
+    second = embedder.encode(["ABS 故障灯亮"])
+
+    assert embedder.model.calls == [["ＡＢＳ  故障灯亮"]]
+    assert np.array_equal(first, second)
+    assert embedder.cache_info()["hits"] == 1
+
+
+def test_use_cache_false_bypasses_cache() -> None:
+    embedder = _make_embedder()
+
+    embedder.encode(["a", "b"], use_cache=False)
+
+    assert embedder.cache_info()["size"] == 0
+    assert embedder.cache_info()["misses"] == 0
+
+
+def test_cache_is_thread_safe() -> None:
+    embedder = _make_embedder(cache_size=4)
+    queries = [f"q{i % 6}" for i in range(200)]
+
+    def worker() -> None:
+        for query in queries:
+            vec = embedder.encode([query])
+            assert vec[0][0] == len(query)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    info = embedder.cache_info()
+    assert info["size"] <= 4
+    assert info["hits"] + info["misses"] == 800
@@ -0,0 +1,103 @@
+import os
+from typing import List
+
+import numpy as np
+
+from app.embedding_store import EmbeddingStore, embedder_store_key
+
+
+class CountingEncoder:
+    def __init__(self) -> None:
+        self.calls: List[List[str]] = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[float(len(t)), float(sum(map(ord, t)) % 97), 1.0] for t in texts], dtype=np.float32)
+
+
+def test_warm_store_skips_the_model(tmp_path) -> None:
+    encoder = CountingEncoder()
+    texts = ["发动机无法启动", "刹车异响", "发动机无法启动"]
+
+    cold = EmbeddingStore(str(tmp_path), "dummy-model").encode(texts, encoder)
+    assert encoder.calls == [["发动机无法启动", "刹车异响"]]
+
+    reopened = EmbeddingStore(str(tmp_path), "dummy-model")
+    warm = reopened.encode(texts, encoder)
+
+    assert len(encoder.calls) == 1
+    assert np.array_equal(cold, warm)
+    assert reopened.info()["hits"] == 3
+
+
+def test_only_missing_texts_are_encoded(tmp_path) -> None:
+    encoder = CountingEncoder()
+    store = EmbeddingStore(str(tmp_path), "dummy-model")
+    store.encode(["刹车异响"], encoder)
+
+    out = store.encode(["刹车异响", "空调不制冷"], encoder)
+
+    assert encoder.calls[-1] == ["空调不制冷"]
+    assert np.array_equal(out, encoder(["刹车异响", "空调不制冷"]))
+    assert len(store) == 2
+
+
+def test_models_do_not_share_rows(tmp_path) -> None:
+    encoder = CountingEncoder()
+    EmbeddingStore(str(tmp_path), "model-a").encode(["刹车异响"], encoder)
+
+    other = EmbeddingStore(str(tmp_path), "model-a#onnx-int8")
+
+    assert other.get_many(["刹车异响"]) == [None]
+
+
+def test_truncated_tail_is_dropped_on_load(tmp_path) -> None:
+    encoder = CountingEncoder()
+    store = EmbeddingStore(str(tmp_path), "dummy-model")
+    store.encode(["刹车异响", "空调不制冷"], encoder)
+    with open(store._vectors_path, "r+b") as handle:
+        handle.truncate(os.path.getsize(store._vectors_path) - 2)
+
+    reopened = EmbeddingStore(str(tmp_path), "dummy-model")
+
+    assert len(reopened) == 1
+    assert reopened.get_many(["空调不制冷"]) == [None]
+    assert os.path.getsize(reopened._keys_path) == 16
+
+
+def test_dimension_mismatch_is_not_stored(tmp_path) -> None:
+    store = EmbeddingStore(str(tmp_path), "dummy-model")
+    store.put_many(["a"], np.ones((1, 3), dtype=np.float32))
+
+    assert store.put_many(["b"], np.ones((1, 4), dtype=np.float32)) == 0
+    assert len(store) == 1
+
+
+def test_store_key_separates_backends() -> None:
+    class Fake:
+        model_name = "bge"
+        variant = "onnx-int8"
+
+    assert embedder_store_key(Fake()) == "bge#onnx-int8"
+    Fake.variant = "torch"
+    assert embedder_store_key(Fake()) == "bge"
+
+
+def test_duplicate_keys_on_disk_do_not_shift_new_rows(tmp_path) -> None:
+    encoder = CountingEncoder()
+    store = EmbeddingStore(str(tmp_path), "dummy-model")
+    store.encode(["刹车异响", "空调不制冷"], encoder)
+    # 模拟崩溃后重复追加：同一个键在文件里出现两次
+    with open(store._vectors_path, "ab") as handle:
+        handle.write(encoder(["刹车异响"]).tobytes())
+    with open(store._keys_path, "ab") as handle:
+        handle.write(store._key("刹车异响"))
+
+    reopened = EmbeddingStore(str(tmp_path), "dummy-model")
+    reopened.encode(["发动机无法启动"], encoder)
+    again = EmbeddingStore(str(tmp_path), "dummy-model")
+
+    texts = ["刹车异响", "空调不制冷", "发动机无法启动"]
+    assert len(reopened) == 3
+    for loaded in (reopened, again):
+        assert np.array_equal(np.stack(loaded.get_many(texts)), encoder(texts))
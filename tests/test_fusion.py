@@ -0,0 +1,93 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.utils.calibration import clamp, compute_stats, logistic_from_stats
+from app.utils.fusion import CandidateColumns, as_column, column_stats, fuse, logistic_normalize
+
+WEIGHTS = {"rerank": 0.55, "semantic": 0.20, "keyword": 0.10, "knowledge": 0.10, "popularity": 0.05}
+
+
+def _scalar_fuse(rows):
+    rerank_stats = compute_stats(r["rerank"] for r in rows if r["rerank"] is not None)
+    bm25_stats = compute_stats(r["bm25"] for r in rows if r["bm25"] is not None)
+    cosine_stats = compute_stats(r["cosine"] for r in rows if r["cosine"] is not None)
+    scores = []
+    for r in rows:
+        rer_raw = r["rerank"] or 0.0
+        bm_raw = r["bm25"] or 0.0
+        cos_raw = r["cosine"] or 0.0
+        rer = logistic_from_stats(rer_raw, rerank_stats, fallback=rer_raw)
+        bm = logistic_from_stats(bm_raw, bm25_stats, fallback=clamp(bm_raw / 20.0))
+        cos = logistic_from_stats(cos_raw, cosine_stats, fallback=clamp(cos_raw))
+        pop = clamp(np.log1p(max(0.0, float(r["popularity"] or 0.0))) / 5.0)
+        scores.append(
+            WEIGHTS["rerank"] * rer + WEIGHTS["semantic"] * cos + WEIGHTS["keyword"] * bm
+            + WEIGHTS["knowledge"] * min(1.0, r["kg"]) + WEIGHTS["popularity"] * pop
+        )
+    return scores
+
+
+def _random_rows(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"P{i:05d}",
+            "rerank": rng.random(),
+            "bm25": rng.choice([None, rng.uniform(0, 30)]),
+            "cosine": rng.choice([None, rng.uniform(-0.2, 1.0)]),
+            "popularity": rng.choice([None, 0.0, rng.uniform(0, 500)]),
+            "kg": rng.choice([0.0, 0.5, 1.0]),
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("n", [1, 2, 50, 500])
+def test_fuse_matches_scalar_pipeline(n) -> None:
+    rows = _random_rows(n)
+    columns = CandidateColumns.from_columns(
+        [r["id"] for r in rows],
+        rerank=[r["rerank"] for r in rows],
+        bm25=[r["bm25"] for r in rows],
+        cosine=[r["cosine"] for r in rows],
+        popularity=[r["popularity"] for r in rows],
+        kg=[r["kg"] for r in rows],
+    )
+
+    fused = fuse(columns, WEIGHTS)
+
+    assert fused.final.tolist() == pytest.approx(_scalar_fuse(rows), abs=1e-12)
+
+
+def test_logistic_normalize_handles_missing_and_degenerate_columns() -> None:
+    empty = as_column([None, None])
+    normalized, stats = logistic_normalize(empty, np.array([0.3, 2.0]))
+    assert stats is None
+    assert normalized.tolist() == [0.3, 1.0]
+
+    flat = as_column([2.0, 2.0, None])
+    normalized, stats = logistic_normalize(flat, np.zeros(3))
+    assert stats == (2.0, 0.0)
+    assert normalized.tolist() == [1.0, 1.0, 0.0]
+
+
+def test_column_stats_matches_compute_stats() -> None:
+    values = [1.5, None, 3.0, 7.25]
+    expected = compute_stats(v for v in values if v is not None)
+
+    assert column_stats(as_column(values)) == pytest.approx(expected)
+
+
+def test_order_is_stable_for_ties() -> None:
+    columns = CandidateColumns.from_columns(["a", "b", "c"], rerank=[0.5, 0.9, 0.5])
+
+    fused = fuse(columns, WEIGHTS)
+
+    assert [columns.ids[i] for i in fused.order()] == ["b", "a", "c"]
+
+
+def test_from_columns_rejects_length_mismatch() -> None:
+    with pytest.raises(ValueError):
+        CandidateColumns.from_columns(["a", "b"], bm25=[1.0])
@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from scripts.import_to_opensearch_preserve_fields import (  # noqa: E402
+    OpenSearchImporterPreserveFields,
+    iter_json_records,
+)
+
+RECORDS = [
+    {"_id": f"C{idx:03d}", "_source": {"search": f"发动机故障{'异响' * idx}", "rate": idx * 1.5}}
+    for idx in range(12)
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_json_array_is_parsed_incrementally(tmp_path, chunk_size) -> None:
+    path = tmp_path / "cases.json"
+    path.write_text("\n  " + json.dumps(RECORDS, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+    assert list(iter_json_records(str(path), chunk_size=chunk_size)) == RECORDS
+
+
+def test_jsonl_skips_bad_lines(tmp_path) -> None:
+    path = tmp_path / "cases.jsonl"
+    lines = [json.dumps(r, ensure_ascii=False) for r in RECORDS[:3]]
+    path.write_text("\n".join([lines[0], "{broken", "", lines[1], lines[2]]) + "\n", encoding="utf-8")
+
+    assert list(iter_json_records(str(path))) == RECORDS[:3]
+
+
+def test_truncated_array_raises(tmp_path) -> None:
+    path = tmp_path / "cases.json"
+    path.write_text(json.dumps(RECORDS, ensure_ascii=False)[:-40], encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(iter_json_records(str(path), chunk_size=16))
+
+
+class RecordingClient:
+    def __init__(self) -> None:
+        self.bulk_sizes = []
+        self.indices = self
+
+    def bulk(self, body):
+        self.bulk_sizes.append(len(body) // 2)
+        return {"items": [{"index": {"status": 201}} for _ in body[::2]]}
+
+    def refresh(self, index):
+        return {}
+
+
+def test_import_data_streams_in_bounded_batches(tmp_path) -> None:
+    path = tmp_path / "cases.json"
+    records = RECORDS + [{"_source": {"search": "缺少ID"}}]
+    path.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+    importer = object.__new__(OpenSearchImporterPreserveFields)
+    importer.client = RecordingClient()
+    importer.create_index_mapping = lambda index_name: True
+    importer.transform_record = lambda record: dict(record["_source"])
+
+    assert importer.import_data(str(path), "cases", batch_size=5)
+
+    assert importer.client.bulk_sizes == [5, 5, 2]
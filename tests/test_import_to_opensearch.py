@@ -0,0 +1,639 @@
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pytest
+from opensearchpy.serializer import JSONSerializer
+
+from scripts import import_to_opensearch as importer_module
+from scripts.import_to_opensearch import OpenSearchImporter
+from scripts.opensearch_config import INDEX_CONFIG
+
+
+class RecordingEmbedder:
+    def __init__(self, dim: int = 4) -> None:
+        self.dim = dim
+        self.calls: List[List[str]] = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[float(len(t))] * self.dim for t in texts], dtype=np.float32)
+
+
+
+class RecordingBulk:
+    def __init__(self) -> None:
+        self.batches: List[List[Dict[str, Any]]] = []
+
+    def __call__(self, client, actions, **kwargs):
+        actions = list(actions)
+        self.batches.append(actions)
+        return len(actions), []
+
+
+def _make_importer(embedding_batch_size: int = 3, enable_vector: bool = True) -> OpenSearchImporter:
+    importer = object.__new__(OpenSearchImporter)
+    importer.client = object()
+    importer.enable_vector = enable_vector
+    importer.vector_field = "text_vector"
+    importer.vector_dimension = 4
+    importer.embedder = RecordingEmbedder() if enable_vector else None
+    importer.embedding_store = None
+    importer.preserve_source_fields = False
+    importer.recreate_index = False
+    importer.clone_source_index = None
+    importer.embedding_batch_size = embedding_batch_size
+    importer.import_stats = importer._new_import_stats()
+    importer._stats_lock = threading.Lock()
+    importer.delta_import = False
+    importer._seen_ids = None
+    importer.create_index_mapping = lambda index_name: True
+    return importer
+
+
+def _write_records(path, count: int) -> str:
+    with open(path, "w", encoding="utf-8") as handle:
+        for idx in range(count):
+            record = {"_id": f"C{idx:03d}", "_source": {"search": f"发动机故障{'异响' * (idx % 3)}。更换火花塞。"}}
+            handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return str(path)
+
+
+@pytest.fixture
+def recording_bulk(monkeypatch) -> RecordingBulk:
+    recorder = RecordingBulk()
+    monkeypatch.setattr(importer_module, "bulk", recorder)
+    return recorder
+
+
+def test_import_encodes_in_batches_before_bulk(tmp_path, recording_bulk) -> None:
+    importer = _make_importer(embedding_batch_size=3)
+    data_file = _write_records(tmp_path / "cases.jsonl", 7)
+
+    assert importer.import_data(data_file, "cases", batch_size=5)
+
+    assert [len(call) for call in importer.embedder.calls] == [3, 2, 2]
+    assert [len(batch) for batch in recording_bulk.batches] == [5, 2]
+    for batch in recording_bulk.batches:
+        for action in batch:
+            source = action["_source"]
+            assert source["text_vector"] == [float(len(source["search_content"]))] * 4
+    assert importer.import_stats["embed_docs"] == 7
+    assert importer.import_stats["bulk_docs"] == 7
+
+
+def test_batched_vectors_match_single_record_transform(tmp_path, recording_bulk) -> None:
+    importer = _make_importer(embedding_batch_size=4)
+    data_file = _write_records(tmp_path / "cases.jsonl", 5)
+
+    importer.import_data(data_file, "cases", batch_size=10)
+    batched = {a["_id"]: a["_source"]["text_vector"] for a in recording_bulk.batches[0]}
+
+    single = {}
+    for record in importer._iter_records(data_file):
+        transformed = importer.transform_record(record)
+        single[transformed["id"]] = transformed["text_vector"]
+
+    assert batched == single
+
+
+def test_build_vectors_skips_empty_texts_and_failed_batches() -> None:
+    importer = _make_importer(embedding_batch_size=2)
+
+    vectors = importer._build_vectors(["abc", "  ", "de"])
+    assert vectors[0] == [3.0] * 4
+    assert vectors[1] is None
+    assert vectors[2] == [2.0] * 4
+
+    def broken(texts):
+        raise RuntimeError("oom")
+
+    importer.embedder.encode = broken
+    assert importer._build_vectors(["abc"]) == [None]
+
+
+def test_import_without_vectors_does_not_embed(tmp_path, recording_bulk) -> None:
+    importer = _make_importer(enable_vector=False)
+    data_file = _write_records(tmp_path / "cases.jsonl", 3)
+
+    importer.import_data(data_file, "cases", batch_size=2)
+
+    assert all("text_vector" not in a["_source"] for batch in recording_bulk.batches for a in batch)
+    assert importer.import_stats["embed_docs"] == 0
+
+
+class FakeBulkClient:
+    """Minimal client for streaming_bulk; rejects the first ``reject_first`` requests with 429."""
+
+    def __init__(self, reject_first: int = 0) -> None:
+        self.transport = type("Transport", (), {"serializer": JSONSerializer()})()
+        self.reject_first = reject_first
+        self.requests = 0
+        self.indexed: Dict[str, Dict[str, Any]] = {}
+        self.thread_names = set()
+        self._lock = threading.Lock()
+
+    def bulk(self, body, *args, **kwargs):
+        lines = [line for line in body.split("\n") if line]
+        with self._lock:
+            self.requests += 1
+            reject = self.requests <= self.reject_first
+            self.thread_names.add(threading.current_thread().name)
+        items = []
+        for action_line, source_line in zip(lines[::2], lines[1::2]):
+            doc_id = json.loads(action_line)["index"]["_id"]
+            if reject:
+                items.append({"index": {"_id": doc_id, "status": 429,
+                                        "error": {"type": "es_rejected_execution_exception"}}})
+            else:
+                with self._lock:
+                    self.indexed[doc_id] = json.loads(source_line)
+                items.append({"index": {"_id": doc_id, "status": 201}})
+        return {"errors": reject, "items": items}
+
+
+@pytest.fixture
+def no_backoff(monkeypatch) -> None:
+    monkeypatch.setattr(importer_module, "BULK_INITIAL_BACKOFF", 0)
+
+
+def test_pipeline_indexes_every_document(tmp_path, no_backoff) -> None:
+    importer = _make_importer(embedding_batch_size=4)
+    importer.client = FakeBulkClient()
+    data_file = _write_records(tmp_path / "cases.jsonl", 23)
+
+    assert importer.import_data(data_file, "cases", batch_size=5, pipeline=True, bulk_threads=3, queue_size=2)
+
+    assert sorted(importer.client.indexed) == [f"C{idx:03d}" for idx in range(23)]
+    assert all("text_vector" in doc for doc in importer.client.indexed.values())
+    assert importer.import_stats["bulk_docs"] == 23
+    assert importer.client.thread_names <= {f"import-bulk-{idx}" for idx in range(3)}
+
+
+def test_pipeline_retries_rejected_bulk(tmp_path, no_backoff) -> None:
+    importer = _make_importer(enable_vector=False)
+    importer.client = FakeBulkClient(reject_first=1)
+    data_file = _write_records(tmp_path / "cases.jsonl", 4)
+
+    assert importer.import_data(data_file, "cases", batch_size=10, pipeline=True, bulk_threads=1)
+
+    assert importer.client.requests == 2
+    assert len(importer.client.indexed) == 4
+
+
+def test_pipeline_splits_requests_by_max_bytes(tmp_path, no_backoff) -> None:
+    importer = _make_importer(enable_vector=False)
+    importer.client = FakeBulkClient()
+    data_file = _write_records(tmp_path / "cases.jsonl", 6)
+
+    importer.import_data(data_file, "cases", batch_size=6, pipeline=True, bulk_threads=1, max_bulk_bytes=400)
+
+    assert importer.client.requests > 1
+    assert len(importer.client.indexed) == 6
+
+
+def test_sql_zip_import_matches_two_stage_conversion(tmp_path, no_backoff) -> None:
+    from zipfile import ZipFile
+
+    from scripts.convert_sql_to_jsonl import convert_zip_to_jsonl
+
+    archive = tmp_path / "dump.zip"
+    with ZipFile(archive, "w") as handle:
+        handle.writestr(
+            "case_recovery.sql",
+            "CREATE TABLE `case_recovery` (`id` int, `symptoms` text, `discussion` text);\n"
+            + "".join(
+                f"INSERT INTO `case_recovery` VALUES ({idx},'<p>冷车无法启动{idx}</p>','ECU 插头松动');\n"
+                for idx in range(7)
+            )
+            + "INSERT INTO `logs` VALUES ('skip');\n",
+        )
+    jsonl = tmp_path / "cases.jsonl"
+    convert_zip_to_jsonl(str(archive), str(jsonl), index_name="cases", include_tables=["case_recovery"])
+
+    indexed = {}
+    for name, path, kwargs in (
+        ("jsonl", str(jsonl), {}),
+        ("zip", str(archive), {"sql_zip": True, "sql_tables": ["case_recovery"]}),
+    ):
+        importer = _make_importer(enable_vector=False)
+        importer.client = FakeBulkClient()
+        assert importer.import_data(path, "cases", batch_size=3, pipeline=True, bulk_threads=2, **kwargs)
+        indexed[name] = {doc_id: doc["content_hash"] for doc_id, doc in importer.client.indexed.items()}
+
+    assert len(indexed["zip"]) == 7
+    assert indexed["zip"] == indexed["jsonl"]
+
+
+class FakeIndicesClient:
+    def __init__(self, settings: Dict[str, Any], concrete: Optional[List[str]] = None) -> None:
+        self.settings = dict(settings)
+        # 非空时 index 参数视为别名，响应以这些具体索引名为键
+        self.concrete = concrete
+        self.calls: List[Any] = []
+
+    def get_settings(self, index):
+        self.calls.append(("get_settings", index))
+        return {name: {"settings": {"index": dict(self.settings)}} for name in self.concrete or [index]}
+
+    def put_settings(self, index, body):
+        self.calls.append(("put_settings", body["index"]))
+        self.settings.update(body["index"])
+
+    def refresh(self, index):
+        self.calls.append(("refresh", index))
+
+    def forcemerge(self, index, max_num_segments, request_timeout=None):
+        self.calls.append(("forcemerge", max_num_segments))
+
+
+class FakeTransport:
+    def __init__(self) -> None:
+        self.serializer = JSONSerializer()
+        self.requests: List[Any] = []
+
+    def perform_request(self, method, url, **kwargs):
+        self.requests.append((method, url))
+        return {}
+
+
+class FakeTuningClient(FakeBulkClient):
+    def __init__(self,
+                 settings: Dict[str, Any],
+                 fail_bulk: bool = False,
+                 concrete: Optional[List[str]] = None) -> None:
+        super().__init__()
+        self.indices = FakeIndicesClient(settings, concrete)
+        self.transport = FakeTransport()
+        self.fail_bulk = fail_bulk
+
+    def bulk(self, body, *args, **kwargs):
+        if self.fail_bulk:
+            raise RuntimeError("cluster down")
+        return super().bulk(body, *args, **kwargs)
+
+
+def test_bulk_load_mode_tunes_and_restores_settings(tmp_path, no_backoff) -> None:
+    importer = _make_importer()
+    importer.client = FakeTuningClient({"refresh_interval": "5s", "number_of_replicas": "1"})
+    data_file = _write_records(tmp_path / "cases.jsonl", 3)
+
+    assert importer.import_data(
+        data_file, "cases", batch_size=2, pipeline=True, bulk_threads=1,
+        bulk_load_mode=True, force_merge_segments=1, warmup_knn=True,
+    )
+
+    calls = importer.client.indices.calls
+    assert calls[1] == ("put_settings", {"refresh_interval": "-1", "number_of_replicas": 0})
+    assert ("put_settings", {"refresh_interval": "5s", "number_of_replicas": "1"}) in calls
+    assert [c[0] for c in calls[-3:]] == ["put_settings", "refresh", "forcemerge"]
+    assert importer.client.indices.settings == {"refresh_interval": "5s", "number_of_replicas": "1"}
+    assert importer.client.transport.requests == [("GET", "/_plugins/_knn/warmup/cases")]
+
+
+def test_bulk_load_mode_reads_settings_through_alias(tmp_path, no_backoff) -> None:
+    importer = _make_importer(enable_vector=False)
+    importer.client = FakeTuningClient(
+        {"refresh_interval": "30s", "number_of_replicas": "0"}, concrete=["cases_v20240101000000"]
+    )
+    data_file = _write_records(tmp_path / "cases.jsonl", 3)
+
+    assert importer.import_data(data_file, "cases", batch_size=2, bulk_load_mode=True)
+
+    assert ("put_settings", {"refresh_interval": "30s", "number_of_replicas": "0"}) in importer.client.indices.calls
+    assert importer.client.indices.settings == {"refresh_interval": "30s", "number_of_replicas": "0"}
+
+
+def test_bulk_load_mode_skipped_for_multi_index_alias(tmp_path, no_backoff) -> None:
+    importer = _make_importer(enable_vector=False)
+    importer.client = FakeTuningClient({"number_of_replicas": "1"}, concrete=["cases_v1", "cases_v2"])
+    data_file = _write_records(tmp_path / "cases.jsonl", 3)
+
+    assert importer.import_data(data_file, "cases", batch_size=2, bulk_load_mode=True)
+
+    assert [c[0] for c in importer.client.indices.calls] == ["get_settings"]
+
+
+def test_bulk_load_mode_restores_settings_on_failure(tmp_path, monkeypatch) -> None:
+    importer = _make_importer(enable_vector=False)
+    importer.client = FakeTuningClient({"number_of_replicas": "2"})
+    data_file = _write_records(tmp_path / "cases.jsonl", 3)
+    monkeypatch.setattr(importer, "_import_serial", lambda *args, **kwargs: (_ for _ in ()).throw(RuntimeError("boom")))
+
+    with pytest.raises(RuntimeError):
+        importer.import_data(data_file, "cases", bulk_load_mode=True, force_merge_segments=1)
+
+    assert importer.client.indices.settings == {"refresh_interval": None, "number_of_replicas": "2"}
+    assert "forcemerge" not in [c[0] for c in importer.client.indices.calls]
+
+
+class FlakyBulkClient(FakeBulkClient):
+    def __init__(self, fail_on_request: int) -> None:
+        super().__init__()
+        self.fail_on_request = fail_on_request
+        self.sent_ids: List[str] = []
+
+    def bulk(self, body, *args, **kwargs):
+        if self.requests + 1 == self.fail_on_request:
+            self.requests += 1
+            raise ConnectionError("connection reset")
+        lines = [line for line in body.split("\n") if line]
+        self.sent_ids.extend(json.loads(line)["index"]["_id"] for line in lines[::2])
+        return super().bulk(body, *args, **kwargs)
+
+
+@pytest.mark.parametrize("pipeline", [False, True])
+def test_resume_continues_after_last_acknowledged_batch(tmp_path, no_backoff, pipeline) -> None:
+    data_file = _write_records(tmp_path / "cases.jsonl", 10)
+    checkpoint_file = str(tmp_path / "cases.ckpt")
+
+    importer = _make_importer(enable_vector=False)
+    importer.client = FlakyBulkClient(fail_on_request=3)
+    assert not importer.import_data(
+        data_file, "cases", batch_size=3, pipeline=pipeline, bulk_threads=1,
+        checkpoint_path=checkpoint_file, max_retries=0,
+    )
+    first_run = set(importer.client.indexed)
+    assert first_run == {f"C{idx:03d}" for idx in range(6)}
+
+    resumed = _make_importer(enable_vector=False)
+    resumed.client = FlakyBulkClient(fail_on_request=0)
+    assert resumed.import_data(
+        data_file, "cases", batch_size=3, pipeline=pipeline, bulk_threads=1,
+        checkpoint_path=checkpoint_file, resume=True,
+    )
+
+    assert resumed.client.sent_ids == [f"C{idx:03d}" for idx in range(6, 10)]
+    with open(checkpoint_file, encoding="utf-8") as handle:
+        state = json.load(handle)
+    assert state["line"] == 10
+    assert state["offset"] == (tmp_path / "cases.jsonl").stat().st_size
+
+
+def test_checkpoint_only_advances_over_contiguous_batches(tmp_path) -> None:
+    data_file = _write_records(tmp_path / "cases.jsonl", 1)
+    checkpoint = importer_module.ImportCheckpoint(str(tmp_path / "c.json"), data_file, "cases")
+
+    checkpoint.ack(1, 200, 20)
+    assert (checkpoint.offset, checkpoint.line) == (0, 0)
+    checkpoint.ack(0, 100, 10)
+    assert (checkpoint.offset, checkpoint.line) == (200, 20)
+
+
+def test_checkpoint_for_other_file_is_ignored(tmp_path) -> None:
+    data_file = _write_records(tmp_path / "cases.jsonl", 2)
+    checkpoint = importer_module.ImportCheckpoint(str(tmp_path / "c.json"), data_file, "cases")
+    checkpoint.save(50, 1)
+
+    _write_records(tmp_path / "cases.jsonl", 5)
+    reloaded = importer_module.ImportCheckpoint(str(tmp_path / "c.json"), data_file, "cases")
+
+    assert reloaded.load() == (0, 0)
+
+
+class DeltaClient(FakeBulkClient):
+    """Bulk client that also answers ``mget`` from the documents indexed so far."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.deleted: List[str] = []
+
+    def mget(self, index, body, **kwargs):
+        docs = []
+        for doc_id in body["ids"]:
+            source = self.indexed.get(doc_id)
+            docs.append({"_id": doc_id, "found": source is not None, "_source": source or {}})
+        return {"docs": docs}
+
+
+def test_content_hash_ignores_import_time_and_vector(tmp_path) -> None:
+    importer = _make_importer()
+    record = {"_id": "C1", "_source": {"search": "发动机故障。更换火花塞。"}}
+
+    first = importer.transform_record(record)
+    second = importer.transform_record(record, with_vector=False)
+    second["import_time"] = "2000-01-01T00:00:00"
+    changed = importer.transform_record({"_id": "C1", "_source": {"search": "变速箱异响。"}})
+
+    assert first["content_hash"] == importer._content_hash(second)
+    assert changed["content_hash"] != first["content_hash"]
+
+
+@pytest.mark.parametrize("pipeline", [False, True])
+def test_delta_import_only_embeds_changed_documents(tmp_path, no_backoff, pipeline) -> None:
+    data_file = _write_records(tmp_path / "cases.jsonl", 6)
+    importer = _make_importer(embedding_batch_size=10)
+    importer.client = DeltaClient()
+    assert importer.import_data(data_file, "cases", batch_size=4, pipeline=pipeline, bulk_threads=1)
+
+    with open(data_file, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps({"_id": "C999", "_source": {"search": "新增案例。"}}, ensure_ascii=False) + "\n")
+    importer.client.indexed["C002"]["content_hash"] = "stale"
+    importer.embedder.calls.clear()
+
+    assert importer.import_data(data_file, "cases", batch_size=4, pipeline=pipeline, bulk_threads=1, delta=True)
+
+    assert sorted(text for call in importer.embedder.calls for text in call) == sorted(
+        importer.client.indexed[doc_id]["search_content"] for doc_id in ("C002", "C999")
+    )
+    assert importer.import_stats["unchanged_docs"] == 5
+    assert importer.import_stats["bulk_docs"] == 2
+
+
+def test_delete_missing_removes_vanished_documents(tmp_path, recording_bulk, monkeypatch) -> None:
+    data_file = _write_records(tmp_path / "cases.jsonl", 3)
+    importer = _make_importer(enable_vector=False)
+    monkeypatch.setattr(
+        importer_module, "scan",
+        lambda client, **kwargs: iter([{"_id": "C000"}, {"_id": "OLD1"}, {"_id": "C002"}]),
+    )
+
+    assert importer.import_data(data_file, "cases", batch_size=10, delete_missing=True)
+
+    deletes = [a for a in recording_bulk.batches[-1] if a.get("_op_type") == "delete"]
+    assert [a["_id"] for a in deletes] == ["OLD1"]
+
+
+def test_warm_embedding_store_avoids_reencoding(tmp_path, recording_bulk) -> None:
+    from app.embedding_store import EmbeddingStore
+
+    data_file = _write_records(tmp_path / "cases.jsonl", 5)
+    first = _make_importer(embedding_batch_size=2)
+    first.embedding_store = EmbeddingStore(str(tmp_path / "store"), "dummy-model")
+    first.import_data(data_file, "cases", batch_size=10)
+
+    second = _make_importer(embedding_batch_size=2)
+    second.embedding_store = EmbeddingStore(str(tmp_path / "store"), "dummy-model")
+    second.import_data(data_file, "cases", batch_size=10)
+
+    assert first.embedder.calls and not second.embedder.calls
+    vectors = [[a["_source"]["text_vector"] for a in batch] for batch in recording_bulk.batches]
+    assert vectors[0] == vectors[1]
+
+
+class FakeAliasIndices:
+    def __init__(self, cluster: "FakeCluster") -> None:
+        self.cluster = cluster
+
+    def exists(self, index):
+        return index in self.cluster.docs or bool(self.cluster.aliases.get(index))
+
+    def exists_alias(self, name):
+        return bool(self.cluster.aliases.get(name))
+
+    def get_alias(self, name):
+        return {index: {"aliases": {name: {}}} for index in self.cluster.aliases.get(name, ())}
+
+    def get(self, index):
+        prefix = index.rstrip("*")
+        return {name: {} for name in self.cluster.docs if name.startswith(prefix)}
+
+    def update_aliases(self, body):
+        self.cluster.alias_requests.append(body["actions"])
+        for action in body["actions"]:
+            (op, spec), = action.items()
+            if op == "remove":
+                self.cluster.aliases[spec["alias"]].discard(spec["index"])
+            elif op == "remove_index":
+                del self.cluster.docs[spec["index"]]
+            else:
+                self.cluster.aliases.setdefault(spec["alias"], set()).add(spec["index"])
+
+    def delete(self, index):
+        del self.cluster.docs[index]
+
+    def refresh(self, index):
+        return {}
+
+
+class FakeCluster:
+    """Index/alias bookkeeping for blue/green tests; bulk writes only count documents."""
+
+    def __init__(self) -> None:
+        self.docs: Dict[str, int] = {}
+        self.ids: Dict[str, set] = {}
+        self.aliases: Dict[str, set] = {}
+        self.alias_requests: List[List[Dict[str, Any]]] = []
+        self.searches: List[Dict[str, Any]] = []
+        self.indices = FakeAliasIndices(self)
+
+    def _resolve(self, index):
+        return self.aliases.get(index) or {index}
+
+    def count(self, index):
+        return {"count": sum(self.docs.get(name, 0) for name in self._resolve(index))}
+
+    def search(self, index, body):
+        self.searches.append(body)
+        return {"hits": {"hits": [{"_id": "x"}] if self.count(index)["count"] else []}}
+
+    def bulk_helper(self, client, actions, **kwargs):
+        actions = list(actions)
+        for action in actions:
+            ids = self.ids.setdefault(action["_index"], set())
+            ids.add(action["_id"])  # 重复 _id 覆盖旧文档
+            self.docs[action["_index"]] = len(ids)
+        return len(actions), []
+
+
+@pytest.fixture
+def cluster(monkeypatch) -> FakeCluster:
+    fake = FakeCluster()
+    monkeypatch.setattr(importer_module, "bulk", fake.bulk_helper)
+    versions = iter(range(1, 100))
+    monkeypatch.setattr(
+        OpenSearchImporter, "_versioned_index_name",
+        staticmethod(lambda alias: f"{alias}_v2026010100{next(versions):04d}"),
+    )
+    return fake
+
+
+def _blue_green_importer(cluster: FakeCluster) -> OpenSearchImporter:
+    importer = _make_importer(enable_vector=False)
+    importer.client = cluster
+    importer.create_index_mapping = lambda name: cluster.docs.setdefault(name, 0) is not None
+    return importer
+
+
+def test_blue_green_replaces_concrete_index_only_when_allowed(tmp_path, cluster) -> None:
+    data_file = _write_records(tmp_path / "cases.jsonl", 4)
+    cluster.docs["cases"] = 4
+    importer = _blue_green_importer(cluster)
+
+    assert not importer.import_blue_green(data_file, "cases", batch_size=3)
+    assert cluster.docs == {"cases": 4}
+
+    assert importer.import_blue_green(data_file, "cases", batch_size=3, replace_concrete_index=True)
+    assert cluster.aliases["cases"] == {"cases_v20260101000001"}
+    assert "cases" not in cluster.docs
+    assert len(cluster.alias_requests) == 1
+
+
+def test_blue_green_swaps_prunes_and_rolls_back(tmp_path, cluster) -> None:
+    data_file = _write_records(tmp_path / "cases.jsonl", 4)
+    importer = _blue_green_importer(cluster)
+
+    for _ in range(3):
+        assert importer.import_blue_green(data_file, "cases", batch_size=3, keep_versions=1)
+
+    assert cluster.aliases["cases"] == {"cases_v20260101000003"}
+    assert sorted(cluster.docs) == ["cases_v20260101000002", "cases_v20260101000003"]
+    assert cluster.alias_requests[-1] == [
+        {"remove": {"index": "cases_v20260101000002", "alias": "cases"}},
+        {"add": {"index": "cases_v20260101000003", "alias": "cases"}},
+    ]
+
+    assert importer.rollback_alias("cases")
+    assert cluster.aliases["cases"] == {"cases_v20260101000002"}
+
+
+def test_blue_green_accepts_repeated_ids(tmp_path, cluster) -> None:
+    data_file = _write_records(tmp_path / "cases.jsonl", 4)
+    with open(data_file, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps({"_id": "C001", "_source": {"search": "发动机故障。更新后的记录。"}}, ensure_ascii=False) + "\n")
+    importer = _blue_green_importer(cluster)
+
+    assert importer.import_blue_green(data_file, "cases", batch_size=3)
+
+    assert importer.import_stats["indexed_docs"] == 5
+    assert cluster.count("cases")["count"] == 4
+
+
+def test_blue_green_keeps_alias_when_validation_fails(tmp_path, cluster) -> None:
+    importer = _blue_green_importer(cluster)
+    assert importer.import_blue_green(_write_records(tmp_path / "full.jsonl", 10), "cases")
+
+    assert not importer.import_blue_green(_write_records(tmp_path / "partial.jsonl", 3), "cases")
+
+    assert cluster.aliases["cases"] == {"cases_v20260101000001"}
+    assert sorted(cluster.docs) == ["cases_v20260101000001"]
+
+
+def test_blue_green_cli_sample_query_and_keep_versions(tmp_path, cluster) -> None:
+    data_file = _write_records(tmp_path / "cases.jsonl", 4)
+    args = importer_module.parse_args(["--file", data_file, "--blue-green", "--sample-query", "刹车异响"])
+    assert args.keep_versions == INDEX_CONFIG["keep_versions"]
+
+    importer = _blue_green_importer(cluster)
+    assert importer.import_blue_green(data_file, "cases", sample_query=args.sample_query)
+
+    assert "刹车异响" in json.dumps(cluster.searches[-1], ensure_ascii=False)
+
+
+def test_corpus_encoding_bypasses_query_cache() -> None:
+    from app.embedding import Embedder, EmbeddingCache
+
+    embedder = object.__new__(Embedder)
+    embedder.model_name = "dummy-model"
+    embedder.model = RecordingEmbedder()
+    embedder.model.encode = lambda texts, **kwargs: RecordingEmbedder.encode(embedder.model, texts)
+    embedder.cache = EmbeddingCache(8)
+    importer = _make_importer()
+    importer.embedder = embedder
+
+    vectors = importer._build_vectors(["发动机故障", "刹车异响"])
+
+    assert all(vector is not None for vector in vectors)
+    assert embedder.model.calls == [["发动机故障", "刹车异响"]]
+    assert embedder.cache_info()["size"] == 0
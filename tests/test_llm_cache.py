@@ -0,0 +1,149 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from app import llm_router
+from app.llm_cache import LLMDecisionCache, make_cache_key
+
+CANDIDATES = [
+    {"id": "P001", "text": "发动机无法启动"},
+    {"id": "P002", "text": "刹车踏板变软"},
+]
+
+
+class FakeResponse:
+    def __init__(self, content: Dict[str, Any]):
+        self._content = content
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def json(self) -> Dict[str, Any]:
+        return {"choices": [{"message": {"content": json.dumps(self._content, ensure_ascii=False)}}]}
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.calls: List[Dict[str, Any]] = []
+
+    async def post(self, path: str, json: Dict[str, Any], headers: Dict[str, str]) -> FakeResponse:
+        self.calls.append(json)
+        return FakeResponse({"chosen_id": "P001", "confidence": 0.9, "why": "现象一致"})
+
+
+@pytest.fixture
+def llm_env(monkeypatch, tmp_path):
+    settings = SimpleNamespace(openai_api_key="key", openai_model="gpt-test", openai_api_base="http://llm",
+                               llm_singleflight=True)
+    client = FakeClient()
+    cache = LLMDecisionCache(str(tmp_path / "llm_cache.sqlite"))
+
+    async def fake_get_client(base_url: str, api_key: str) -> FakeClient:
+        return client
+
+    monkeypatch.setattr(llm_router, "get_settings", lambda: settings)
+    monkeypatch.setattr(llm_router, "_get_client", fake_get_client)
+    monkeypatch.setattr(llm_router, "get_llm_cache", lambda: cache)
+    return SimpleNamespace(client=client, cache=cache, path=str(tmp_path / "llm_cache.sqlite"))
+
+
+def test_cache_key_depends_on_model_query_and_candidates() -> None:
+    base = make_cache_key("m", "发动机 无法启动", CANDIDATES)
+
+    assert base == make_cache_key("m", "  发动机   无法启动 ", CANDIDATES)
+    assert base != make_cache_key("other", "发动机 无法启动", CANDIDATES)
+    assert base != make_cache_key("m", "发动机 无法启动", list(reversed(CANDIDATES)))
+    assert base != make_cache_key("m", "发动机 无法启动", [CANDIDATES[0], {"id": "P002", "text": "改动"}])
+
+
+def test_closed_set_pick_reuses_cached_decision(llm_env) -> None:
+    first = asyncio.run(llm_router.closed_set_pick("发动机无法启动", CANDIDATES))
+    second = asyncio.run(llm_router.closed_set_pick("发动机无法启动", CANDIDATES))
+
+    assert len(llm_env.client.calls) == 1
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["cache_tier"] == "memory"
+    assert second["chosen_id"] == first["chosen_id"] == "P001"
+    assert llm_env.cache.stats()["memory_hits"] == 1
+
+
+def test_disk_tier_survives_restart(llm_env) -> None:
+    asyncio.run(llm_router.closed_set_pick("发动机无法启动", CANDIDATES))
+    llm_env.cache.close()
+
+    restarted = LLMDecisionCache(llm_env.path)
+    key = make_cache_key("gpt-test", "发动机无法启动", CANDIDATES)
+    value, tier = restarted.get(key)
+
+    assert tier == "disk"
+    assert value["chosen_id"] == "P001"
+    assert "cached" not in value
+    assert restarted.get(key)[1] == "memory"
+
+
+def test_errors_are_not_cached(llm_env, monkeypatch) -> None:
+    async def failing_post(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(llm_env.client, "post", failing_post)
+
+    result = asyncio.run(llm_router.closed_set_pick("发动机无法启动", CANDIDATES))
+
+    assert result["why"] == "llm error"
+    assert llm_env.cache.stats()["disk_size"] == 0
+
+
+def test_ttl_and_size_eviction(tmp_path) -> None:
+    cache = LLMDecisionCache(str(tmp_path / "c.sqlite"), ttl_seconds=60, memory_size=0, max_entries=2)
+    for idx in range(4):
+        cache.put(f"k{idx}", {"chosen_id": f"P{idx}"})
+        time.sleep(0.001)
+    cache.evict()
+
+    assert cache.stats()["disk_size"] == 2
+    assert cache.get("k0") is None
+    assert cache.get("k3")[0]["chosen_id"] == "P3"
+
+    cache.ttl_seconds = 0
+    time.sleep(0.001)
+    assert cache.get("k3") is None
+
+
+def test_sqlite_tier_does_not_block_event_loop(tmp_path) -> None:
+    cache = LLMDecisionCache(str(tmp_path / "c.sqlite"), memory_size=1)
+    cache.put("disk", {"chosen_id": "P1"})
+    cache.put("mem", {"chosen_id": "P2"})  # memory_size=1：只有 mem 留在内存层
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticking = asyncio.create_task(ticker())
+        cache._db_lock.acquire()  # 模拟 WAL 写锁竞争
+        try:
+            memory_hit = await cache.aget("mem")
+            lookup = asyncio.create_task(cache.aget("disk"))
+            store = asyncio.create_task(cache.aput("new", {"chosen_id": "P3"}))
+            await asyncio.sleep(0.05)
+            assert ticks >= 5 and not lookup.done() and not store.done()
+        finally:
+            cache._db_lock.release()
+        results = await lookup, memory_hit
+        await store
+        ticking.cancel()
+        return results
+
+    (disk_value, disk_tier), (_, memory_tier) = asyncio.run(run())
+
+    assert (disk_value["chosen_id"], disk_tier, memory_tier) == ("P1", "disk", "memory")
+    assert cache.stats()["disk_size"] == 3
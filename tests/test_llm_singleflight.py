@@ -0,0 +1,113 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from app import llm_router
+
+CANDIDATES = [
+    {"id": "P001", "text": "发动机无法启动"},
+    {"id": "P002", "text": "刹车踏板变软"},
+]
+
+
+class SlowResponse:
+    def raise_for_status(self) -> None:
+        return None
+
+    def json(self) -> Dict[str, Any]:
+        content = {"chosen_id": "P001", "confidence": 0.8, "why": "现象一致"}
+        return {"choices": [{"message": {"content": json.dumps(content, ensure_ascii=False)}}]}
+
+
+class SlowClient:
+    def __init__(self) -> None:
+        self.calls: List[Dict[str, Any]] = []
+
+    async def post(self, path: str, json: Dict[str, Any], headers: Dict[str, str]) -> SlowResponse:
+        self.calls.append(json)
+        await asyncio.sleep(0.05)
+        return SlowResponse()
+
+
+@pytest.fixture
+def slow_llm(monkeypatch):
+    client = SlowClient()
+    settings = SimpleNamespace(openai_api_key="key", openai_model="gpt-test", openai_api_base="http://llm",
+                               llm_singleflight=True)
+
+    async def fake_get_client(base_url: str, api_key: str) -> SlowClient:
+        return client
+
+    monkeypatch.setattr(llm_router, "get_settings", lambda: settings)
+    monkeypatch.setattr(llm_router, "_get_client", fake_get_client)
+    monkeypatch.setattr(llm_router, "get_llm_cache", lambda: None)
+    return SimpleNamespace(client=client, settings=settings)
+
+
+def test_concurrent_identical_calls_share_one_request(slow_llm) -> None:
+    async def run() -> List[Dict[str, Any]]:
+        return await asyncio.gather(*[llm_router.closed_set_pick("发动机无法启动", CANDIDATES) for _ in range(5)])
+
+    results = asyncio.run(run())
+
+    assert len(slow_llm.client.calls) == 1
+    assert all(r["chosen_id"] == "P001" for r in results)
+    assert sum(1 for r in results if r.get("coalesced")) == 4
+    assert llm_router.get_singleflight_stats()["inflight"] == 0
+
+
+def test_different_candidates_are_not_coalesced(slow_llm) -> None:
+    async def run() -> None:
+        await asyncio.gather(
+            llm_router.closed_set_pick("发动机无法启动", CANDIDATES),
+            llm_router.closed_set_pick("发动机无法启动", CANDIDATES[:1]),
+        )
+
+    asyncio.run(run())
+
+    assert len(slow_llm.client.calls) == 2
+
+
+def test_cancelled_leader_does_not_cancel_followers(slow_llm) -> None:
+    async def run() -> Dict[str, Any]:
+        leader = asyncio.ensure_future(llm_router.closed_set_pick("发动机无法启动", CANDIDATES))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(llm_router.closed_set_pick("发动机无法启动", CANDIDATES))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    result = asyncio.run(run())
+
+    assert result["chosen_id"] == "P001"
+    assert len(slow_llm.client.calls) == 1
+
+
+def test_singleflight_can_be_disabled(slow_llm) -> None:
+    slow_llm.settings.llm_singleflight = False
+
+    async def run() -> None:
+        await asyncio.gather(*[llm_router.closed_set_pick("发动机无法启动", CANDIDATES) for _ in range(3)])
+
+    asyncio.run(run())
+
+    assert len(slow_llm.client.calls) == 3
+
+
+def test_last_waiter_cancel_cancels_inflight_request(slow_llm) -> None:
+    async def run() -> None:
+        caller = asyncio.ensure_future(llm_router.closed_set_pick("发动机无法启动", CANDIDATES))
+        await asyncio.sleep(0.01)
+        inflight = list(llm_router._inflight.values())
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+        assert inflight and inflight[0].cancelled()
+
+    asyncio.run(run())
+
+    assert llm_router.get_singleflight_stats()["inflight"] == 0
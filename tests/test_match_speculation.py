@@ -0,0 +1,146 @@
+import asyncio
+import importlib
+import sys
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from app.searchers import hnswlib_index, keyword_tfidf
+
+HITS = [
+    {"id": f"P{idx:02d}", "text": f"发动机故障{idx}", "cosine": 0.80 - idx * 0.02, "popularity": 100}
+    for idx in range(12)
+]
+
+
+class FakeHNSW:
+    def __init__(self, *args, **kwargs) -> None:
+        self.embedder = SimpleNamespace(cache_info=lambda: {})
+        self.data = SimpleNamespace(stats=lambda: {})
+
+    def knn(self, query: str, topk: int = 50) -> List[Dict[str, Any]]:
+        return [dict(hit) for hit in HITS]
+
+
+class FakeKeyword:
+    def __init__(self, *args, **kwargs) -> None:
+        pass
+
+    def search(self, query: str, topk: int = 50) -> List[Dict[str, Any]]:
+        return []
+
+
+class FakeRerank:
+    def __init__(self, scores: Dict[str, float]) -> None:
+        self.scores = scores
+
+    async def score(self, query: str, texts: List[str]) -> List[float]:
+        await asyncio.sleep(0)  # 让投机任务先启动
+        return [self.scores[text] for text in texts]
+
+
+@pytest.fixture
+def main(monkeypatch):
+    monkeypatch.setattr(hnswlib_index, "HNSWSearcher", FakeHNSW)
+    monkeypatch.setattr(keyword_tfidf, "KeywordSearcher", FakeKeyword)
+    sys.modules.pop("app.main", None)
+    module = importlib.import_module("app.main")
+    monkeypatch.setattr(module.settings, "llm_speculative", True)
+    monkeypatch.setattr(module.settings, "speculative_cosine_low", 0.5)
+    monkeypatch.setattr(module.settings, "speculative_cosine_high", 0.85)
+    monkeypatch.setattr(module.settings, "pass_threshold", 10.0)
+    monkeypatch.setattr(module.settings, "gray_low_threshold", -1.0)
+    monkeypatch.setattr(module, "_speculation_stats", {"started": 0, "useful": 0, "wasted": 0})
+    yield module
+    sys.modules.pop("app.main", None)
+
+
+@pytest.fixture
+def llm(main, monkeypatch):
+    calls: List[Dict[str, Any]] = []
+
+    async def fake_pick(query: str, candidates: List[Dict[str, str]]) -> Dict[str, Any]:
+        call = {"ids": [c["id"] for c in candidates], "cancelled": False, "finished": False}
+        calls.append(call)
+        try:
+            await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            call["cancelled"] = True
+            raise
+        call["finished"] = True
+        return {"chosen_id": candidates[0]["id"], "confidence": 0.9}
+
+    monkeypatch.setattr(main, "closed_set_pick", fake_pick)
+    return calls
+
+
+def _use_rerank(main, monkeypatch, order: List[str]) -> None:
+    scores = {hit["text"]: 0.0 for hit in HITS}
+    for rank, cid in enumerate(order):
+        scores[next(h["text"] for h in HITS if h["id"] == cid)] = 1.0 - rank * 0.05
+    monkeypatch.setattr(main, "get_rerank_service", lambda: FakeRerank(scores))
+
+
+def _pre_rerank_ids(main) -> List[str]:
+    pool = [main.Candidate(**hit) for hit in HITS]
+    return [c.id for c in main._pre_rerank_top(pool, None, None)]
+
+
+def _match(main):
+    return asyncio.run(main.match(q="发动机故障", system=None, part=None, model=None, year=None))
+
+
+def test_speculative_result_is_kept_when_top10_order_matches(main, llm, monkeypatch) -> None:
+    expected = _pre_rerank_ids(main)
+    _use_rerank(main, monkeypatch, expected)
+
+    resp = _match(main)
+
+    assert [c["ids"] for c in llm] == [expected]
+    assert llm[0]["finished"] and resp.decision["llm_speculative"] is True
+    assert main._speculation_stats == {"started": 1, "useful": 1, "wasted": 0}
+
+
+def test_speculation_is_wasted_when_rerank_changes_top10(main, llm, monkeypatch) -> None:
+    expected = _pre_rerank_ids(main)
+    _use_rerank(main, monkeypatch, list(reversed(expected)))
+
+    resp = _match(main)
+
+    assert llm[0]["cancelled"] and llm[0]["ids"] == expected
+    assert llm[1]["ids"] == list(reversed(expected))
+    assert resp.decision["llm_speculative"] is False
+    assert main._speculation_stats == {"started": 1, "useful": 0, "wasted": 1}
+
+
+def test_speculation_is_wasted_when_order_alone_changes(main, llm, monkeypatch) -> None:
+    expected = _pre_rerank_ids(main)
+    swapped = [expected[1], expected[0]] + expected[2:]
+    _use_rerank(main, monkeypatch, swapped)
+
+    _match(main)
+
+    assert llm[0]["cancelled"] and llm[1]["ids"] == swapped
+    assert main._speculation_stats == {"started": 1, "useful": 0, "wasted": 1}
+
+
+def test_speculation_is_cancelled_on_direct_match(main, llm, monkeypatch) -> None:
+    _use_rerank(main, monkeypatch, _pre_rerank_ids(main))
+    monkeypatch.setattr(main.settings, "pass_threshold", -1.0)
+
+    resp = _match(main)
+
+    assert resp.decision["mode"] == "direct"
+    assert len(llm) == 1 and llm[0]["cancelled"]
+    assert main._speculation_stats == {"started": 1, "useful": 0, "wasted": 1}
+
+
+def test_no_speculation_outside_gray_prediction(main, llm, monkeypatch) -> None:
+    _use_rerank(main, monkeypatch, _pre_rerank_ids(main))
+    monkeypatch.setattr(main.settings, "speculative_cosine_high", 0.6)
+
+    _match(main)
+
+    assert len(llm) == 1 and not llm[0]["cancelled"]
+    assert main._speculation_stats == {"started": 0, "useful": 0, "wasted": 0}
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from app.onnx_backend import (  # noqa: E402
+    QUANTIZED_FILENAME,
+    OnnxReranker,
+    OnnxSentenceEncoder,
+    compare_outputs,
+    export_embedder,
+    export_reranker,
+)
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + list("发动机无法启动刹车踏板变软空调不制冷示例输入候选")
+CANDIDATES = ["发动机无法启动", "刹车踏板变软", "空调不制冷", "启动"]
+
+
+def _save_tiny_bert(path: str, num_labels: int = None) -> str:
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "vocab.txt"), "w", encoding="utf-8") as fh:
+        fh.write("\n".join(VOCAB))
+    config = transformers.BertConfig(
+        vocab_size=len(VOCAB), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+        intermediate_size=64, max_position_embeddings=64, num_labels=num_labels or 2,
+    )
+    torch.manual_seed(0)
+    if num_labels:
+        model = transformers.BertForSequenceClassification(config)
+    else:
+        model = transformers.BertModel(config)
+    model.save_pretrained(path)
+    transformers.BertTokenizer(os.path.join(path, "vocab.txt")).save_pretrained(path)
+    return path
+
+
+def test_onnx_reranker_matches_torch(tmp_path) -> None:
+    from app.reranker import Reranker
+
+    model_dir = _save_tiny_bert(str(tmp_path / "reranker"), num_labels=1)
+    export_dir = export_reranker(model_dir, str(tmp_path / "onnx"), quantize=False)
+
+    expected = Reranker(model_dir).score("发动机", CANDIDATES)
+    actual = OnnxReranker(export_dir, quantized=False).score("发动机", CANDIDATES)
+
+    assert compare_outputs(expected, actual)["max_abs_diff"] < 1e-4
+
+
+def test_onnx_embedder_matches_sentence_transformer(tmp_path) -> None:
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+
+    model_dir = _save_tiny_bert(str(tmp_path / "embedder"))
+    export_dir = export_embedder(model_dir, str(tmp_path / "onnx"), quantize=False)
+
+    expected = sentence_transformers.SentenceTransformer(model_dir, device="cpu").encode(
+        CANDIDATES, normalize_embeddings=True, show_progress_bar=False
+    )
+    actual = OnnxSentenceEncoder(export_dir, quantized=False).encode(CANDIDATES, normalize_embeddings=True)
+
+    assert actual.dtype == np.float32
+    assert compare_outputs(expected, actual)["max_abs_diff"] < 1e-4
+
+
+def test_quantized_export_is_loaded(tmp_path) -> None:
+    model_dir = _save_tiny_bert(str(tmp_path / "reranker"), num_labels=1)
+    export_dir = export_reranker(model_dir, str(tmp_path / "onnx"), quantize=True)
+
+    reranker = OnnxReranker(export_dir, quantized=True)
+    scores = reranker.score("发动机", CANDIDATES, batch_size=3)
+
+    assert os.path.exists(os.path.join(export_dir, QUANTIZED_FILENAME))
+    assert reranker.quantized is True
+    assert len(scores) == len(CANDIDATES)
+    assert all(0.0 <= score <= 1.0 for score in scores)
+
+
+def test_onnx_embedder_output_sequence_axis_is_dynamic(tmp_path) -> None:
+    pytest.importorskip("sentence_transformers")
+
+    model_dir = _save_tiny_bert(str(tmp_path / "embedder"))
+    export_dir = export_embedder(model_dir, str(tmp_path / "onnx"), quantize=False)
+    encoder = OnnxSentenceEncoder(export_dir, quantized=False)
+    reference = transformers.BertModel.from_pretrained(model_dir).eval()
+
+    # 输出的序列维与输入共用同一个符号维，而不是追踪样例的固定长度
+    assert encoder.session.get_outputs()[0].shape[:2] == encoder.session.get_inputs()[0].shape == ["batch", "sequence"]
+    for texts in (["启动"], ["发动机无法启动", "刹车踏板变软空调不制冷"]):
+        hidden, feeds = encoder._run(texts)
+        with torch.no_grad():
+            expected = reference(**{name: torch.from_numpy(value) for name, value in feeds.items()})[0].numpy()
+        assert hidden.shape == expected.shape
+        assert np.abs(hidden - expected).max() < 1e-4
@@ -0,0 +1,101 @@
+import asyncio
+from typing import Any, Dict, List
+
+from app.opensearch_matcher import OpenSearchMatcher
+from conftest import FakeOpenSearchClient, SAMPLE_DOCUMENTS
+
+
+class FakeAsyncOpenSearchClient:
+    def __init__(self, sync_client: FakeOpenSearchClient, knn_errors: List[Exception] = None):
+        self._sync = sync_client
+        self._knn_errors = list(knn_errors or [])
+        self.calls: List[Dict[str, Any]] = []
+        self.closed = False
+
+    async def search(self, index: str, body: Dict[str, Any], size: int = None) -> Dict[str, Any]:
+        self.calls.append(body)
+        await asyncio.sleep(0)
+        if "multi_match" not in body.get("query", {}).get("bool", {}).get("must", {}):
+            if self._knn_errors:
+                raise self._knn_errors.pop(0)
+            hits = [
+                {"_id": doc["id"], "_score": 0.9 - idx * 0.1, "_source": doc}
+                for idx, doc in enumerate(SAMPLE_DOCUMENTS[:2])
+            ]
+            return {"hits": {"total": {"value": len(hits)}, "hits": hits}}
+        return self._sync.search(index=index, body=body, size=size)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class DummyEmbedder:
+    def encode(self, texts):
+        import numpy as np
+
+        return np.ones((len(texts), 3), dtype=np.float32)
+
+
+def _make_matcher(client: FakeOpenSearchClient, async_client: Any) -> OpenSearchMatcher:
+    matcher = object.__new__(OpenSearchMatcher)
+    matcher.client = client
+    matcher.async_client = async_client
+    matcher.vector_field = "text_vector"
+    matcher.vector_num_candidates = 200
+    matcher.default_semantic_weight = 0.6
+    matcher.embedder = DummyEmbedder()
+    matcher.semantic_available = True
+    matcher._knn_query_style = "top_level"
+    matcher._knn_supports_num_candidates = True
+    matcher.use_msearch = False
+    return matcher
+
+
+def test_search_phenomena_async_uses_async_client(client: FakeOpenSearchClient) -> None:
+    async_client = FakeAsyncOpenSearchClient(client)
+    matcher = _make_matcher(client, async_client)
+
+    result = asyncio.run(matcher.search_phenomena_async("发动机无法启动", size=3))
+
+    assert "error" not in result
+    assert len(async_client.calls) == 2
+    assert result["metadata"]["semantic_used"] is True
+    assert result["top"][0]["id"] == "P001"
+    assert "semantic" in result["top"][0]["sources"]
+
+
+def test_search_phenomena_async_retries_knn_without_num_candidates(client: FakeOpenSearchClient) -> None:
+    error = Exception("parsing_exception: [knn] unknown field [num_candidates]")
+    async_client = FakeAsyncOpenSearchClient(client, knn_errors=[error])
+    matcher = _make_matcher(client, async_client)
+
+    result = asyncio.run(matcher.search_phenomena_async("发动机无法启动", size=3))
+
+    assert matcher._knn_supports_num_candidates is False
+    assert result["metadata"]["semantic_used"] is True
+    assert "num_candidates" not in async_client.calls[-1]["knn"]
+
+
+def test_search_phenomena_async_matches_sync_scoring(client: FakeOpenSearchClient) -> None:
+    async_client = FakeAsyncOpenSearchClient(client)
+    matcher = _make_matcher(client, async_client)
+
+    async_result = asyncio.run(
+        matcher.search_phenomena_async("刹车", size=4, use_semantic=False)
+    )
+    sync_result = matcher.search_phenomena("刹车", size=4, use_semantic=False)
+
+    assert [item["id"] for item in async_result["top"]] == [item["id"] for item in sync_result["top"]]
+    assert [item["final_score"] for item in async_result["top"]] == [
+        item["final_score"] for item in sync_result["top"]
+    ]
+
+
+def test_aclose_releases_async_client(client: FakeOpenSearchClient) -> None:
+    async_client = FakeAsyncOpenSearchClient(client)
+    matcher = _make_matcher(client, async_client)
+
+    asyncio.run(matcher.aclose())
+
+    assert async_client.closed is True
+    assert matcher.async_client is None
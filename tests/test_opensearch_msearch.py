@@ -0,0 +1,233 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.opensearch_matcher import OpenSearchMatcher
+from conftest import FakeOpenSearchClient, SAMPLE_DOCUMENTS
+
+
+def _knn_hits() -> Dict[str, Any]:
+    hits = [
+        {"_id": doc["id"], "_score": 0.9 - idx * 0.1, "_source": doc}
+        for idx, doc in enumerate(SAMPLE_DOCUMENTS[1:3])
+    ]
+    return {"hits": {"total": {"value": len(hits)}, "hits": hits}}
+
+
+def _is_knn_body(body: Dict[str, Any]) -> bool:
+    return "multi_match" not in body.get("query", {}).get("bool", {}).get("must", {})
+
+
+class FakeMsearchClient(FakeOpenSearchClient):
+    """在 conftest 假客户端基础上增加 _msearch 与 kNN 子查询支持"""
+
+    def __init__(self,
+                 index_name: str,
+                 knn_errors: Optional[List[Dict[str, Any]]] = None,
+                 request_errors: Optional[List[Exception]] = None):
+        super().__init__(index_name)
+        self._knn_errors = list(knn_errors or [])
+        # 整个 _msearch 请求失败（REST 层解析出错时 OpenSearch 直接返回 400）
+        self._request_errors = list(request_errors or [])
+        self.msearch_calls: List[List[Dict[str, Any]]] = []
+        self.search_calls: List[Dict[str, Any]] = []
+
+    def search(self, index: str, body: Dict[str, Any], size: Optional[int] = None) -> Dict[str, Any]:
+        self.search_calls.append(body)
+        if _is_knn_body(body):
+            return _knn_hits()
+        return super().search(index=index, body=body, size=size)
+
+    def msearch(self, body: List[Dict[str, Any]], index: Any = None) -> Dict[str, Any]:
+        self.msearch_calls.append(body)
+        if self._request_errors:
+            raise self._request_errors.pop(0)
+        responses = []
+        for header, sub_body in zip(body[::2], body[1::2]):
+            assert header == {"index": self._index_name}
+            if _is_knn_body(sub_body):
+                if self._knn_errors:
+                    responses.append({"error": self._knn_errors.pop(0), "status": 400})
+                else:
+                    responses.append(_knn_hits())
+            else:
+                responses.append(FakeOpenSearchClient.search(self, self._index_name, sub_body))
+        return {"responses": responses}
+
+
+class FakeAsyncMsearchClient:
+    def __init__(self, sync_client: FakeMsearchClient):
+        self._sync = sync_client
+
+    async def search(self, index: str, body: Dict[str, Any], size: Optional[int] = None) -> Dict[str, Any]:
+        return self._sync.search(index=index, body=body, size=size)
+
+    async def msearch(self, body: List[Dict[str, Any]], index: Any = None) -> Dict[str, Any]:
+        return self._sync.msearch(body=body, index=index)
+
+
+class DummyEmbedder:
+    def encode(self, texts):
+        return np.ones((len(texts), 3), dtype=np.float32)
+
+
+def _make_matcher(client: FakeMsearchClient) -> OpenSearchMatcher:
+    matcher = object.__new__(OpenSearchMatcher)
+    matcher.client = client
+    matcher.async_client = FakeAsyncMsearchClient(client)
+    matcher.vector_field = "text_vector"
+    matcher.vector_num_candidates = 200
+    matcher.default_semantic_weight = 0.6
+    matcher.embedder = DummyEmbedder()
+    matcher.semantic_available = True
+    matcher._knn_query_style = "top_level"
+    matcher._knn_supports_num_candidates = True
+    matcher.use_msearch = True
+    return matcher
+
+
+def test_search_phenomena_sends_single_msearch(index_name: str) -> None:
+    client = FakeMsearchClient(index_name)
+    matcher = _make_matcher(client)
+
+    result = matcher.search_phenomena("发动机无法启动", size=4)
+
+    assert len(client.msearch_calls) == 1
+    assert client.search_calls == []
+    assert result["metadata"]["semantic_used"] is True
+    ids = {item["id"] for item in result["top"]}
+    assert {"P001", "P002", "P003"} <= ids
+    p002 = next(item for item in result["top"] if item["id"] == "P002")
+    assert "semantic" in p002["sources"]
+
+
+def test_msearch_matches_serial_fusion(index_name: str) -> None:
+    client = FakeMsearchClient(index_name)
+    matcher = _make_matcher(client)
+
+    combined = matcher.search_phenomena("发动机无法启动", size=4)
+    matcher.use_msearch = False
+    serial = matcher.search_phenomena("发动机无法启动", size=4)
+
+    assert [(i["id"], i["final_score"]) for i in combined["top"]] == [
+        (i["id"], i["final_score"]) for i in serial["top"]
+    ]
+
+
+def test_msearch_knn_error_downgrades_and_retries(index_name: str) -> None:
+    error = {
+        "type": "parsing_exception",
+        "reason": "Unknown key for a START_OBJECT in [knn].",
+    }
+    client = FakeMsearchClient(index_name, knn_errors=[error])
+    matcher = _make_matcher(client)
+
+    result = matcher.search_phenomena("发动机无法启动", size=4)
+
+    assert matcher._knn_query_style == "nested"
+    assert len(client.search_calls) == 1
+    assert "knn" not in client.search_calls[0]
+    assert result["metadata"]["semantic_used"] is True
+
+
+def test_msearch_num_candidates_error_is_handled_per_sub_response(index_name: str) -> None:
+    error = {
+        "type": "x_content_parse_exception",
+        "reason": "[knn] unknown field [num_candidates]",
+    }
+    client = FakeMsearchClient(index_name, knn_errors=[error])
+    matcher = _make_matcher(client)
+
+    result = asyncio.run(matcher.search_phenomena_async("发动机无法启动", size=4))
+
+    assert matcher._knn_supports_num_candidates is False
+    assert "num_candidates" not in client.search_calls[-1]["knn"]
+    assert result["metadata"]["semantic_used"] is True
+
+
+def test_msearch_unrecoverable_knn_error_keeps_keyword_hits(index_name: str) -> None:
+    error = {"type": "search_phase_execution_exception", "reason": "boom"}
+    client = FakeMsearchClient(index_name, knn_errors=[error])
+    matcher = _make_matcher(client)
+
+    result = matcher.search_phenomena("发动机无法启动", size=4)
+
+    assert client.search_calls == []
+    assert result["metadata"]["semantic_used"] is False
+    assert result["top"][0]["id"] == "P001"
+
+
+def test_msearch_request_error_downgrades_and_recovers(index_name: str) -> None:
+    error = Exception("RequestError(400, 'parsing_exception', 'Unknown key for a START_OBJECT in [knn].')")
+    client = FakeMsearchClient(index_name, request_errors=[error])
+    matcher = _make_matcher(client)
+
+    result = matcher.search_phenomena("发动机无法启动", size=4)
+
+    assert matcher._knn_query_style == "nested"
+    assert [("knn" in body, _is_knn_body(body)) for body in client.search_calls] == [(False, False), (False, True)]
+    assert result["metadata"]["semantic_used"] is True
+    assert "error" not in result
+
+    matcher.search_phenomena("发动机无法启动", size=4)
+    assert len(client.msearch_calls) == 2 and len(client.search_calls) == 2
+    assert "knn" not in client.msearch_calls[1][3]
+
+
+def test_msearch_request_error_num_candidates_async(index_name: str) -> None:
+    error = Exception("RequestError(400, 'x_content_parse_exception', '[knn] unknown field [num_candidates]')")
+    client = FakeMsearchClient(index_name, request_errors=[error])
+    matcher = _make_matcher(client)
+
+    result = asyncio.run(matcher.search_phenomena_async("发动机无法启动", size=4))
+
+    assert matcher._knn_supports_num_candidates is False
+    assert "num_candidates" not in client.search_calls[-1]["knn"]
+    assert result["metadata"]["semantic_used"] is True
+
+
+def test_msearch_unrecoverable_request_error_keeps_keyword_hits(index_name: str) -> None:
+    client = FakeMsearchClient(index_name, request_errors=[Exception("ConnectionTimeout")])
+    matcher = _make_matcher(client)
+
+    result = matcher.search_phenomena("发动机无法启动", size=4)
+
+    assert len(client.search_calls) == 1 and not _is_knn_body(client.search_calls[0])
+    assert result["metadata"]["semantic_used"] is False
+    assert result["top"][0]["id"] == "P001"
+
+
+def test_msearch_sub_queries_project_source(index_name: str) -> None:
+    client = FakeMsearchClient(index_name)
+    matcher = _make_matcher(client)
+
+    matcher.search_phenomena("发动机无法启动", size=4)
+
+    keyword_body, knn_body = client.msearch_calls[0][1], client.msearch_calls[0][3]
+    for body in (keyword_body, knn_body):
+        assert "text_vector" in body["_source"]["excludes"]
+        assert "text_vector" not in body["_source"]["includes"]
+        assert "text" in body["_source"]["includes"]
+
+
+def test_source_projection_keeps_extracted_fields() -> None:
+    from app.opensearch_matcher import PHENOMENA_SOURCE_FIELDS, _extract_common_fields
+
+    for doc in SAMPLE_DOCUMENTS:
+        full = {**doc, "text_vector": [0.1, 0.2, 0.3], "unused_blob": "x" * 100}
+        projected = {k: v for k, v in full.items() if k in PHENOMENA_SOURCE_FIELDS}
+        assert _extract_common_fields(projected) == _extract_common_fields(full)
+
+
+def test_source_projection_is_configurable(monkeypatch, index_name: str) -> None:
+    from app import opensearch_matcher as module
+
+    monkeypatch.setitem(module.INDEX_CONFIG, "phenomena_source_includes", [])
+    monkeypatch.setitem(module.INDEX_CONFIG, "phenomena_source_excludes", ["search_content"])
+    matcher = _make_matcher(FakeMsearchClient(index_name))
+
+    source_filter = matcher._phenomena_source_filter()
+
+    assert "includes" not in source_filter
+    assert source_filter["excludes"] == ["search_content", "text_vector"]
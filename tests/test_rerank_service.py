@@ -0,0 +1,82 @@
+import asyncio
+import threading
+from typing import List, Sequence, Tuple
+
+import pytest
+
+from app.reranker import RerankService
+
+
+class FakeReranker:
+    def __init__(self, fail: bool = False):
+        self.batches: List[int] = []
+        self.threads: List[int] = []
+        self.fail = fail
+
+    def score(self, query: str, candidates: List[str], batch_size: int = 16) -> List[float]:
+        return self.score_pairs([(query, c) for c in candidates], batch_size=batch_size)
+
+    def score_pairs(self, pairs: Sequence[Tuple[str, str]], batch_size: int = 16) -> List[float]:
+        self.batches.append(len(pairs))
+        self.threads.append(threading.get_ident())
+        if self.fail:
+            raise RuntimeError("boom")
+        return [len(q) + len(c) / 100.0 for q, c in pairs]
+
+
+def test_concurrent_requests_share_batches() -> None:
+    fake = FakeReranker()
+    service = RerankService(fake, max_batch_size=64, max_wait_ms=20)
+
+    async def run():
+        results = await asyncio.gather(
+            service.score("aa", ["x", "yy"]),
+            service.score("bbb", ["z"]),
+            service.score("c", ["w" * 5, "v", "u"]),
+        )
+        await service.aclose()
+        return results
+
+    results = asyncio.run(run())
+
+    assert results == [[2.01, 2.02], [3.01], [1.05, 1.01, 1.01]]
+    assert fake.batches == [6]
+    assert fake.threads[0] != threading.get_ident()
+
+
+def test_batches_are_capped_by_size() -> None:
+    fake = FakeReranker()
+    service = RerankService(fake, max_batch_size=4, max_wait_ms=20)
+
+    async def run():
+        scores = await service.score("q", [str(i) for i in range(10)])
+        await service.aclose()
+        return scores
+
+    scores = asyncio.run(run())
+
+    assert len(scores) == 10
+    assert fake.batches == [4, 4, 2]
+
+
+def test_inference_error_propagates_to_callers() -> None:
+    service = RerankService(FakeReranker(fail=True), max_batch_size=8, max_wait_ms=1)
+
+    async def run():
+        try:
+            with pytest.raises(RuntimeError):
+                await service.score("q", ["a", "b"])
+        finally:
+            await service.aclose()
+
+    asyncio.run(run())
+
+
+def test_disabled_service_scores_directly() -> None:
+    fake = FakeReranker()
+    service = RerankService(fake, max_batch_size=3, enabled=False)
+
+    scores = asyncio.run(service.score("q", ["a", "b"]))
+
+    assert scores == [1.01, 1.01]
+    assert service._worker is None